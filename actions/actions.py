@@ -3,6 +3,17 @@ from rasa_sdk import Action, Tracker
 from rasa_sdk.executor import CollectingDispatcher
 import random
 
+from irradiance import TABLE, UNKNOWN, peak_sun_hours, province_index
+from quotes import recommend
+
+LOCATION_BENEFITS = {
+    "california": "California has excellent solar potential with 5-7 peak sun hours daily, plus great state incentives!",
+    "texas": "Texas offers fantastic solar conditions with 5-6 peak sun hours and plenty of sunshine year-round!",
+    "florida": "Florida is perfect for solar with 5-6 peak sun hours and excellent net metering policies!",
+    "arizona": "Arizona has some of the best solar conditions in the US with 6-7 peak sun hours daily!",
+    "new york": "New York offers good solar potential with strong state incentives and net metering programs!"
+}
+
 class ActionProvideRecommendation(Action):
     def name(self) -> Text:
         return "action_provide_recommendation"
@@ -20,16 +31,11 @@ class ActionProvideRecommendation(Action):
             )
             return []
 
-        # Calculate system size (rough estimate: 5 kWh per day = 1.5 kW system)
-        daily_usage = energy_usage / 30
-        system_size = round(daily_usage / 5 * 1.5, 1)
-
-        # Calculate price (rough estimate: $3/watt after tax credits)
-        system_watts = system_size * 1000
-        price = round(system_watts * 3 / 1000, 0)
-
-        # Calculate bill reduction percentage
-        bill_reduction = min(95, max(70, int(system_size * 8)))
+        # Size from the province's peak sun hours; price at $3/watt after tax credits
+        rec = recommend(energy_usage, location, price_divisor=1000, price_per_watt=3)
+        system_size = rec['system_size']
+        price = rec['price']
+        bill_reduction = rec['bill_reduction']
 
         dispatcher.utter_message(
             text=f"Based on your location ({location}) and energy usage ({energy_usage} kWh/month), I recommend a {system_size}kW solar panel system. This would cost approximately ${price:,.0f} after tax credits and eliminate about {bill_reduction}% of your electricity bill! The system would pay for itself in about 7-8 years through energy savings."
@@ -50,6 +56,7 @@ class ActionCalculateSystemSize(Action):
             domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
 
         energy_usage = tracker.get_slot("energy_usage")
+        location = tracker.get_slot("location")
 
         if not energy_usage:
             dispatcher.utter_message(
@@ -59,7 +66,7 @@ class ActionCalculateSystemSize(Action):
 
         # Simple calculation for system sizing
         daily_usage = energy_usage / 30
-        required_system_size = round(daily_usage / 5 * 1.2, 1)  # 20% buffer
+        required_system_size = round(daily_usage / peak_sun_hours(location) * 1.2, 1)  # 20% buffer
 
         number_of_panels = int(required_system_size * 1000 / 400)  # Assuming 400W panels
 
@@ -86,16 +93,14 @@ class ActionProvideLocationInfo(Action):
             return []
 
         # Provide location-specific information
-        location_benefits = {
-            "california": "California has excellent solar potential with 5-7 peak sun hours daily, plus great state incentives!",
-            "texas": "Texas offers fantastic solar conditions with 5-6 peak sun hours and plenty of sunshine year-round!",
-            "florida": "Florida is perfect for solar with 5-6 peak sun hours and excellent net metering policies!",
-            "arizona": "Arizona has some of the best solar conditions in the US with 6-7 peak sun hours daily!",
-            "new york": "New York offers good solar potential with strong state incentives and net metering programs!"
-        }
-
-        location_lower = location.lower()
-        message = location_benefits.get(location_lower, f"{location} has good solar potential! Most areas receive 4-6 peak sun hours per day, making solar an excellent investment.")
+        province = province_index(location)
+        if province != UNKNOWN:
+            name = TABLE.provinces[province]
+            message = (f"{name} receives about {TABLE.peak_sun_hours[province]} peak sun hours per day, so each kW of panels "
+                       f"produces roughly {TABLE.annual_yield[province]:,.0f} kWh a year!")
+        else:
+            location_lower = location.lower()
+            message = LOCATION_BENEFITS.get(location_lower, f"{location} has good solar potential! Most areas receive 4-6 peak sun hours per day, making solar an excellent investment.")
 
         dispatcher.utter_message(text=message)
 
@@ -0,0 +1,21 @@
+#!/usr/bin/env python3
+"""
+Access check shared by the /admin/* endpoints
+"""
+
+# Set by reverse proxies and tunnels such as ngrok, which connect from localhost on a remote client's behalf
+FORWARDING_HEADERS = ('Forwarded', 'X-Forwarded-For', 'X-Forwarded-Proto', 'X-Forwarded-Host', 'X-Real-IP')
+
+
+def is_local(request):
+    """True for a request made on this machine, not one a proxy or tunnel forwarded from elsewhere"""
+    if request.remote_addr not in ('127.0.0.1', '::1'):
+        return False
+    return not any(header in request.headers for header in FORWARDING_HEADERS)
+
+
+def is_admin(request, admin_token=None):
+    """True when X-Admin-Token matches admin_token, or, with no token configured, for local requests"""
+    if admin_token:
+        return request.headers.get('X-Admin-Token') == admin_token
+    return is_local(request)
@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+"""
+Offline analytics over conversation logs: intents, menu funnels, transitions and drop-off
+
+Usage:
+    python analytics.py logs/conversations
+    python analytics.py logs/conversations --since 2026-09-01 --until 2026-09-30 --workers 8
+    python analytics.py logs/conversations --funnel MAIN_MENU,PRICING,generate_recommendation --json report.json
+
+Each log file (one per day) is a shard. Shards are read line by line in
+worker processes, and each worker returns only counters plus a few
+integers per sender. The counters are then merged in date order. Memory
+grows with the number of distinct senders and states, not with the number
+of turns.
+"""
+
+import argparse
+import gc
+import glob
+import json
+import os
+import re
+import sqlite3
+import sys
+from collections import Counter
+from functools import wraps
+from multiprocessing import Pool
+
+from conversation_log import FIELDS
+
+DEFAULT_FUNNEL = ('MAIN_MENU', 'INFO_MENU', 'panel_types', 'generate_recommendation')
+
+_SHARD_DATE = re.compile(r'(\d{4}-\d{2}-\d{2})\.jsonl$')
+
+
+def known_steps():
+    """States and intents of ProfessionalChatbot that a funnel step may name"""
+    from professional_chatbot import CONTENT
+
+    dialogue = CONTENT.current.dialogue
+    names = set(dialogue.states) | {'generate_recommendation', 'default'}
+    names |= {intent for intent, _ in dialogue.transitions.values()}
+    names |= {intent for intent in dialogue.defaults.values() if intent}
+    names |= {intent for _, intent in dialogue.keywords}
+    return names
+
+
+def find_shards(path, since=None, until=None):
+    """Log files under path (a file or a directory), oldest first, limited to [since, until] by file date"""
+    if os.path.isfile(path):
+        return [path]
+    shards = []
+    for shard in sorted(glob.glob(os.path.join(path, '*.jsonl'))):
+        match = _SHARD_DATE.search(shard)
+        day = match.group(1) if match else None
+        if day and ((since and day < since) or (until and day > until)):
+            continue
+        shards.append(shard)
+    shards += sorted(glob.glob(os.path.join(path, '*.db')))
+    return shards
+
+
+def iter_events(path):
+    """Yield turn dicts from a JSONL shard or a SQLite log, one at a time"""
+    if path.endswith('.db'):
+        connection = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+        try:
+            for row in connection.execute(f"SELECT {', '.join(FIELDS)} FROM turns ORDER BY ts"):
+                event = dict(zip(FIELDS, row))
+                yield event
+        finally:
+            connection.close()
+        return
+    decode = json.JSONDecoder().decode
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                yield decode(line)
+            except ValueError:
+                # A torn last line from a crash; skip it
+                continue
+
+
+def without_gc(function):
+    """Run a function with the cyclic garbage collector paused.
+
+    The per-sender tables hold many small lists but no cycles; while they
+    grow, the collector would otherwise keep rescanning them.
+    """
+    @wraps(function)
+    def wrapper(*args, **kwargs):
+        was_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            if was_enabled:
+                gc.enable()
+    return wrapper
+
+
+@without_gc
+def analyze_shard(args):
+    """Aggregate one shard; returns counters and per-sender summaries"""
+    path, funnel = args
+    depth = len(funnel)
+    # A step may name a state or an intent; map each name to the stages it completes
+    step_of = {}
+    for index, step in enumerate(funnel):
+        step_of.setdefault(step, []).append(index)
+    starts = range(depth + 1)
+
+    # (state before, state after, intent) -> turns; intent and transition counts are derived from it
+    turns_by_kind = Counter()
+    latency_ms = Counter()
+    intent_transitions = Counter()
+    # sender -> [first intent, last intent, last state, progress]; progress[s] is the funnel
+    # stage reached in this shard by a sender who entered it at stage s
+    senders = {}
+
+    for event in iter_events(path):
+        get = event.get
+        intent = get('intent')
+        state = get('state_after')
+        turns_by_kind[(get('state_before'), state, intent)] += 1
+        latency_ms[intent] += get('latency_ms') or 0
+
+        sender = get('sender')
+        summary = senders.get(sender)
+        if summary is None:
+            summary = senders[sender] = [intent, None, None, list(starts)]
+        elif summary[1] is not None:
+            intent_transitions[(summary[1], intent)] += 1
+        summary[1] = intent
+        summary[2] = state
+
+        stages = step_of.get(state)
+        if intent in step_of:
+            stages = step_of[intent] if stages is None else stages + step_of[intent]
+        if stages:
+            progress = summary[3]
+            for start in starts:
+                if progress[start] in stages:
+                    progress[start] += 1
+
+    intents = Counter()
+    transitions = Counter()
+    for (state_before, state, intent), count in turns_by_kind.items():
+        intents[intent] += count
+        if state_before is not None:
+            transitions[(state_before, state)] += count
+
+    return {
+        'path': path,
+        'turns': sum(intents.values()),
+        'intents': intents,
+        'latency_ms': latency_ms,
+        'transitions': transitions,
+        'intent_transitions': intent_transitions,
+        'senders': senders
+    }
+
+
+@without_gc
+def merge(results, funnel):
+    """Combine shard results, in shard order, into a report dict"""
+    depth = len(funnel)
+    intents = Counter()
+    latency_ms = Counter()
+    transitions = Counter()
+    intent_transitions = Counter()
+    # sender -> (last intent, last state, funnel stage)
+    senders = {}
+    turns = 0
+
+    for result in results:
+        turns += result['turns']
+        intents.update(result['intents'])
+        latency_ms.update(result['latency_ms'])
+        transitions.update(result['transitions'])
+        intent_transitions.update(result['intent_transitions'])
+        seen = senders.get
+        for sender, (first_intent, last_intent, last_state, progress) in result['senders'].items():
+            previous = seen(sender)
+            if previous is None:
+                senders[sender] = (last_intent, last_state, progress[0])
+            else:
+                # A conversation that continues from an earlier shard
+                intent_transitions[(previous[0], first_intent)] += 1
+                senders[sender] = (last_intent, last_state, progress[previous[2]])
+
+    reached = [0] * (depth + 1)
+    for _, _, stage in senders.values():
+        reached[stage] += 1
+    # reached[k] senders stopped after k steps; a step is reached by everyone who got at least that far
+    funnel_rows = []
+    for index, step in enumerate(funnel):
+        count = sum(reached[index + 1:])
+        previous = len(senders) if index == 0 else funnel_rows[-1]['senders']
+        funnel_rows.append({
+            'step': step,
+            'senders': count,
+            'of_previous': round(count / previous, 4) if previous else 0.0,
+            'dropped_after_previous': previous - count
+        })
+
+    states = sorted({state for pair in transitions for state in pair if state is not None})
+    return {
+        'turns': turns,
+        'senders': len(senders),
+        'intents': [{'intent': intent, 'turns': count,
+                     'share': round(count / turns, 4) if turns else 0.0,
+                     'avg_latency_ms': round(latency_ms[intent] / count, 3)}
+                    for intent, count in intents.most_common()],
+        'funnel': funnel_rows,
+        'exit_states': dict(Counter(state for _, state, _ in senders.values()).most_common()),
+        'exit_intents': dict(Counter(intent for intent, _, _ in senders.values()).most_common(10)),
+        'states': states,
+        'transition_matrix': [[transitions[(source, target)] for target in states] for source in states],
+        'intent_transitions': [{'from': source, 'to': target, 'count': count}
+                               for (source, target), count in intent_transitions.most_common(20)]
+    }
+
+
+def analyze(shards, funnel=DEFAULT_FUNNEL, workers=None):
+    """Analyze shards on up to `workers` processes (1 runs in this process)"""
+    funnel = tuple(funnel)
+    jobs = [(shard, funnel) for shard in shards]
+    if workers == 1 or len(jobs) <= 1:
+        results = map(analyze_shard, jobs)
+        return merge(results, funnel)
+    with Pool(processes=min(workers or os.cpu_count() or 1, len(jobs))) as pool:
+        # imap keeps shard order, and merging starts as soon as the first shard is done
+        return merge(pool.imap(analyze_shard, jobs), funnel)
+
+
+def format_report(report):
+    lines = [f"Turns: {report['turns']:,}   Senders: {report['senders']:,}", "", "Intents"]
+    for row in report['intents']:
+        lines.append(f"  {str(row['intent']):<28} {row['turns']:>10,} {row['share']:>7.1%} {row['avg_latency_ms']:>9.2f} ms")
+
+    lines += ["", "Funnel"]
+    for row in report['funnel']:
+        lines.append(f"  {row['step']:<28} {row['senders']:>10,} {row['of_previous']:>7.1%}"
+                     f"  (-{row['dropped_after_previous']:,})")
+
+    lines += ["", "Last state per sender (drop-off)"]
+    for state, count in report['exit_states'].items():
+        lines.append(f"  {str(state):<28} {count:>10,}")
+
+    states = report['states']
+    if states:
+        width = max(len(state) for state in states) + 2
+        lines += ["", "State transitions (row: from, column: to)",
+                  ' ' * (width + 2) + ''.join(f"{state[:10]:>11}" for state in states)]
+        for state, row in zip(states, report['transition_matrix']):
+            lines.append(f"  {state:<{width}}" + ''.join(f"{count:>11,}" for count in row))
+
+    lines += ["", "Top intent transitions"]
+    for row in report['intent_transitions']:
+        lines.append(f"  {str(row['from']):>24} -> {str(row['to']):<24} {row['count']:>10,}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Conversation log analytics")
+    parser.add_argument('path', nargs='?', default=os.path.join('logs', 'conversations'),
+                        help="log directory or a single .jsonl/.db file")
+    parser.add_argument('--since', help="first day to include (YYYY-MM-DD)")
+    parser.add_argument('--until', help="last day to include (YYYY-MM-DD)")
+    parser.add_argument('--funnel', default=','.join(DEFAULT_FUNNEL),
+                        help="comma-separated states or intents, in order")
+    parser.add_argument('--workers', type=int, help="processes (default: one per CPU)")
+    parser.add_argument('--json', help="also write the report to this JSON file")
+    args = parser.parse_args(argv)
+
+    funnel = [step.strip() for step in args.funnel.split(',') if step.strip()]
+    unknown = [step for step in funnel if step not in known_steps()]
+    if unknown:
+        parser.error(f"unknown funnel step(s): {', '.join(unknown)}")
+
+    shards = find_shards(args.path, args.since, args.until)
+    if not shards:
+        print(f"No conversation logs found at {args.path}")
+        return 1
+
+    report = analyze(shards, funnel, args.workers)
+    report['shards'] = len(shards)
+    print(format_report(report))
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+            f.write('\n')
+        print(f"📝 Report written to {args.json}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
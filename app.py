@@ -1,61 +1,178 @@
 from flask import Flask, render_template, request, jsonify
-import requests
+import atexit
 import os
-import subprocess
 import threading
 import time
+from metrics import INTENT_LATENCY, REGISTRY, instrument_app
+from profiling import install_profiling, note_intent, profiler_from_env
+from conversation_log import log_from_env
+from rasa_client import RasaClient, CLOSED, OPEN, HALF_OPEN
+from rasa_launcher import launch_rasa, format_startup_report
+from sse import sse_event, sse_response
+from training_jobs import FINISHED, TrainingQueue
 
 app = Flask(__name__)
+instrument_app(app)
+
+# Request profiling is off unless CHATBOT_PROFILE_EVERY or /admin/profiling turns it on
+profiler = profiler_from_env(os.path.join(os.path.dirname(os.path.abspath(__file__)), '.profiles'))
+install_profiling(app, profiler, admin_token=os.environ.get('CHATBOT_ADMIN_TOKEN'))
 
 # Rasa configuration
-RASA_API_URL = "http://localhost:5005/webhooks/rest/webhook"
+RASA_PROJECT_DIR = os.environ.get("RASA_PROJECT_DIR", "/data/data/com.termux/files/home/solar-chatbot")
+RASA_BASE_URL = os.environ.get("RASA_BASE_URL", "http://localhost:5005")
+RASA_API_URL = RASA_BASE_URL + "/webhooks/rest/webhook"
+
+# Pooled keep-alive client; the health probe opens the breaker while Rasa is down
+rasa_client = RasaClient(RASA_BASE_URL, timeout=2)
+rasa_client.start_health_probe()
+
+# Turn transcripts, written off the request thread (CHATBOT_LOG_BACKEND=off disables)
+conversation_log = log_from_env(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'logs', 'conversations'))
+if conversation_log is not None:
+    atexit.register(conversation_log.close)
+
+def record_turn(sender, message, intent, start):
+    """Record a turn; Rasa keeps the dialogue state, so states are not known here"""
+    latency = time.perf_counter() - start
+    INTENT_LATENCY.observe(latency, (intent,))
+    note_intent(intent)
+    if conversation_log is not None:
+        conversation_log.log_turn('rasa_proxy', sender, message, None, None, intent, {}, latency)
+
+# In-process intent classifier trained from data/nlu.yml (CHATBOT_NLU=off disables);
+# loaded on first use, and retrained when the NLU data or config.yml changed since it was saved
+NLU_ENABLED = os.environ.get('CHATBOT_NLU', 'on').lower() not in ('0', 'off', 'false', 'no')
+NLU_MODEL_PATH = os.environ.get('CHATBOT_NLU_MODEL', os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                                                   'models', 'nlu_classifier.npz'))
+_nlu = None
+_nlu_lock = threading.Lock()
+
+def nlu_classifier():
+    """The loaded classifier, or None when it is disabled or could not be loaded"""
+    global _nlu
+    if _nlu is None and NLU_ENABLED:
+        with _nlu_lock:
+            if _nlu is None:
+                try:
+                    from nlu_classifier import load_or_train
+                    _nlu = load_or_train(NLU_MODEL_PATH)
+                except Exception as e:
+                    print(f"⚠️  NLU classifier unavailable, using keyword fallback only: {e}")
+                    # Not retried on every request
+                    _nlu = False
+    return _nlu or None
+
+def fallback_intent(message):
+    """Built-in answer for a message: the classifier's intent when confident, else the keyword rules"""
+    classifier = nlu_classifier()
+    if classifier is not None:
+        intent = NLU_FALLBACK_INTENTS.get(classifier.parse(message)['intent']['name'])
+        if intent is not None:
+            return intent
+
+    message_lower = message.lower()
+    for intent, keywords in FALLBACK_KEYWORDS:
+        if any(keyword in message_lower for keyword in keywords):
+            return intent
+    return 'fallback_default'
 
 class RasaManager:
     def __init__(self):
-        self.rasa_process = None
+        self.processes = []
         self.rasa_running = False
+        self.startup_times = {}
 
     def start_rasa(self):
-        """Start Rasa server in the background"""
+        """Start the Rasa servers in parallel and wait until they report ready"""
         try:
-            # Start Rasa action server
-            action_server = subprocess.Popen(
-                ["rasa", "run", "actions"],
-                cwd="/data/data/com.termux/files/home/solar-chatbot",
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE
-            )
-
-            # Wait a moment for action server to start
-            time.sleep(3)
-
-            # Start Rasa server
-            rasa_server = subprocess.Popen(
-                ["rasa", "run", "--enable-api", "--cors", "*"],
-                cwd="/data/data/com.termux/files/home/solar-chatbot",
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE
-            )
-
-            # Wait for Rasa server to be ready
-            time.sleep(5)
-            self.rasa_running = True
-            print("Rasa server started successfully!")
-            return True
-
+            results = launch_rasa(cwd=RASA_PROJECT_DIR,
+                                  log_dir=os.path.abspath("logs"))
         except Exception as e:
             print(f"Error starting Rasa: {e}")
             return False
 
+        self.processes = [result['process'] for result in results.values()]
+        self.startup_times = {name: result['seconds'] for name, result in results.items()}
+        print(format_startup_report(results))
+
+        if not all(result['ready'] for result in results.values()):
+            print("Rasa did not become ready; using fallback responses")
+            return False
+
+        self.rasa_running = True
+        # Close the circuit right away instead of waiting for the next health probe
+        rasa_client.probe()
+        print("Rasa server started successfully!")
+        return True
+
     def stop_rasa(self):
         """Stop Rasa server"""
-        if self.rasa_process:
-            self.rasa_process.terminate()
-            self.rasa_process = None
+        for process in self.processes:
+            process.terminate()
+        self.processes = []
         self.rasa_running = False
 
 rasa_manager = RasaManager()
 
+# `rasa train` runs on a background worker, one job at a time
+training = TrainingQueue(RASA_PROJECT_DIR, timeout=int(os.environ.get('CHATBOT_TRAIN_TIMEOUT', 1800)))
+atexit.register(training.stop)
+
+def collect_metrics():
+    """Rasa connection figures, read at scrape time"""
+    state = rasa_client.breaker.state
+    yield ('chatbot_rasa_breaker_state', 'gauge', "1 for the circuit breaker's current state",
+           [({'state': name}, int(name == state)) for name in (CLOSED, OPEN, HALF_OPEN)])
+    yield ('chatbot_rasa_breaker_opened', 'counter', "Times the Rasa circuit breaker has opened",
+           [({}, rasa_client.breaker.times_opened)])
+    yield ('chatbot_rasa_up', 'gauge', "1 if the last Rasa health probe succeeded",
+           [({}, int(bool(rasa_client.last_probe_ok)))])
+
+REGISTRY.add_collector(collect_metrics)
+
+# Built-in answers while Rasa is not available
+FALLBACK_RESPONSES = {
+    'fallback_greet': "Hello! Welcome to CW Enerji Solar Panel Chatbot. How can I help you today? I can answer questions about solar panels, pricing, installation, and more.",
+    'fallback_solar_info': "Solar panels are an excellent investment for clean energy! CW Enerji offers high-quality solar panels with 25-year warranties. Our systems can help you save on electricity bills while reducing your carbon footprint. Would you like to know more about pricing or installation?",
+    'fallback_pricing': "Solar panel pricing varies based on your energy needs and location. Typically, a residential system costs between $10,000-$25,000, but many financing options are available. Would you like a personalized quote? I'll need to know your location and average monthly electricity consumption.",
+    'fallback_installation': "CW Enerji provides professional installation services. Our certified technicians handle everything from site assessment to final connection. Installation usually takes 1-3 days depending on system size. We also handle all permits and paperwork.",
+    'fallback_benefits': "Solar panels offer numerous benefits: reduced electricity bills, energy independence, environmental protection, increased property value, and government incentives. Most systems pay for themselves within 5-7 years!",
+    'fallback_warranty': "CW Enerji offers comprehensive warranties: 25-year performance guarantee, 10-year product warranty, and 5-year workmanship warranty. Our panels are built to last and maintain high efficiency throughout their lifetime.",
+    'fallback_purchase': "Great! I'd be happy to help you purchase a solar system. To provide you with an accurate quote, I'll need: 1) Your location/address, 2) Average monthly electricity bill, 3) Roof type and available space. Could you share this information?",
+    'fallback_goodbye': "Thank you for contacting CW Enerji! Feel free to reach out anytime with questions about solar energy. Have a wonderful day!",
+    'fallback_thanks': "You're welcome! I'm here to help with any solar energy questions you may have. Is there anything else you'd like to know about our solar panels or services?",
+    'fallback_default': "I'm here to help you with solar panel information! I can answer questions about pricing, installation, benefits, warranties, and purchasing options. What would you like to know about CW Enerji solar solutions?"
+}
+
+# Keyword rules, checked in order when the classifier has no confident answer
+FALLBACK_KEYWORDS = [
+    ('fallback_greet', ['hello', 'hi', 'hey', 'merhaba', 'selam']),
+    ('fallback_solar_info', ['solar panel', 'solar', 'energy', 'panel', 'güneş', 'enerji']),
+    ('fallback_pricing', ['price', 'cost', 'fiyat', 'ücret']),
+    ('fallback_installation', ['install', 'installation', 'montaj', 'kurulum']),
+    ('fallback_benefits', ['benefit', 'advantage', 'fayda', 'avantaj']),
+    ('fallback_warranty', ['warranty', 'guarantee', 'garanti']),
+    ('fallback_purchase', ['buy', 'purchase', 'order', 'al', 'satın']),
+    ('fallback_goodbye', ['bye', 'goodbye', 'güle güle', 'hoşça kal']),
+    ('fallback_thanks', ['thank', 'thanks', 'teşekkür'])
+]
+
+# Classifier intents (data/nlu.yml) that one of the built-in answers covers
+NLU_FALLBACK_INTENTS = {
+    'greet': 'fallback_greet',
+    'request_information': 'fallback_solar_info',
+    'ask_types': 'fallback_solar_info',
+    'ask_price': 'fallback_pricing',
+    'ask_financing': 'fallback_pricing',
+    'ask_installation': 'fallback_installation',
+    'ask_benefits': 'fallback_benefits',
+    'ask_warranty': 'fallback_warranty',
+    'request_selling': 'fallback_purchase',
+    'goodbye': 'fallback_goodbye',
+    'thankyou': 'fallback_thanks'
+}
+
 @app.route('/')
 def index():
     """Serve the main chat interface"""
@@ -72,89 +189,60 @@ def chat():
         if not message:
             return jsonify({'error': 'No message provided'}), 400
 
-        # Try to send message to Rasa first
-        try:
-            rasa_payload = {
-                "sender": sender,
-                "message": message
-            }
-            response = requests.post(RASA_API_URL, json=rasa_payload, timeout=2)
-
-            if response.status_code == 200:
-                rasa_response = response.json()
-                return jsonify(rasa_response)
-        except:
-            pass  # Fallback to simple responses if Rasa is not available
-
-        # Simple fallback responses when Rasa is not available
-        message_lower = message.lower()
-
-        # Greeting patterns
-        if any(greeting in message_lower for greeting in ['hello', 'hi', 'hey', 'merhaba', 'selam']):
-            response_text = "Hello! Welcome to CW Enerji Solar Panel Chatbot. How can I help you today? I can answer questions about solar panels, pricing, installation, and more."
-
-        # Solar panel information
-        elif any(keyword in message_lower for keyword in ['solar panel', 'solar', 'energy', 'panel', 'güneş', 'enerji']):
-            response_text = "Solar panels are an excellent investment for clean energy! CW Enerji offers high-quality solar panels with 25-year warranties. Our systems can help you save on electricity bills while reducing your carbon footprint. Would you like to know more about pricing or installation?"
-
-        # Pricing questions
-        elif any(keyword in message_lower for keyword in ['price', 'cost', 'fiyat', 'ücret']):
-            response_text = "Solar panel pricing varies based on your energy needs and location. Typically, a residential system costs between $10,000-$25,000, but many financing options are available. Would you like a personalized quote? I'll need to know your location and average monthly electricity consumption."
-
-        # Installation questions
-        elif any(keyword in message_lower for keyword in ['install', 'installation', 'montaj', 'kurulum']):
-            response_text = "CW Enerji provides professional installation services. Our certified technicians handle everything from site assessment to final connection. Installation usually takes 1-3 days depending on system size. We also handle all permits and paperwork."
+        start = time.perf_counter()
 
-        # Benefits questions
-        elif any(keyword in message_lower for keyword in ['benefit', 'advantage', 'fayda', 'avantaj']):
-            response_text = "Solar panels offer numerous benefits: reduced electricity bills, energy independence, environmental protection, increased property value, and government incentives. Most systems pay for themselves within 5-7 years!"
+        # Try to send message to Rasa first; None means use the fallback
+        rasa_response = rasa_client.send_message(sender, message)
+        if rasa_response is not None:
+            # Rasa's REST channel does not report the intent it resolved
+            record_turn(sender, message, 'rasa', start)
+            return jsonify(rasa_response)
 
-        # Warranty questions
-        elif any(keyword in message_lower for keyword in ['warranty', 'guarantee', 'garanti']):
-            response_text = "CW Enerji offers comprehensive warranties: 25-year performance guarantee, 10-year product warranty, and 5-year workmanship warranty. Our panels are built to last and maintain high efficiency throughout their lifetime."
-
-        # Purchase intent
-        elif any(keyword in message_lower for keyword in ['buy', 'purchase', 'order', 'al', 'satın']):
-            response_text = "Great! I'd be happy to help you purchase a solar system. To provide you with an accurate quote, I'll need: 1) Your location/address, 2) Average monthly electricity bill, 3) Roof type and available space. Could you share this information?"
-
-        # Goodbye patterns
-        elif any(greeting in message_lower for greeting in ['bye', 'goodbye', 'güle güle', 'hoşça kal']):
-            response_text = "Thank you for contacting CW Enerji! Feel free to reach out anytime with questions about solar energy. Have a wonderful day!"
-
-        # Thanks patterns
-        elif any(greeting in message_lower for greeting in ['thank', 'thanks', 'teşekkür']):
-            response_text = "You're welcome! I'm here to help with any solar energy questions you may have. Is there anything else you'd like to know about our solar panels or services?"
-
-        # Default response
-        else:
-            response_text = "I'm here to help you with solar panel information! I can answer questions about pricing, installation, benefits, warranties, and purchasing options. What would you like to know about CW Enerji solar solutions?"
+        # Simple fallback responses when Rasa is not available
+        intent = fallback_intent(message)
+        response_text = FALLBACK_RESPONSES[intent]
 
+        record_turn(sender, message, intent, start)
         return jsonify([{'text': response_text}])
 
     except Exception as e:
         print(f"Error in chat endpoint: {e}")
         return jsonify([{'text': 'I apologize, but I\'m having trouble processing your request. Please try again.'}]), 500
 
+@app.route('/api/nlu/parse', methods=['POST'])
+def nlu_parse():
+    """Classify {"text": "..."} or a batch {"texts": [...]} with the in-process classifier"""
+    data = request.get_json(silent=True) or {}
+    classifier = nlu_classifier()
+    if classifier is None:
+        return jsonify({'error': 'NLU classifier is not available'}), 503
+    if isinstance(data.get('texts'), list):
+        return jsonify(classifier.parse_batch(str(text) for text in data['texts']))
+    if not data.get('text'):
+        return jsonify({'error': 'No text provided'}), 400
+    return jsonify(classifier.parse(str(data['text'])))
+
 @app.route('/api/status')
 def status():
     """Check the status of the chatbot system"""
     rasa_status = "running" if rasa_manager.rasa_running else "stopped"
 
-    try:
-        # Test Rasa connection
-        response = requests.get("http://localhost:5005/", timeout=2)
-        rasa_connected = response.status_code == 200
-    except:
-        rasa_connected = False
-
     return jsonify({
         'flask': 'running',
         'rasa': rasa_status,
-        'rasa_connected': rasa_connected,
+        'rasa_connected': rasa_client.connected,
+        'rasa_startup_seconds': rasa_manager.startup_times,
+        'rasa_client': rasa_client.stats(),
+        'conversation_log': conversation_log.stats() if conversation_log is not None else None,
+        'nlu_classifier': _nlu.stats() if _nlu else None,
+        'training': training.stats(),
         'endpoints': {
             'chat': '/api/chat',
             'status': '/api/status',
-            'tts': '/api/tts'
+            'metrics': '/metrics',
+            'tts': '/api/tts',
+            'nlu_parse': '/api/nlu/parse',
+            'train': '/api/train'
         }
     })
 
@@ -179,40 +267,52 @@ def text_to_speech():
 
 @app.route('/api/train', methods=['POST'])
 def train_model():
-    """Train the Rasa model"""
-    try:
-        # Run training in a subprocess
-        result = subprocess.run(
-            ["rasa", "train"],
-            cwd="/data/data/com.termux/files/home/solar-chatbot",
-            capture_output=True,
-            text=True,
-            timeout=300  # 5 minutes timeout
-        )
-
-        if result.returncode == 0:
-            return jsonify({
-                'status': 'success',
-                'message': 'Model trained successfully',
-                'output': result.stdout
-            })
-        else:
-            return jsonify({
-                'status': 'error',
-                'message': 'Training failed',
-                'error': result.stderr
-            }), 500
-
-    except subprocess.TimeoutExpired:
-        return jsonify({
-            'status': 'error',
-            'message': 'Training timed out after 5 minutes'
-        }), 500
-    except Exception as e:
-        return jsonify({
-            'status': 'error',
-            'message': f'Training error: {str(e)}'
-        }), 500
+    """Queue a Rasa training job; it is skipped if the training data is unchanged since the last model"""
+    data = request.get_json(silent=True) or {}
+    job = training.submit(force=bool(data.get('force')))
+    return jsonify({
+        'job_id': job.id,
+        'status': job.status,
+        'status_url': f'/api/train/{job.id}',
+        'stream_url': f'/api/train/{job.id}/stream'
+    }), 202
+
+@app.route('/api/train/<job_id>')
+def training_status(job_id):
+    """Status, progress and log of a training job; ?since=N returns log lines from N on"""
+    job = training.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Unknown training job'}), 404
+    return jsonify(job.snapshot(request.args.get('since', 0, type=int)))
+
+@app.route('/api/train/<job_id>/stream')
+def training_stream(job_id):
+    """Stream a training job's log lines and progress as Server-Sent Events until it finishes"""
+    job = training.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Unknown training job'}), 404
+    since = request.args.get('since', 0, type=int)
+
+    def generate():
+        position = since
+        progress = None
+        while True:
+            snapshot = job.snapshot(position)
+            if snapshot['log']:
+                yield sse_event('log', {'lines': snapshot['log'], 'next': snapshot['next']})
+            position = snapshot['next']
+            if snapshot['progress'] != progress:
+                progress = snapshot['progress']
+                yield sse_event('progress', dict(progress, status=snapshot['status']))
+            if snapshot['status'] in FINISHED:
+                del snapshot['log']
+                yield sse_event('done', snapshot)
+                return
+            if not job.wait(position, timeout=15):
+                # Keeps proxies from closing a quiet connection during long epochs
+                yield b": keep-alive\n\n"
+
+    return sse_response(generate())
 
 def initialize_rasa():
     """Initialize and start Rasa server"""
@@ -222,21 +322,21 @@ def initialize_rasa():
     if not success:
         print("Failed to start Rasa server. Please check if Rasa is installed.")
         print("You can start Rasa manually with:")
-        print("  cd /data/data/com.termux/files/home/solar-chatbot")
+        print(f"  cd {RASA_PROJECT_DIR}")
         print("  rasa run actions")
         print("  rasa run --enable-api --cors \"*\"")
 
 if __name__ == '__main__':
-    # Start Rasa in a background thread
+    # Start Rasa in a background thread; Flask serves fallback answers until it is ready
     rasa_thread = threading.Thread(target=initialize_rasa, daemon=True)
     rasa_thread.start()
-
-    # Give Rasa time to start
-    time.sleep(8)
+    # Load (or retrain) the classifier before the first fallback answer needs it
+    threading.Thread(target=nlu_classifier, daemon=True).start()
 
     # Start Flask server
     print("Starting Solar Panel Chatbot...")
     print("Access the chatbot at: http://localhost:5000")
     print("API Status endpoint: http://localhost:5000/api/status")
+    print("Metrics endpoint: http://localhost:5000/metrics")
 
     app.run(host='0.0.0.0', port=5000, debug=True, use_reloader=False)
\ No newline at end of file
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Batch message processing: parallel across senders, in order within a sender
+"""
+
+import queue
+import threading
+import time
+from collections import OrderedDict
+
+_DONE = object()
+
+
+def group_by_sender(items):
+    """Group (index, item) pairs by sender, keeping each sender's message order"""
+    groups = OrderedDict()
+    for index, item in enumerate(items):
+        sender = str(item.get('sender', 'user')) if isinstance(item, dict) else 'user'
+        groups.setdefault(sender, []).append((index, item))
+    return groups
+
+
+def run_batch(items, handler, workers=8, buffer_size=256):
+    """Process items with handler(sender, message) and yield results as they complete.
+
+    Yields (index, sender, result, seconds, error) tuples. Different senders run
+    on up to `workers` threads; each sender's messages run one after another in
+    their original order. At most `buffer_size` finished results wait to be
+    consumed, so a slow reader applies backpressure instead of growing memory.
+    """
+    groups = iter(group_by_sender(items).items())
+    groups_lock = threading.Lock()
+    results = queue.Queue(maxsize=buffer_size)
+    stop = threading.Event()
+
+    def emit(result):
+        while not stop.is_set():
+            try:
+                results.put(result, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def worker():
+        try:
+            while not stop.is_set():
+                with groups_lock:
+                    group = next(groups, None)
+                if group is None:
+                    return
+                sender, entries = group
+                for index, item in entries:
+                    message = item.get('message', '') if isinstance(item, dict) else ''
+                    start = time.perf_counter()
+                    if not message:
+                        result, error = None, 'No message provided'
+                    else:
+                        try:
+                            result, error = handler(sender, message), None
+                        except Exception as e:
+                            result, error = None, str(e)
+                    if not emit((index, sender, result, time.perf_counter() - start, error)):
+                        return
+        finally:
+            emit(_DONE)
+
+    threads = [threading.Thread(target=worker, name=f'batch-worker-{i}', daemon=True)
+               for i in range(max(1, workers))]
+    for thread in threads:
+        thread.start()
+
+    try:
+        running = len(threads)
+        while running:
+            result = results.get()
+            if result is _DONE:
+                running -= 1
+            else:
+                yield result
+    finally:
+        # Reader went away (or finished): let the workers exit
+        stop.set()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Benchmark /api/chat serialization: jsonify per request vs pre-serialized bytes
+
+Usage: python benchmarks/bench_chat_response.py [--requests N]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import jsonify
+
+from simple_app import app, get_engine
+
+MESSAGES = ['bilgi', 'a', 'b', 'c', 'd', 'menü', 'fiyat', 'merhaba', 'kurulum', 'bilinmeyen mesaj']
+
+
+def jsonify_reply(engine, message):
+    """The previous path: build the dict and serialize it with jsonify"""
+    return jsonify([engine.get_response_json(message)])
+
+
+def prepared_reply(engine, message):
+    """The current path: write the pre-serialized bytes"""
+    prepared = engine.get_prepared_response(message)
+    return app.response_class(prepared.body, mimetype='application/json',
+                              headers={'ETag': prepared.etag})
+
+
+def measure(reply, requests):
+    engine = get_engine()
+    engine.reset_conversation()
+    latencies = []
+    with app.app_context():
+        for i in range(requests):
+            message = MESSAGES[i % len(MESSAGES)]
+            start = time.perf_counter()
+            reply(engine, message)
+            latencies.append(time.perf_counter() - start)
+
+        # Allocations are counted in a separate pass so tracing does not skew latency
+        engine.reset_conversation()
+        tracemalloc.start()
+        peaks = []
+        for i in range(min(requests, 1000)):
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+            reply(engine, MESSAGES[i % len(MESSAGES)])
+            peaks.append(tracemalloc.get_traced_memory()[1] - before)
+        tracemalloc.stop()
+
+    latencies.sort()
+    return {
+        'p50_us': statistics.median(latencies) * 1e6,
+        'p99_us': latencies[int(len(latencies) * 0.99) - 1] * 1e6,
+        'peak_bytes': statistics.median(peaks)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--requests', type=int, default=20000)
+    args = parser.parse_args()
+
+    for name, reply in [('jsonify', jsonify_reply), ('prepared', prepared_reply)]:
+        result = measure(reply, args.requests)
+        print(f"{name:>9}: p50 {result['p50_us']:.1f} µs  p99 {result['p99_us']:.1f} µs  "
+              f"peak allocation {result['peak_bytes']:,.0f} bytes/request")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Benchmark SolarChatbot.get_intent: chained substring scans vs keyword automaton
+
+Usage: python benchmarks/bench_intent.py [--messages N] [--length CHARS]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from simple_chatbot import CONTENT, SolarChatbot
+
+INTENT_KEYWORDS = CONTENT.current.keywords
+
+FILLER_WORDS = [
+    'evimiz', 'için', 'çatı', 'üzerinde', 'yaklaşık', 'metrekare', 'alan', 'var',
+    'geçen', 'yıl', 'elektrik', 'faturamız', 'çok', 'yüksek', 'geldi', 've',
+    'komşumuz', 'da', 'benzer', 'bir', 'sistem', 'yaptırdı', 'acaba', 'bizim',
+    'durumumuza', 'uygun', 'mu', 'şehir', 'merkezinde', 'oturuyoruz', 'ailemiz',
+    'dört', 'kişi', 'kışın', 'klima', 'kullanıyoruz', 'yazın', 'havuz', 'pompası'
+]
+
+
+def legacy_get_intent(message):
+    """Reference copy of the original chained any(...) implementation"""
+    message_lower = message.lower()
+
+    if any(word in message_lower for word in ['merhaba', 'selam', 'hey', 'günaydın', 'iyi geceler', 'selamlar']):
+        return 'greeting'
+
+    if any(word in message_lower for word in ['satın al', 'almak istiyorum', 'satın almak istiyorum', 'isteği', 'ihtiyacım var', 'arıyorum', 'ilgileniyorum', 'al', 'alsam']):
+        if any(word in message_lower for word in ['güneş paneli', 'güneş', 'panel']):
+            return 'selling'
+
+    if any(word in message_lower for word in ['söyle', 'bilgi', 'öğrenmek', 'açıkla', 'nedir', 'nasıl çalışır', 'hakkında']):
+        if any(word in message_lower for word in ['güneş paneli', 'güneş', 'panel']):
+            return 'information'
+
+    if any(word in message_lower for word in ['fayda', 'avantaj', 'neden', 'iyi olan']):
+        return 'benefits'
+
+    if any(word in message_lower for word in ['maliyet', 'fiyat', 'ne kadar', 'pahalı', 'yatırım', 'bütçe']):
+        return 'pricing'
+
+    if any(word in message_lower for word in ['tip', 'çeşit', 'kategori', 'seçenek', 'farklı']):
+        return 'types'
+
+    if any(word in message_lower for word in ['kur', 'kurulum', 'montaj', 'tak', 'yerleştir']):
+        return 'installation'
+
+    if any(word in message_lower for word in ['bakım', 'temiz', 'koru', 'gözlem']):
+        return 'maintenance'
+
+    if any(word in message_lower for word in ['finans', 'finansman', 'kredi', 'ödeme', 'borç', 'taksit']):
+        return 'financing'
+
+    if any(word in message_lower for word in ['garanti', 'korumak', 'güvence']):
+        return 'warranty'
+
+    if any(word in message_lower for word in ['hoşça kal', 'görüşürüz', 'kendine iyi bak', 'sonra']):
+        return 'goodbye'
+
+    if any(word in message_lower for word in ['teşekkür', 'sağol', 'yardım', 'minnettar']):
+        return 'thanks'
+
+    return 'default'
+
+
+def build_messages(count, length, seed=42):
+    """Build long free-text messages, some containing intent keywords"""
+    rng = random.Random(seed)
+    keywords = [word for _, words in INTENT_KEYWORDS for word in words]
+    messages = []
+    for i in range(count):
+        words = []
+        while sum(len(w) + 1 for w in words) < length:
+            words.append(rng.choice(FILLER_WORDS))
+        # Two thirds of the messages mention one or two keywords at random places
+        for _ in range(i % 3):
+            words.insert(rng.randrange(len(words) + 1), rng.choice(keywords).upper() if rng.random() < 0.2 else rng.choice(keywords))
+        messages.append(' '.join(words))
+    return messages
+
+
+def measure(func, messages, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for message in messages:
+            func(message)
+        best = min(best, time.perf_counter() - start)
+    return len(messages) / best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--messages', type=int, default=2000)
+    parser.add_argument('--length', type=int, default=400, help='approximate characters per message')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    chatbot = SolarChatbot()
+    messages = build_messages(args.messages, args.length)
+
+    mismatches = [m for m in messages if legacy_get_intent(m) != chatbot.get_intent(m)]
+    if mismatches:
+        print(f"❌ {len(mismatches)} messages resolve to a different intent, e.g. {mismatches[0]!r}")
+        sys.exit(1)
+    print(f"✅ {len(messages)} messages resolve to identical intents")
+
+    before = measure(legacy_get_intent, messages, args.repeat)
+    after = measure(chatbot.get_intent, messages, args.repeat)
+    print(f"Message length: ~{args.length} chars")
+    print(f"Before (substring scans): {before:,.0f} messages/sec")
+    print(f"After  (automaton):       {after:,.0f} messages/sec")
+    print(f"Speedup: {after / before:.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Benchmark the cost of recording one metric observation
+
+Usage: python benchmarks/bench_metrics.py [--observations N] [--threads N]
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from metrics import Registry
+
+
+def per_observation(record, count):
+    start = time.perf_counter()
+    for _ in range(count):
+        record()
+    return (time.perf_counter() - start) / count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--observations', type=int, default=1000000)
+    parser.add_argument('--threads', type=int, default=4)
+    args = parser.parse_args()
+
+    registry = Registry()
+    counter = registry.counter('requests', "Requests", ('route', 'method', 'status'))
+    histogram = registry.histogram('latency_seconds', "Latency", ('route', 'method'))
+    labels = ('/api/chat', 'POST', '200')
+    route = labels[:2]
+
+    empty = per_observation(lambda: None, args.observations)
+    inc = per_observation(lambda: counter.inc(labels), args.observations) - empty
+    observe = per_observation(lambda: histogram.observe(0.0042, route), args.observations) - empty
+
+    print(f"  counter.inc:       {inc * 1e9:6.0f} ns/op")
+    print(f"  histogram.observe: {observe * 1e9:6.0f} ns/op")
+
+    def worker():
+        per_observation(lambda: histogram.observe(0.0042, route), args.observations // args.threads)
+
+    threads = [threading.Thread(target=worker) for _ in range(args.threads)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    total = args.observations // args.threads * args.threads
+    print(f"  {args.threads} threads observing: {elapsed / total * 1e9:6.0f} ns/op wall "
+          f"(render {len(registry.render()):,} bytes)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Benchmark the in-process NLU classifier: training time, artifact size and prediction latency
+
+Usage: python benchmarks/bench_nlu.py [--repeat N] [--batch N] [--cross-validate]
+
+Messages are the data/nlu.yml examples. --cross-validate also reports
+leave-one-out accuracy (one model per held-out example).
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from nlu_classifier import NLUClassifier, load_training_data
+
+
+def percentile(sorted_values, pct):
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * pct / 100))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--batch', type=int, default=64)
+    parser.add_argument('--cross-validate', action='store_true')
+    args = parser.parse_args()
+
+    examples = load_training_data()
+    texts = [text for text, _ in examples]
+
+    start = time.perf_counter()
+    model = NLUClassifier.from_files()
+    print(f"  training: {time.perf_counter() - start:.3f}s on {len(examples)} examples "
+          f"({len(model.vocabulary):,} features, {len(model.intents)} intents)")
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'nlu_classifier.npz')
+        model.save(path)
+        start = time.perf_counter()
+        model = NLUClassifier.load(path)
+        print(f"  artifact: {os.path.getsize(path) / 1024:.0f} KiB, loaded in "
+              f"{(time.perf_counter() - start) * 1000:.1f} ms")
+
+    timings = []
+    for _ in range(args.repeat):
+        for text in texts:
+            start = time.perf_counter()
+            model.parse(text)
+            timings.append(time.perf_counter() - start)
+    timings.sort()
+    print(f"  single parse: p50 {percentile(timings, 50) * 1e6:6.1f} µs, "
+          f"p99 {percentile(timings, 99) * 1e6:6.1f} µs")
+
+    batch = (texts * (args.batch // len(texts) + 1))[:args.batch]
+    best = float('inf')
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        model.parse_batch(batch)
+        best = min(best, time.perf_counter() - start)
+    print(f"  batch of {len(batch)}: {best * 1000:6.2f} ms ({best / len(batch) * 1e6:5.1f} µs per message)")
+
+    if args.cross_validate:
+        correct = 0
+        for i, (text, intent) in enumerate(examples):
+            held_out = NLUClassifier.train(examples[:i] + examples[i + 1:], ngram_range=model.ngram_range,
+                                           threshold=model.threshold,
+                                           ambiguity_threshold=model.ambiguity_threshold)
+            correct += held_out.parse(text)['intent']['name'] == intent
+        print(f"  leave-one-out: {correct}/{len(examples)} held-out examples recognized "
+              f"({correct / len(examples):.0%}, nlu_fallback counts as a miss)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""
+Benchmark quoting: recommend() per row vs recommend_many() on arrays
+
+Usage: python benchmarks/bench_quotes.py [--rows N]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from quotes import recommend, recommend_many
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=200000)
+    args = parser.parse_args()
+
+    usages = np.random.default_rng(0).uniform(100, 5000, args.rows).round()
+    values = usages.tolist()
+
+    start = time.perf_counter()
+    for usage in values:
+        recommend(usage)
+    scalar = time.perf_counter() - start
+
+    start = time.perf_counter()
+    recommend_many(usages)
+    bulk = time.perf_counter() - start
+
+    print(f"  scalar: {scalar * 1e3:8.1f} ms  ({args.rows / scalar:,.0f} rows/s)")
+    print(f"    bulk: {bulk * 1e3:8.1f} ms  ({args.rows / bulk:,.0f} rows/s)  {scalar / bulk:.0f}x")
+
+
+if __name__ == '__main__':
+    main()
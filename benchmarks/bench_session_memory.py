@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Benchmark the memory held by each live conversation
+
+Usage: python benchmarks/bench_session_memory.py [--sessions N]
+
+"before" rebuilds the response catalog per instance, as the chatbot
+constructors used to; "after" is the current engine, which reads the
+shared content version and keeps only its own state in __slots__.
+"""
+
+import argparse
+import gc
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import professional_chatbot
+import simple_chatbot
+from prepared_responses import thaw
+from session_store import ConversationState
+
+
+def per_instance_catalog(engine, content):
+    """The engine as it was: an instance __dict__ with its own copy of the catalog"""
+    class Legacy(engine):
+        def __init__(self):
+            super().__init__()
+            self.catalog = thaw(content.current.responses)
+
+    Legacy.__name__ = engine.__name__
+    return Legacy
+
+
+def bytes_per_session(factory, count):
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    sessions = [factory() for _ in range(count)]
+    allocated = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del sessions
+    return allocated / count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sessions', type=int, default=5000)
+    args = parser.parse_args()
+
+    print(f"  {'bytes per live session':<28} {'before':>8} {'after':>8}")
+    for module, engine in ((professional_chatbot, professional_chatbot.ProfessionalChatbot),
+                           (simple_chatbot, simple_chatbot.SolarChatbot)):
+        before = bytes_per_session(per_instance_catalog(engine, module.CONTENT), args.sessions)
+        after = bytes_per_session(engine, args.sessions)
+        print(f"  {engine.__name__:<28} {before:8.0f} {after:8.0f}  ({before / after:.0f}x smaller)")
+    state = bytes_per_session(ConversationState, args.sessions)
+    print(f"  {'ConversationState':<28} {'':>8} {state:8.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Reproducible benchmark inputs: menu walks, long Turkish free text, entity-rich messages
+
+Every generator takes a seed, so the same inputs are produced on every run
+and results stay comparable with a saved baseline.
+"""
+
+import random
+
+from benchmarks.bench_intent import build_messages
+from dialogue import load_dialogue
+from entities import SCANNER
+
+FREE_TEXT = [
+    'merhaba', 'güneş paneli almak istiyorum', 'fiyatlar ne kadar', 'kurulum nasıl yapılıyor',
+    'bakım gerekiyor mu', 'kredi ile ödeme var mı', 'garanti süresi nedir', 'teşekkürler',
+    'anlamadım', 'bir şey sormak istiyorum'
+]
+
+ENERGY_FORMATS = ['{kwh} kWh', '{kwh:,} kWh', 'aylık {kwh} kilovatsaat', '{mwh} MWh', 'yıllık {year} kwh']
+BILL_FORMATS = ['faturam {tl} TL', 'aylık {tl} lira fatura', '₺{tl} civarı fatura geliyor']
+
+
+def navigation_sequences(count, length=12, seed=1, free_text_ratio=0.1):
+    """Random walks through the dialogue spec's menus, as lists of messages"""
+    rng = random.Random(seed)
+    machine = load_dialogue()
+    tokens_by_state = {}
+    for state, token in machine.transitions:
+        tokens_by_state.setdefault(state, []).append(token)
+    for tokens in tokens_by_state.values():
+        tokens.sort()
+
+    sequences = []
+    for _ in range(count):
+        state = machine.start
+        messages = []
+        for _ in range(length):
+            if rng.random() < free_text_ratio:
+                messages.append(rng.choice(FREE_TEXT))
+                continue
+            token = rng.choice(tokens_by_state[state])
+            # Users type menu choices in any case, with stray spaces
+            messages.append(token.upper() if rng.random() < 0.2 else f" {token}" if rng.random() < 0.1 else token)
+            _, next_state = machine.lookup(state, token)
+            state = next_state or state
+        sequences.append(messages)
+    return sequences
+
+
+def free_text_messages(count, length=400, seed=42):
+    """Long free-text Turkish messages, two thirds with intent keywords"""
+    return build_messages(count, length, seed=seed)
+
+
+def entity_messages(count, seed=7):
+    """Messages mentioning a province or district, a consumption figure and often a bill"""
+    rng = random.Random(seed)
+    names = SCANNER.gazetteer.names
+    places = sorted({district or province for entries in names.values() for province, district in entries})
+    messages = []
+    for _ in range(count):
+        kwh = rng.randrange(150, 3000, 10)
+        parts = [
+            f"{rng.choice(places)}'da oturuyoruz",
+            rng.choice(ENERGY_FORMATS).format(kwh=kwh, mwh=str(kwh / 1000).replace('.', ','), year=kwh * 12)
+        ]
+        if rng.random() < 0.6:
+            parts.append(rng.choice(BILL_FORMATS).format(tl=rng.randrange(300, 5000, 50)))
+        parts.append(rng.choice(FREE_TEXT))
+        rng.shuffle(parts)
+        messages.append(', '.join(parts))
+    return messages
+
+
+def quote_inputs(count, seed=11):
+    """(location, monthly kWh) pairs for calculate_recommendation"""
+    rng = random.Random(seed)
+    provinces = SCANNER.gazetteer.provinces + [None]
+    return [(rng.choice(provinces), rng.randrange(100, 5000)) for _ in range(count)]
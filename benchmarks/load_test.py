@@ -0,0 +1,345 @@
+#!/usr/bin/env python3
+"""
+HTTP load generator that replays data/stories.yml conversations against /api/chat
+
+Each story becomes a multi-turn script: every intent step is replaced by an
+example utterance for that intent from data/nlu.yml, with the story's entity
+values substituted in. Scripts are replayed as independent conversations
+(one sender id each) against app.py or simple_app.py.
+
+Usage:
+    python benchmarks/load_test.py --url http://localhost:5000 --concurrency 20 --duration 60
+    python benchmarks/load_test.py --url http://localhost:5001 --rate 5 --conversations 500 --tts
+    python benchmarks/load_test.py --rasa-stub --concurrency 50   # serve a Rasa stand-in on :5005 too
+
+With --rate, conversations arrive as a Poisson process (open loop) and
+--concurrency caps how many run at once; latency is still per request, and
+the time arrivals wait for a free worker is reported as schedule lag.
+Without --rate, each worker starts a new conversation as soon as its last
+one ends (closed loop).
+"""
+
+import argparse
+import json
+import math
+import os
+import queue
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import defaultdict
+
+import requests
+import yaml
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.rasa_stub import start_stub
+
+STORIES_PATH = os.path.join(ROOT, 'data', 'stories.yml')
+NLU_PATH = os.path.join(ROOT, 'data', 'nlu.yml')
+
+# [value](entity) and [value]{"entity": "entity", ...}
+_ENTITY = re.compile(r'\[([^\]]+)\](?:\((\w+)\)|\{[^}]*"entity"\s*:\s*"(\w+)"[^}]*\})')
+
+
+def parse_examples(path=NLU_PATH):
+    """{intent: [(template, entity_names, example_values)]}; templates have {entity} placeholders"""
+    with open(path, encoding='utf-8') as f:
+        spec = yaml.safe_load(f)
+    examples = {}
+    for block in spec.get('nlu') or []:
+        if 'intent' not in block:
+            continue
+        for line in (block.get('examples') or '').splitlines():
+            line = line.strip()
+            if not line.startswith('- '):
+                continue
+            text = line[2:].strip()
+            pieces = []
+            default = {}
+            position = 0
+            for match in _ENTITY.finditer(text):
+                name = match.group(2) or match.group(3)
+                pieces.append(text[position:match.start()].replace('{', '{{').replace('}', '}}'))
+                pieces.append('{' + name + '}')
+                default[name] = match.group(1)
+                position = match.end()
+            pieces.append(text[position:].replace('{', '{{').replace('}', '}}'))
+            template = ''.join(pieces)
+            names = list(default)
+            examples.setdefault(block['intent'], []).append((template, frozenset(names), default))
+    return examples
+
+
+def _story_steps(steps):
+    """Flatten a story's steps into (intent, {entity: value}) turns"""
+    turns = []
+    for step in steps or []:
+        if 'or' in step:
+            turns.extend(_story_steps(step['or'][:1]))
+        elif 'intent' in step:
+            entities = {}
+            for entity in step.get('entities') or []:
+                if isinstance(entity, dict):
+                    entities.update(entity)
+            turns.append((step['intent'], entities))
+    return turns
+
+
+def build_scripts(stories_path=STORIES_PATH, nlu_path=NLU_PATH, seed=0, variants=5):
+    """Turn every story into `variants` conversation scripts of (intent, text) turns"""
+    rng = random.Random(seed)
+    examples = parse_examples(nlu_path)
+    with open(stories_path, encoding='utf-8') as f:
+        stories = yaml.safe_load(f).get('stories') or []
+
+    scripts = []
+    for story in stories:
+        turns = _story_steps(story.get('steps'))
+        if not turns:
+            continue
+        for _ in range(variants):
+            script = []
+            for intent, entities in turns:
+                candidates = examples.get(intent) or [(intent.replace('_', ' '), frozenset(), {})]
+                matching = [c for c in candidates if c[1] == frozenset(entities)] or candidates
+                template, names, default = rng.choice(matching)
+                values = {name: default.get(name, '') for name in names}
+                values.update({name: _format_value(value) for name, value in entities.items() if name in names})
+                script.append((intent, template.format(**values)))
+            scripts.append({'story': story.get('story', 'story'), 'turns': script})
+    return scripts
+
+
+def _format_value(value):
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def reply_text(body):
+    """The first text of a chat reply from app.py ([{'text'}]) or simple_app.py ([{'content'|'title'}])"""
+    if isinstance(body, list) and body and isinstance(body[0], dict):
+        first = body[0]
+        return first.get('text') or first.get('content') or first.get('title') or ''
+    return ''
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def _stats(records, elapsed):
+    latencies = sorted(seconds for seconds, _ in records)
+    errors = sum(1 for _, ok in records if not ok)
+    return {
+        'requests': len(records),
+        'errors': errors,
+        'error_rate': round(errors / len(records), 4) if records else 0.0,
+        'throughput_rps': round(len(records) / elapsed, 2) if elapsed else 0.0,
+        'p50_ms': round(percentile(latencies, 50) * 1000, 2) if latencies else None,
+        'p95_ms': round(percentile(latencies, 95) * 1000, 2) if latencies else None,
+        'p99_ms': round(percentile(latencies, 99) * 1000, 2) if latencies else None
+    }
+
+
+class Recorder:
+    """Thread-safe collection of (endpoint, intent, seconds, ok) samples"""
+
+    def __init__(self):
+        self.samples = []
+        self.lags = []
+        self.conversations = 0
+        self._lock = threading.Lock()
+
+    def record(self, endpoint, intent, seconds, ok):
+        with self._lock:
+            self.samples.append((endpoint, intent, seconds, ok))
+
+    def conversation_started(self, lag=None):
+        with self._lock:
+            self.conversations += 1
+            if lag is not None:
+                self.lags.append(lag)
+
+    def summary(self, elapsed):
+        by_endpoint = defaultdict(list)
+        by_intent = defaultdict(list)
+        with self._lock:
+            samples = list(self.samples)
+            lags = sorted(self.lags)
+        for endpoint, intent, seconds, ok in samples:
+            by_endpoint[endpoint].append((seconds, ok))
+            by_intent[f"{endpoint} {intent}"].append((seconds, ok))
+        return {
+            'elapsed_seconds': round(elapsed, 2),
+            'conversations': self.conversations,
+            'overall': _stats([(seconds, ok) for _, _, seconds, ok in samples], elapsed),
+            'endpoints': {name: _stats(records, elapsed) for name, records in sorted(by_endpoint.items())},
+            'intents': {name: _stats(records, elapsed) for name, records in sorted(by_intent.items())},
+            'schedule_lag_ms': {
+                'p50': round(percentile(lags, 50) * 1000, 2) if lags else None,
+                'p99': round(percentile(lags, 99) * 1000, 2) if lags else None
+            }
+        }
+
+
+def _timed_post(session, url, payload, timeout):
+    start = time.perf_counter()
+    try:
+        response = session.post(url, json=payload, timeout=timeout)
+        ok = 200 <= response.status_code < 300
+        body = response.json() if ok else None
+    except (requests.RequestException, ValueError):
+        ok, body = False, None
+    return time.perf_counter() - start, ok, body
+
+
+def run_conversation(session, base_url, script, recorder, tts=False, think_time=0.0, timeout=10):
+    sender = f"load-{uuid.uuid4().hex[:12]}"
+    for turn, (intent, text) in enumerate(script['turns']):
+        if turn and think_time:
+            time.sleep(think_time)
+        seconds, ok, body = _timed_post(session, base_url + '/api/chat', {'sender': sender, 'message': text}, timeout)
+        recorder.record('/api/chat', intent, seconds, ok)
+        if tts and ok:
+            text = reply_text(body)
+            if text:
+                seconds, ok, _ = _timed_post(session, base_url + '/api/tts', {'text': text[:200]}, timeout)
+                recorder.record('/api/tts', intent, seconds, ok)
+
+
+def run_load(base_url, scripts, concurrency=10, rate=None, duration=None, conversations=None,
+             tts=False, think_time=0.0, timeout=10, seed=0):
+    """Replay scripts against base_url and return the summary dict"""
+    if duration is None and conversations is None:
+        duration = 30
+    base_url = base_url.rstrip('/')
+    rng = random.Random(seed)
+    recorder = Recorder()
+    # Closed loop: at most one waiting conversation per worker
+    jobs = queue.Queue(maxsize=0 if rate else concurrency)
+    stop = threading.Event()
+
+    def worker():
+        session = requests.Session()
+        while True:
+            job = jobs.get()
+            if job is None:
+                return
+            script, due = job
+            recorder.conversation_started(max(0.0, time.perf_counter() - due) if due is not None else None)
+            run_conversation(session, base_url, script, recorder, tts, think_time, timeout)
+
+    workers = [threading.Thread(target=worker, name=f'load-worker-{i}', daemon=True) for i in range(concurrency)]
+    for thread in workers:
+        thread.start()
+
+    started = time.perf_counter()
+    deadline = started + duration if duration else None
+    issued = 0
+    next_due = started
+    try:
+        while not stop.is_set():
+            if conversations is not None and issued >= conversations:
+                break
+            now = time.perf_counter()
+            if deadline and now >= deadline:
+                break
+            if rate:
+                if next_due > now:
+                    time.sleep(min(next_due - now, 0.05))
+                    continue
+                jobs.put((rng.choice(scripts), next_due))
+                next_due += rng.expovariate(rate)
+            else:
+                try:
+                    jobs.put((rng.choice(scripts), None), timeout=0.05)
+                except queue.Full:
+                    continue
+            issued += 1
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for _ in workers:
+            jobs.put(None)
+        for thread in workers:
+            thread.join()
+
+    return recorder.summary(time.perf_counter() - started)
+
+
+def format_report(summary):
+    header = f"{summary['conversations']} conversations in {summary['elapsed_seconds']}s"
+    if summary['schedule_lag_ms']['p50'] is not None:
+        header += f"; schedule lag p50 {summary['schedule_lag_ms']['p50']} ms, p99 {summary['schedule_lag_ms']['p99']} ms"
+    lines = [header,
+             '',
+             f"{'endpoint / intent':<44} {'reqs':>7} {'rps':>8} {'err%':>6} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}"]
+
+    def row(name, stats):
+        fmt = lambda value: f"{value:8.1f}" if value is not None else f"{'-':>8}"
+        return (f"{name:<44} {stats['requests']:>7} {stats['throughput_rps']:>8.1f} {stats['error_rate'] * 100:>6.1f} "
+                f"{fmt(stats['p50_ms'])} {fmt(stats['p95_ms'])} {fmt(stats['p99_ms'])}")
+
+    lines.append(row('ALL', summary['overall']))
+    for name, stats in summary['endpoints'].items():
+        lines.append(row(name, stats))
+    lines.append('')
+    for name, stats in summary['intents'].items():
+        lines.append(row(name, stats))
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay Rasa stories against /api/chat under load")
+    parser.add_argument('--url', default='http://localhost:5000', help="app.py (5000) or simple_app.py (5001)")
+    parser.add_argument('--concurrency', type=int, default=10, help="conversations in flight at once")
+    parser.add_argument('--rate', type=float, help="new conversations per second (open loop)")
+    parser.add_argument('--duration', type=float, help="seconds to run (default 30 unless --conversations)")
+    parser.add_argument('--conversations', type=int, help="stop after this many conversations")
+    parser.add_argument('--think-time', type=float, default=0.0, help="seconds between turns")
+    parser.add_argument('--tts', action='store_true', help="also request /api/tts for each reply")
+    parser.add_argument('--timeout', type=float, default=10)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--stories', default=STORIES_PATH)
+    parser.add_argument('--nlu', default=NLU_PATH)
+    parser.add_argument('--rasa-stub', action='store_true', help="serve a Rasa stand-in while the test runs")
+    parser.add_argument('--rasa-stub-port', type=int, default=5005)
+    parser.add_argument('--rasa-stub-latency-ms', type=float, default=40)
+    parser.add_argument('--json', help="write the summary to this file")
+    args = parser.parse_args(argv)
+
+    stub = None
+    if args.rasa_stub:
+        stub = start_stub(port=args.rasa_stub_port, latency=args.rasa_stub_latency_ms / 1000)
+        print(f"Rasa stub on http://127.0.0.1:{args.rasa_stub_port}")
+
+    scripts = build_scripts(args.stories, args.nlu, seed=args.seed)
+    print(f"{len(scripts)} conversation scripts from {os.path.relpath(args.stories, ROOT)}")
+    try:
+        summary = run_load(args.url, scripts, args.concurrency, args.rate, args.duration, args.conversations,
+                           args.tts, args.think_time, args.timeout, args.seed)
+    finally:
+        if stub is not None:
+            stub.shutdown()
+
+    print(format_report(summary))
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(summary, f, indent=2)
+            f.write('\n')
+    return 1 if summary['overall']['requests'] == 0 else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
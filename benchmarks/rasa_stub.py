@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the Rasa REST server, for load tests without a trained model
+
+Answers GET / like Rasa's root endpoint and POST /webhooks/rest/webhook with
+a canned reply after a configurable delay, so app.py's proxy path, pool and
+circuit breaker see realistic traffic.
+
+Usage: python benchmarks/rasa_stub.py [--port 5005] [--latency-ms 40] [--jitter-ms 20] [--error-rate 0]
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class RasaStubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, body, content_type='application/json'):
+        data = body.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        if self.path == '/':
+            self._send(200, 'Hello from Rasa: stub', 'text/plain')
+        else:
+            self._send(404, '{"error": "not found"}')
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length)
+        if self.path != '/webhooks/rest/webhook':
+            self._send(404, '{"error": "not found"}')
+            return
+
+        config = self.server.config
+        delay = max(0.0, random.gauss(config['latency'], config['jitter']))
+        time.sleep(delay)
+        if random.random() < config['error_rate']:
+            self._send(500, '{"error": "stub failure"}')
+            return
+
+        try:
+            payload = json.loads(body or b'{}')
+        except ValueError:
+            self._send(400, '{"error": "invalid JSON"}')
+            return
+        reply = [{'recipient_id': payload.get('sender', 'user'),
+                  'text': f"Stub reply to: {payload.get('message', '')}"}]
+        self._send(200, json.dumps(reply))
+
+
+def start_stub(host='127.0.0.1', port=5005, latency=0.04, jitter=0.02, error_rate=0.0):
+    """Serve the stub on a background thread; returns the server (call shutdown() to stop)"""
+    server = ThreadingHTTPServer((host, port), RasaStubHandler)
+    server.daemon_threads = True
+    server.config = {'latency': latency, 'jitter': jitter, 'error_rate': error_rate}
+    threading.Thread(target=server.serve_forever, name='rasa-stub', daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rasa REST stand-in for load tests")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=5005)
+    parser.add_argument('--latency-ms', type=float, default=40)
+    parser.add_argument('--jitter-ms', type=float, default=20)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    args = parser.parse_args()
+
+    server = start_stub(args.host, args.port, args.latency_ms / 1000, args.jitter_ms / 1000, args.error_rate)
+    print(f"Rasa stub listening on http://{args.host}:{server.server_address[1]}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
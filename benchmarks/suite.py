@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+In-process benchmark suite for SolarChatbot and ProfessionalChatbot
+
+Usage:
+    python benchmarks/suite.py --save               # record a baseline
+    python benchmarks/suite.py                      # compare, exit 1 on regression
+    python benchmarks/suite.py --threshold 0.1 --filter professional
+
+Each case reports ops/sec (best of --repeat timed samples), the peak traced
+allocation per operation and the memory blocks still allocated per
+operation after a pass. Baselines are plain JSON and machine specific:
+record one on the machine that runs the comparison.
+"""
+
+import argparse
+import gc
+import json
+import math
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from array import array
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks import fixtures
+from professional_chatbot import ProfessionalChatbot
+from simple_chatbot import SolarChatbot
+
+DEFAULT_BASELINE = os.path.join(ROOT, 'benchmarks', 'baseline.json')
+
+
+class Case:
+    """One benchmark: an operation applied to each input in turn"""
+
+    def __init__(self, name, op, inputs, reset=None):
+        self.name = name
+        self.op = op
+        self.inputs = inputs
+        self.reset = reset
+
+    def run_pass(self):
+        if self.reset:
+            self.reset()
+        op = self.op
+        start = time.perf_counter()
+        for item in self.inputs:
+            op(item)
+        return time.perf_counter() - start
+
+
+def build_cases(scale=1.0):
+    """All suite cases; scale multiplies the fixture sizes"""
+    n = lambda count: max(1, int(count * scale))
+
+    navigation = [message for sequence in fixtures.navigation_sequences(n(100)) for message in sequence]
+    free_text = fixtures.free_text_messages(n(300))
+    entity_rich = fixtures.entity_messages(n(500))
+    quotes = fixtures.quote_inputs(n(2000))
+    mixed = [message for pair in zip(free_text, entity_rich) for message in pair]
+
+    simple = SolarChatbot()
+    professional = ProfessionalChatbot()
+
+    def at_menu_start(message):
+        professional.current_state = 'MAIN_MENU'
+        return professional.get_intent(message)
+
+    return [
+        Case('simple.get_intent.free_text', simple.get_intent, free_text),
+        Case('simple.extract_entities.entity_rich', simple.extract_entities, entity_rich),
+        Case('simple.get_response.mixed', simple.get_response, mixed, reset=simple.reset_conversation),
+        Case('simple.calculate_recommendation', lambda args: simple.calculate_recommendation(*args), quotes),
+        Case('professional.get_intent.navigation', professional.get_intent, navigation,
+             reset=professional.reset_conversation),
+        Case('professional.get_intent.free_text', at_menu_start, free_text),
+        Case('professional.extract_entities.entity_rich', professional.extract_entities, entity_rich),
+        Case('professional.get_response_json.navigation', professional.get_response_json, navigation,
+             reset=professional.reset_conversation),
+        Case('professional.calculate_recommendation', lambda args: professional.calculate_recommendation(*args),
+             quotes),
+    ]
+
+
+def measure(case, repeat=5, min_time=0.2):
+    """Time and allocation figures for one case.
+
+    Each of the `repeat` samples runs enough passes to last at least
+    `min_time` seconds, with the garbage collector off as in timeit; the
+    fastest sample is reported.
+    """
+    random.seed(0)
+    passes = max(1, math.ceil(min_time / case.run_pass()))  # also warms caches
+
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        best = min(sum(case.run_pass() for _ in range(passes)) / passes for _ in range(repeat))
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+    count = len(case.inputs)
+    # Preallocated so recording a peak does not allocate
+    peaks = array('q', bytes(8 * count))
+    if case.reset:
+        case.reset()
+    tracemalloc.start()
+    blocks_before = sys.getallocatedblocks()
+    for i, item in enumerate(case.inputs):
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        case.op(item)
+        peaks[i] = tracemalloc.get_traced_memory()[1] - current
+    retained = sys.getallocatedblocks() - blocks_before
+    tracemalloc.stop()
+
+    return {
+        'ops': count,
+        'ops_per_sec': round(count / best, 1),
+        'peak_bytes_per_op': round(statistics.median(peaks)),
+        'retained_blocks_per_op': round(retained / count, 3)
+    }
+
+
+def run_suite(cases, repeat=5, name_filter=None, min_time=0.2):
+    results = {}
+    for case in cases:
+        if name_filter and name_filter not in case.name:
+            continue
+        results[case.name] = measure(case, repeat, min_time)
+    return {
+        'meta': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'recorded_at': datetime.now().isoformat(timespec='seconds')
+        },
+        'results': results
+    }
+
+
+def compare(results, baseline, threshold=0.25, alloc_threshold=0.25):
+    """Return (rows, regressions) comparing results to a baseline.
+
+    A case regresses when its ops/sec drops by more than `threshold` or its
+    peak allocation per op grows by more than `alloc_threshold` (plus 64
+    bytes of slack for tiny operations).
+    """
+    rows = []
+    regressions = []
+    for name, current in results['results'].items():
+        previous = baseline.get('results', {}).get(name)
+        if previous is None:
+            rows.append((name, current, None, None, 'new'))
+            continue
+        speed = current['ops_per_sec'] / previous['ops_per_sec'] - 1
+        alloc_limit = previous['peak_bytes_per_op'] * (1 + alloc_threshold) + 64
+        problems = []
+        if speed < -threshold:
+            problems.append(f"{-speed:.0%} slower")
+        if current['peak_bytes_per_op'] > alloc_limit:
+            problems.append(f"allocates {current['peak_bytes_per_op']:,} B/op (was {previous['peak_bytes_per_op']:,})")
+        status = '; '.join(problems) if problems else 'ok'
+        rows.append((name, current, previous, speed, status))
+        if problems:
+            regressions.append((name, status))
+    return rows, regressions
+
+
+def format_report(rows):
+    lines = [f"{'case':<46} {'ops/sec':>12} {'change':>8} {'peak B/op':>10} {'kept/op':>8}  status"]
+    for name, current, previous, speed, status in rows:
+        change = f"{speed:+.0%}" if speed is not None else '-'
+        lines.append(f"{name:<46} {current['ops_per_sec']:>12,.0f} {change:>8} "
+                     f"{current['peak_bytes_per_op']:>10,} {current['retained_blocks_per_op']:>8.2f}  {status}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Chatbot engine benchmark suite")
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help="baseline JSON file")
+    parser.add_argument('--save', action='store_true', help="write the results as the new baseline")
+    parser.add_argument('--output', help="also write the results to this JSON file")
+    parser.add_argument('--threshold', type=float, default=0.25, help="allowed ops/sec drop (0.25 = 25%%)")
+    parser.add_argument('--alloc-threshold', type=float, default=0.25, help="allowed peak allocation growth")
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--min-time', type=float, default=0.2, help="minimum seconds per timing sample")
+    parser.add_argument('--scale', type=float, default=1.0, help="fixture size multiplier")
+    parser.add_argument('--filter', help="only run cases whose name contains this")
+    args = parser.parse_args(argv)
+
+    results = run_suite(build_cases(args.scale), args.repeat, args.filter, args.min_time)
+
+    baseline = None
+    if not args.save and os.path.exists(args.baseline):
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+
+    rows, regressions = compare(results, baseline or {}, args.threshold, args.alloc_threshold)
+    print(format_report(rows))
+
+    for path in filter(None, [args.output, args.baseline if args.save else None]):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+            f.write('\n')
+        print(f"📝 Results written to {path}")
+
+    if baseline is None and not args.save:
+        print(f"ℹ️  No baseline at {args.baseline}; run with --save to record one")
+    if regressions:
+        print(f"❌ {len(regressions)} case(s) regressed past the threshold")
+        return 1
+    if baseline is not None:
+        print("✅ No regressions against the baseline")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,10 @@
+#!/usr/bin/env python3
+"""
+Shared test setup
+"""
+
+import os
+
+# simple_app and app open a JSONL conversation log under logs/conversations/ when they are
+# imported; tests that need one pass their own, so keep the real log out of test runs
+os.environ['CHATBOT_LOG_BACKEND'] = 'off'
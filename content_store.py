@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Hot-reloadable chatbot content: responses and keyword files compiled off to the side
+
+A ContentStore holds the compiled content of a set of data files in one
+attribute, `current`. reload() reads and compiles the files into a new
+object while requests keep answering from the old one, then swaps it in
+with a single assignment. A request that read `current` before the swap
+finishes on the old version; readers never take a lock. A file that fails
+to load or validate leaves the running version in place.
+"""
+
+import os
+import threading
+import time
+
+import yaml
+
+from admin import is_admin
+from entities import SafeLoader
+from prepared_responses import freeze
+
+CONTENT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'content')
+
+
+class ContentError(ValueError):
+    """Raised when a content file is missing required entries or has the wrong shape"""
+
+
+def load_yaml(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return yaml.load(f, Loader=SafeLoader)
+
+
+def load_responses(path):
+    """Load a response catalog (intent -> list of variants) and freeze it"""
+    catalog = load_yaml(path)
+    if not isinstance(catalog, dict) or 'default' not in catalog:
+        raise ContentError(f"{path}: a response catalog needs a 'default' intent")
+    for intent, variants in catalog.items():
+        if not isinstance(variants, list) or not variants:
+            raise ContentError(f"{path}: intent '{intent}' needs a non-empty list of variants")
+        for variant in variants:
+            if not isinstance(variant, (str, dict)):
+                raise ContentError(f"{path}: variants of '{intent}' must be text or a menu/list dict")
+    return freeze(catalog)
+
+
+class ContentStore:
+    """The current compiled content of some data files, reloaded as they change"""
+
+    def __init__(self, name, paths, build):
+        """build(paths) reads the files and returns the compiled content object"""
+        self.name = name
+        self.paths = tuple(paths)
+        self._build = build
+        # Serializes reloads only; readers never touch it
+        self._reload_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._watcher = None
+
+        self.version = 0
+        self.reloads = 0
+        self.reload_errors = 0
+        self.last_error = None
+        self.loaded_at = None
+        self.load_ms = None
+        self._signature = self._file_signature()
+        started = time.perf_counter()
+        # Startup loads in the foreground: there is nothing older to fall back on
+        self.current = build(self.paths)
+        self._loaded(started)
+
+    def _file_signature(self):
+        signature = []
+        for path in self.paths:
+            try:
+                stat = os.stat(path)
+                signature.append((stat.st_mtime_ns, stat.st_size))
+            except OSError:
+                signature.append(None)
+        return tuple(signature)
+
+    def _loaded(self, started):
+        self.version += 1
+        self.loaded_at = time.time()
+        self.load_ms = round((time.perf_counter() - started) * 1000, 1)
+
+    def changed(self):
+        """True when a data file was modified since the running version was read"""
+        return self._file_signature() != self._signature
+
+    def reload(self, force=False):
+        """Rebuild from the files and swap the result in; False if unchanged, busy or invalid"""
+        if not self._reload_lock.acquire(blocking=False):
+            # Another reload is already reading the files
+            return False
+        try:
+            # Taken before reading, so an edit made during the build triggers another reload
+            signature = self._file_signature()
+            if not force and signature == self._signature:
+                return False
+            started = time.perf_counter()
+            try:
+                content = self._build(self.paths)
+            except Exception as e:
+                self.reload_errors += 1
+                self.last_error = str(e)
+                print(f"⚠️  {self.name} content not reloaded, keeping version {self.version}: {e}")
+                return False
+            # The swap: requests that start after this line see the new version
+            self.current = content
+            self._signature = signature
+            self.reloads += 1
+            self.last_error = None
+            self._loaded(started)
+            print(f"🔄 {self.name} content reloaded (version {self.version}, {self.load_ms} ms)")
+            return True
+        finally:
+            self._reload_lock.release()
+
+    def watch(self, interval=2.0):
+        """Poll the files' modification times every interval seconds and reload on change"""
+        if self._watcher is not None or interval <= 0:
+            return
+        self._stop.clear()
+
+        def run():
+            while not self._stop.wait(interval):
+                if self.changed():
+                    self.reload()
+
+        self._watcher = threading.Thread(target=run, name=f'{self.name}-content-watcher', daemon=True)
+        self._watcher.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._watcher is not None:
+            self._watcher.join()
+            self._watcher = None
+
+    def stats(self):
+        return {
+            'version': self.version,
+            'files': [os.path.basename(path) for path in self.paths],
+            'loaded_at': self.loaded_at,
+            'load_ms': self.load_ms,
+            'reloads': self.reloads,
+            'reload_errors': self.reload_errors,
+            'last_error': self.last_error,
+            'watching': self._watcher is not None
+        }
+
+
+def install_content_admin(app, stores, admin_token=None):
+    """Add /admin/content: GET shows each store's version, POST reloads them now.
+
+    Same access rule as the other /admin endpoints: without admin_token only
+    local requests may reload, not ones the ngrok tunnel forwards. The reload
+    runs on the admin request's thread; chat requests keep answering meanwhile.
+    """
+    from flask import jsonify, request
+
+    @app.route('/admin/content', methods=['GET', 'POST'])
+    def content_admin():
+        """Show content versions, or reload changed files ({"force": true} reloads regardless)"""
+        if not is_admin(request, admin_token):
+            return jsonify({'error': 'Forbidden'}), 403
+        reloaded = {}
+        if request.method == 'POST':
+            force = bool((request.get_json(silent=True) or {}).get('force'))
+            reloaded = {store.name: store.reload(force=force) for store in stores}
+        return jsonify({store.name: dict(store.stats(), reloaded=reloaded.get(store.name, False))
+                        for store in stores})
+
+    return app
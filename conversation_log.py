@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+Conversation turn log: a bounded queue drained in batches by a background writer
+
+Request threads only build a small dict and put it on the queue; a single
+writer thread appends whatever has queued up to a JSONL file per day or a
+SQLite database in WAL mode. When the queue is full the configured policy
+decides whether to drop the new event, drop the oldest one or wait.
+"""
+
+import json
+import os
+import queue
+import threading
+import time
+
+DROP_NEWEST = 'drop_newest'
+DROP_OLDEST = 'drop_oldest'
+BLOCK = 'block'
+POLICIES = (DROP_NEWEST, DROP_OLDEST, BLOCK)
+
+FIELDS = ('ts', 'app', 'sender', 'message', 'state_before', 'state_after', 'intent', 'entities', 'latency_ms')
+
+
+class JsonlWriter:
+    """Appends events to <directory>/<prefix>-YYYY-MM-DD.jsonl, one file per UTC day"""
+    name = 'jsonl'
+
+    def __init__(self, directory, prefix='conversations'):
+        self.directory = directory
+        self.prefix = prefix
+        self._day = None
+        self._file = None
+
+    def path_for(self, day):
+        return os.path.join(self.directory, f"{self.prefix}-{day}.jsonl")
+
+    def write(self, events):
+        lines_by_day = {}
+        for event in events:
+            day = time.strftime('%Y-%m-%d', time.gmtime(event['ts']))
+            lines_by_day.setdefault(day, []).append(json.dumps(event, ensure_ascii=False) + "\n")
+        for day, lines in lines_by_day.items():
+            if day != self._day:
+                self.close()
+                os.makedirs(self.directory, exist_ok=True)
+                self._file = open(self.path_for(day), 'a', encoding='utf-8')
+                self._day = day
+            self._file.write(''.join(lines))
+        self._file.flush()
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            self._day = None
+
+
+class SqliteWriter:
+    """Inserts events into a `turns` table of a SQLite database in WAL mode"""
+    name = 'sqlite'
+
+    def __init__(self, path):
+        self.path = path
+        self._connection = None
+
+    def _connect(self):
+        # Opened on the writer thread: sqlite3 connections stay on the thread that made them
+        import sqlite3
+
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        connection = sqlite3.connect(self.path)
+        connection.execute('PRAGMA journal_mode=WAL')
+        connection.execute('PRAGMA synchronous=NORMAL')
+        connection.execute("""CREATE TABLE IF NOT EXISTS turns (
+            ts REAL, app TEXT, sender TEXT, message TEXT, state_before TEXT, state_after TEXT,
+            intent TEXT, entities TEXT, latency_ms REAL)""")
+        connection.execute('CREATE INDEX IF NOT EXISTS turns_ts ON turns (ts)')
+        return connection
+
+    def write(self, events):
+        if self._connection is None:
+            self._connection = self._connect()
+        rows = [tuple(json.dumps(event[field], ensure_ascii=False) if field == 'entities' else event[field]
+                      for field in FIELDS) for event in events]
+        with self._connection:
+            self._connection.executemany(f"INSERT INTO turns VALUES ({', '.join('?' * len(FIELDS))})", rows)
+
+    def close(self):
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+
+class ConversationLog:
+    """Non-blocking front end for a writer; call close() to drain and stop"""
+
+    def __init__(self, writer, max_queue=10000, batch_size=500, policy=DROP_NEWEST, block_timeout=0.05):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown drop policy '{policy}' (choose from {', '.join(POLICIES)})")
+        self.writer = writer
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self.policy = policy
+        self.block_timeout = block_timeout
+
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        self._settled_changed = threading.Condition(self._lock)
+        self._closed = False
+        self._stopping = threading.Event()
+        # Queued events that have since been written, failed to write or been evicted
+        self._settled = 0
+
+        self.enqueued = 0
+        self.dropped = 0
+        self.written = 0
+        self.batches = 0
+        self.write_errors = 0
+
+        self._thread = threading.Thread(target=self._run, name='conversation-log', daemon=True)
+        self._thread.start()
+
+    def log_turn(self, app, sender, message, state_before, state_after, intent, entities, latency):
+        """Queue one conversation turn; never blocks unless the policy is 'block'"""
+        return self.put({
+            'ts': time.time(),
+            'app': app,
+            'sender': sender,
+            'message': message,
+            'state_before': state_before,
+            'state_after': state_after,
+            'intent': intent,
+            'entities': entities,
+            'latency_ms': round(latency * 1000, 3)
+        })
+
+    def put(self, event):
+        """Queue an event dict, applying the drop policy when the queue is full"""
+        if self._closed:
+            self._settle(rejected=1)
+            return False
+        try:
+            if self.policy == BLOCK:
+                self._queue.put(event, timeout=self.block_timeout)
+            else:
+                self._queue.put_nowait(event)
+        except queue.Full:
+            if self.policy != DROP_OLDEST:
+                self._settle(rejected=1)
+                return False
+            # Make room by discarding the oldest queued event
+            try:
+                self._queue.get_nowait()
+                self._settle(dropped=1)
+            except queue.Empty:
+                pass
+            try:
+                self._queue.put_nowait(event)
+            except queue.Full:
+                self._settle(rejected=1)
+                return False
+        with self._lock:
+            self.enqueued += 1
+        return True
+
+    def _run(self):
+        while True:
+            try:
+                batch = [self._queue.get(timeout=0.1)]
+            except queue.Empty:
+                if self._stopping.is_set():
+                    # Closed here because SQLite connections belong to the thread that opened them
+                    self.writer.close()
+                    return
+                continue
+            # Take whatever else has queued up, without waiting
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            self._write(batch)
+
+    def _write(self, batch):
+        try:
+            self.writer.write(batch)
+        except Exception as e:
+            print(f"Error writing conversation log: {e}")
+            self._settle(dropped=len(batch), write_errors=1)
+            return
+        self._settle(written=len(batch), batches=1)
+
+    def _settle(self, written=0, dropped=0, rejected=0, batches=0, write_errors=0):
+        # Rejected events never reached the queue, so flush() does not wait for them
+        with self._settled_changed:
+            self.written += written
+            self.dropped += dropped + rejected
+            self.batches += batches
+            self.write_errors += write_errors
+            self._settled += written + dropped
+            self._settled_changed.notify_all()
+
+    def flush(self, timeout=5.0):
+        """Wait until every event queued so far has been written (or dropped); False on timeout"""
+        with self._settled_changed:
+            return self._settled_changed.wait_for(lambda: self._settled >= self.enqueued, timeout)
+
+    def close(self, timeout=10.0):
+        """Stop accepting events, write everything still queued and close the writer"""
+        if self._closed:
+            return
+        self._closed = True
+        self._stopping.set()
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            print("Conversation log writer did not finish draining in time")
+            return
+        # Events queued by threads that raced close()
+        leftovers = []
+        while True:
+            try:
+                leftovers.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        if leftovers:
+            self._write(leftovers)
+            self.writer.close()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'backend': self.writer.name,
+                'policy': self.policy,
+                'queued': self._queue.qsize(),
+                'max_queue': self.max_queue,
+                'enqueued': self.enqueued,
+                'written': self.written,
+                'dropped': self.dropped,
+                'batches': self.batches,
+                'write_errors': self.write_errors
+            }
+
+
+def log_from_env(default_directory):
+    """ConversationLog configured by CHATBOT_LOG_* environment variables, or None when off"""
+    backend = os.environ.get('CHATBOT_LOG_BACKEND', 'jsonl')
+    if backend == 'off':
+        return None
+    path = os.environ.get('CHATBOT_LOG_PATH')
+    if backend == 'jsonl':
+        writer = JsonlWriter(path or default_directory)
+    elif backend == 'sqlite':
+        writer = SqliteWriter(path or os.path.join(default_directory, 'conversations.db'))
+    else:
+        raise ValueError(f"Unknown conversation log backend '{backend}' (choose from jsonl, sqlite, off)")
+    return ConversationLog(writer,
+                           max_queue=int(os.environ.get('CHATBOT_LOG_QUEUE', 10000)),
+                           batch_size=int(os.environ.get('CHATBOT_LOG_BATCH', 500)),
+                           policy=os.environ.get('CHATBOT_LOG_POLICY', DROP_NEWEST))
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Table-driven dialogue state machine compiled from a YAML/JSON menu spec
+"""
+
+import json
+import os
+from collections import deque
+
+import yaml
+
+from fuzzy_matcher import FuzzyIndex, FuzzyKeywords
+
+DEFAULT_SPEC_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'content', 'dialogue.yml')
+
+
+class DialogueSpecError(ValueError):
+    """Raised when a dialogue spec is malformed, ambiguous or has unreachable states"""
+
+
+def normalize(message):
+    """Normalize a message the same way spec tokens are normalized"""
+    return message.lower().strip()
+
+
+class DialogueMachine:
+    """Compiled menu tree: one hashed lookup per turn"""
+
+    def __init__(self, start, transitions, keywords, defaults):
+        self.start = start
+        # (state, normalized_token) -> (intent, next_state or None)
+        self.transitions = transitions
+        # [(keywords, intent)] matched anywhere in the message
+        self.keywords = keywords
+        # state -> intent used when nothing else matches
+        self.defaults = defaults
+        # Typo-tolerant fallbacks for the tokens and keyword rules above
+        self._fuzzy_tokens = FuzzyIndex({token for _, token in transitions})
+        self._fuzzy_keywords = FuzzyKeywords((intent, words) for words, intent in keywords)
+
+    @property
+    def states(self):
+        return list(self.defaults)
+
+    def lookup(self, state, token):
+        """Return (intent, next_state) for an exact token, or None"""
+        return self.transitions.get((state, token))
+
+    def match_keywords(self, message_lower):
+        """Return the intent of the first keyword rule found in the message, or None"""
+        for words, intent in self.keywords:
+            if any(word in message_lower for word in words):
+                return intent
+        return None
+
+    def fuzzy_lookup(self, state, message_lower):
+        """(intent, next_state or None) for a misspelled token or keyword, or None.
+
+        Meant for messages that matched nothing exactly: a whole message within
+        one edit of a token of this state, then a keyword rule, in rule order.
+        """
+        for token in self._fuzzy_tokens.lookup(message_lower):
+            transition = self.transitions.get((state, token))
+            if transition:
+                return transition
+        intents = self._fuzzy_keywords.find_groups(message_lower)
+        for _, intent in self.keywords:
+            if intent in intents:
+                return intent, None
+        return None
+
+    def default_intent(self, state):
+        return self.defaults.get(state) or 'default'
+
+
+def compile_dialogue(spec):
+    """Validate a spec dict and compile it into a DialogueMachine"""
+    states = spec.get('states') or {}
+    if not states:
+        raise DialogueSpecError("Dialogue spec declares no states")
+
+    start = spec.get('start')
+    if start not in states:
+        raise DialogueSpecError(f"Start state '{start}' is not declared")
+
+    global_spec = spec.get('global') or {}
+    keywords = []
+    for rule in global_spec.get('keywords') or []:
+        words = tuple(normalize(word) for word in rule.get('keywords') or [])
+        if not words or not rule.get('intent'):
+            raise DialogueSpecError(f"Keyword rule needs keywords and an intent: {rule}")
+        keywords.append((words, rule['intent']))
+
+    def compile_rules(rules, where):
+        table = {}
+        for rule in rules or []:
+            intent = rule.get('intent')
+            next_state = rule.get('next')
+            if not intent:
+                raise DialogueSpecError(f"Transition in {where} has no intent: {rule}")
+            if next_state is not None and next_state not in states:
+                raise DialogueSpecError(f"Transition in {where} targets unknown state '{next_state}'")
+            for token in rule.get('tokens') or []:
+                token = normalize(str(token))
+                if token in table and table[token] != (intent, next_state):
+                    raise DialogueSpecError(f"Ambiguous token '{token}' in {where}")
+                for words, keyword_intent in keywords:
+                    hit = next((word for word in words if word in token), None)
+                    if hit and keyword_intent != intent:
+                        raise DialogueSpecError(
+                            f"Token '{token}' in {where} also matches keyword '{hit}' ({keyword_intent})")
+                table[token] = (intent, next_state)
+        return table
+
+    global_table = compile_rules(global_spec.get('transitions'), 'global')
+
+    transitions = {}
+    defaults = {}
+    edges = {}
+    for state, state_spec in states.items():
+        state_spec = state_spec or {}
+        table = compile_rules(state_spec.get('transitions'), state)
+        for token, target in table.items():
+            if token in global_table:
+                raise DialogueSpecError(
+                    f"Token '{token}' in {state} is shadowed by a global transition")
+            transitions[(state, token)] = target
+        for token, target in global_table.items():
+            transitions[(state, token)] = target
+        defaults[state] = state_spec.get('default')
+        edges[state] = {next_state or state for _, next_state in table.values()}
+        edges[state] |= {next_state or state for _, next_state in global_table.values()}
+
+    reachable = {start}
+    queue = deque([start])
+    while queue:
+        for target in edges[queue.popleft()]:
+            if target not in reachable:
+                reachable.add(target)
+                queue.append(target)
+    unreachable = [state for state in states if state not in reachable]
+    if unreachable:
+        raise DialogueSpecError(f"Unreachable states: {', '.join(unreachable)}")
+
+    return DialogueMachine(start, transitions, keywords, defaults)
+
+
+def load_dialogue(path=DEFAULT_SPEC_PATH):
+    """Load and compile a dialogue spec from a YAML or JSON file"""
+    with open(path, 'r', encoding='utf-8') as f:
+        if path.endswith('.json'):
+            spec = json.load(f)
+        else:
+            spec = yaml.safe_load(f)
+    try:
+        return compile_dialogue(spec or {})
+    except DialogueSpecError as e:
+        raise DialogueSpecError(f"{path}: {e}") from None
@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+Single-pass entity scanner: Turkish locations, energy consumption and bill amounts
+
+Province and district names come from a bundled gazetteer and are compiled,
+together with the number/unit patterns, into one regex (see keyword_matcher),
+so a message is scanned once in the C regex engine. The name trie branches on
+each character, so scan cost depends on message length, not gazetteer size.
+"""
+
+import os
+import re
+
+import yaml
+
+from keyword_matcher import _trie_pattern
+
+# The C loader parses the 900-district gazetteer about 8x faster than the pure-Python one
+SafeLoader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+DEFAULT_GAZETTEER_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'content', 'gazetteer_tr.yml')
+
+# Fold Turkish letters to ASCII one-for-one, so "Eskisehir", "ESKİŞEHİR" and
+# "eskişehir" compare equal and match offsets stay aligned with the message
+_FOLD = str.maketrans("İIıŞşĞğÇçÖöÜüÂâÎîÛû’", "iiissggccoouuaaiiuu'")
+
+# Names shorter than this only take a suffix after an apostrophe ("Van'da"),
+# so "Kars" does not match "karşı"
+_SHORT_NAME = 5
+
+# Case, possessive and "from" suffixes that may follow a place name without an
+# apostrophe: İstanbulda, Ankara'dan, İzmirliyim, Konyadaki, Bursanın
+_LONG_NAME_END = re.compile(
+    r"(?:'[a-z]*|[dt][ae](?:n|ki|yim|yiz)?|y?[aeiu]|n[iu]n|[iu]n|l[iu](?:y[iu][mz])?)?(?![a-z0-9])")
+_SHORT_NAME_END = re.compile(r"(?:'[a-z]*)?(?![a-z0-9])")
+
+# Turkish number formats: 1.500 / 2.000,50 / 1,5 / 1500
+_NUMBER = r"\d{1,3}(?:\.\d{3})+(?:,\d+)?|\d+(?:[.,]\d+)?"
+
+# Unit -> kWh; a space marks optional whitespace ("kilovatsaat", "kilovat saat")
+_ENERGY_UNITS = {
+    'kwh': 1, 'kw/h': 1, 'kw saat': 1, 'kilovat saat': 1, 'kilowatt saat': 1, 'kilowatt': 1,
+    'mwh': 1000, 'megavat saat': 1000, 'megawatt saat': 1000
+}
+_UNIT_SCALE = {unit.replace(' ', ''): scale for unit, scale in _ENERGY_UNITS.items()}
+_MONTHLY = {'aylik', 'ayda', 'ay'}
+_YEARLY = {'yillik', 'yilda', 'senelik', 'yil'}
+
+
+def fold(text):
+    """Lowercase text and fold Turkish letters to ASCII"""
+    return text.translate(_FOLD).lower()
+
+
+def parse_number(text):
+    """Parse a Turkish-formatted number: '.' groups thousands, ',' is the decimal mark"""
+    if ',' in text:
+        return float(text.replace('.', '').replace(',', '.'))
+    if re.fullmatch(r"\d{1,3}(?:\.\d{3})+", text):
+        return float(text.replace('.', ''))
+    return float(text)
+
+
+def _as_number(value):
+    return int(value) if float(value).is_integer() else round(value, 2)
+
+
+class Gazetteer:
+    """Folded place name -> [(province, district or None)]"""
+
+    def __init__(self, provinces, aliases=None, common_words=()):
+        self.provinces = list(provinces)
+        self.names = {}
+        self.common_words = {fold(word) for word in common_words}
+
+        for province, districts in provinces.items():
+            self._add(province, (province, None))
+            for district in districts or ():
+                self._add(district, (province, district))
+        for province, names in (aliases or {}).items():
+            if province not in provinces:
+                raise ValueError(f"Alias for unknown province: {province}")
+            for name in names:
+                self._add(name, (province, None))
+
+    def _add(self, name, place):
+        places = self.names.setdefault(fold(name), [])
+        if place not in places:
+            places.append(place)
+
+    @property
+    def district_count(self):
+        return sum(1 for places in self.names.values() for _, district in places if district)
+
+
+def load_gazetteer(path=DEFAULT_GAZETTEER_PATH):
+    """Load a gazetteer from a YAML/JSON file with provinces, aliases and common_words"""
+    with open(path, encoding='utf-8') as f:
+        spec = yaml.load(f, Loader=SafeLoader)
+    return Gazetteer(spec['provinces'], spec.get('aliases'), spec.get('common_words', ()))
+
+
+class EntityScanner:
+    """Extracts location, energy_usage and monthly_bill from a message in one regex pass"""
+
+    def __init__(self, gazetteer):
+        self.gazetteer = gazetteer
+        names = gazetteer.names
+
+        # Shorter names that are prefixes of a longer one, tried when the
+        # longest match is followed by something other than a suffix
+        self._fallbacks = {
+            name: [name[:k] for k in range(len(name) - 1, 0, -1) if name[:k] in names]
+            for name in names
+        }
+
+        units = '|'.join(r'\s*'.join(map(re.escape, unit.split(' ')))
+                         for unit in sorted(_ENERGY_UNITS, key=len, reverse=True))
+        self.pattern = re.compile(
+            r"(?:(?<![a-z0-9])(?P<period>aylik|ayda|yillik|yilda|senelik)\s+)?"
+            rf"(?<![\d.,])(?P<number>{_NUMBER})\s*"
+            rf"(?:(?P<unit>{units})(?:\s*/\s*(?P<per>ay|yil))?"
+            r"|(?P<currency>(?:tl|try)(?![a-z])|lira|₺))"
+            rf"|₺\s*(?P<prefixed>{_NUMBER})"
+            r"|(?<![a-z0-9])(?P<bill>fatura)"
+            rf"|(?<![a-z0-9])(?P<place>{_trie_pattern(names)})"
+        )
+
+    def _place_at(self, text, match):
+        """The gazetteer name at a place match, or None if it runs into a longer word"""
+        name = match.group('place')
+        for candidate in [name] + self._fallbacks[name]:
+            end = _SHORT_NAME_END if len(candidate) < _SHORT_NAME else _LONG_NAME_END
+            if end.match(text, match.start() + len(candidate)):
+                return candidate
+        return None
+
+    def scan(self, message):
+        """Return the raw matches: place names, energy readings (kWh) and TL amounts"""
+        text = fold(message)
+        places = []
+        energy = []
+        amounts = []
+        mentions_bill = False
+
+        for match in self.pattern.finditer(text):
+            if match.group('place'):
+                name = self._place_at(text, match)
+                if name:
+                    places.append(name)
+            elif match.group('bill'):
+                mentions_bill = True
+            elif match.group('prefixed'):
+                amounts.append((parse_number(match.group('prefixed')), None))
+            elif match.group('unit'):
+                value = parse_number(match.group('number')) * _UNIT_SCALE[re.sub(r'\s+', '', match.group('unit'))]
+                period = match.group('per') or match.group('period')
+                if period in _YEARLY:
+                    value /= 12
+                energy.append(value)
+            else:
+                amounts.append((parse_number(match.group('number')), match.group('period')))
+
+        return places, energy, amounts, mentions_bill
+
+    def resolve_location(self, places):
+        """Pick (province, district) from the place names found, or (None, None)"""
+        names = self.gazetteer.names
+        mentioned = [province for name in places for province, district in names[name] if not district]
+
+        for name in places:
+            districts = [(province, district) for province, district in names[name] if district]
+            if not districts:
+                continue
+            if mentioned:
+                for province, district in districts:
+                    if province in mentioned:
+                        return province, district
+            elif name not in self.gazetteer.common_words:
+                # A district shared by several provinces stays unassigned
+                province, district = districts[0]
+                return (province if len(districts) == 1 else None), district
+
+        return (mentioned[0] if mentioned else None), None
+
+    def extract(self, message):
+        """Extract location, province, district, energy_usage (monthly kWh) and monthly_bill (TL)"""
+        entities = {}
+        places, energy, amounts, mentions_bill = self.scan(message)
+
+        province, district = self.resolve_location(places)
+        if district:
+            entities['district'] = district
+            entities['location'] = f"{district}, {province}" if province else district
+        if province:
+            entities['province'] = province
+            entities.setdefault('location', province)
+
+        if energy:
+            entities['energy_usage'] = _as_number(energy[0])
+
+        for amount, period in amounts:
+            if mentions_bill or period in _MONTHLY:
+                entities['monthly_bill'] = _as_number(amount)
+                break
+
+        return entities
+
+
+SCANNER = EntityScanner(load_gazetteer())
+
+
+def extract_entities(message):
+    """Extract entities from a message with the bundled Turkish gazetteer"""
+    return SCANNER.extract(message)
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Typo-tolerant keyword lookup with a symmetric-delete (SymSpell-style) index
+
+Keywords are folded (Turkish letters to ASCII, lowercase) and stored under
+every string reachable by deleting up to their allowed number of
+characters. A query generates its own deletes and looks them up, so a
+lookup costs a few dict probes plus a bounded edit distance on the handful
+of candidates; nothing scans the vocabulary. The bound grows with the
+length of the typed word: everyday five-letter words are one edit away
+from keywords ("bakın", "bakır" -> "bakım"; "sonda" -> "sonra"), so words
+under six letters only match after folding ("bılgı" -> "bilgi"). The
+default cap of one edit covers the usual dropped, doubled or swapped
+letter; two edits cost about five times as much per lookup.
+"""
+
+import re
+import unicodedata
+from functools import lru_cache
+
+from keyword_matcher import KeywordAutomaton
+from metrics import REGISTRY
+
+FUZZY_MATCHES = REGISTRY.counter('chatbot_fuzzy_matches', "Messages that missed every exact keyword, "
+                                 "by engine and whether fuzzy matching recovered an intent", ('engine', 'result'))
+
+_WORD = re.compile(r"\w+")
+
+
+def fold(text):
+    """Lowercase ASCII form of text: Turkish letters lose their marks, other non-ASCII is dropped.
+
+    Same as entities.fold on Turkish words and several times faster on long
+    messages, since match offsets do not need to line up with the original.
+    """
+    text = text.replace('ı', 'i').replace('İ', 'i')
+    return unicodedata.normalize('NFD', text).encode('ascii', 'ignore').decode('ascii').lower()
+
+
+def allowed_distance(length):
+    """Edits tolerated for a typed word of this many (folded) characters"""
+    if length < 6:
+        return 0
+    if length < 8:
+        return 1
+    return 2
+
+
+def _one_edit(a, b):
+    """True when a and b differ by one insertion, deletion, substitution or adjacent swap"""
+    if len(a) < len(b):
+        a, b = b, a
+    i = 0
+    for ca, cb in zip(a, b):
+        if ca != cb:
+            break
+        i += 1
+    if len(a) != len(b):
+        return a[i + 1:] == b[i:]
+    return a[i + 1:] == b[i + 1:] or (a[i + 1:i + 2] == b[i:i + 1] and a[i:i + 1] == b[i + 1:i + 2]
+                                      and a[i + 2:] == b[i + 2:])
+
+
+def edit_distance(a, b, bound):
+    """Optimal string alignment distance (adjacent swaps count as one), or bound + 1 beyond bound"""
+    if a == b:
+        return 0
+    if abs(len(a) - len(b)) > bound or bound == 0:
+        return bound + 1
+    if bound == 1:
+        return 1 if _one_edit(a, b) else 2
+    # Only cells within `bound` of the diagonal can stay within bound
+    over = bound + 1
+    before = None
+    previous = [j if j <= bound else over for j in range(len(b) + 1)]
+    for i in range(1, len(a) + 1):
+        ca = a[i - 1]
+        current = [over] * (len(b) + 1)
+        if i <= bound:
+            current[0] = i
+        low = max(1, i - bound)
+        high = min(len(b), i + bound)
+        for j in range(low, high + 1):
+            cb = b[j - 1]
+            value = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb))
+            if before is not None and j > 1 and ca == b[j - 2] and a[i - 2] == cb:
+                value = min(value, before[j - 2] + 1)
+            current[j] = value
+        if min(current[low - 1:high + 1]) > bound:
+            return over
+        before, previous = previous, current
+    return min(previous[-1], over)
+
+
+def _deletes(word, depth):
+    if depth == 1:
+        return {word, *(word[:i] + word[i + 1:] for i in range(len(word)))}
+    variants = {word}
+    frontier = {word}
+    for _ in range(depth):
+        frontier = {variant[:i] + variant[i + 1:] for variant in frontier for i in range(len(variant))}
+        variants |= frontier
+    return variants
+
+
+class FuzzyIndex:
+    """Finds the keywords within allowed_distance of a term, ignoring case and Turkish diacritics"""
+
+    def __init__(self, words, max_distance=1, cache_size=8192):
+        self.max_distance = max_distance
+        # Everyday words ("bir", "için", "istiyorum") recur in almost every message
+        self.lookup = lru_cache(maxsize=cache_size)(self._lookup)
+        # folded word -> original spellings
+        self._words = {}
+        for word in words:
+            self._words.setdefault(fold(word), []).append(word)
+        # delete variant -> folded words it was derived from
+        self._variants = {}
+        for folded in self._words:
+            for variant in _deletes(folded, self._bound(folded)):
+                self._variants.setdefault(variant, []).append(folded)
+        self._longest = max((len(folded) for folded in self._words), default=0)
+
+    def _bound(self, folded):
+        return min(allowed_distance(len(folded)), self.max_distance)
+
+    def _lookup(self, term):
+        """Original keywords closest to term, nearest first (empty when none is within bound)"""
+        folded = fold(term)
+        bound = self._bound(folded)
+        if len(folded) > self._longest + bound:
+            return ()
+        variants = self._variants
+        candidates = set()
+        for variant in _deletes(folded, bound):
+            candidates.update(variants.get(variant, ()))
+        matches = []
+        # The typed word sets the bound: "fiyatt" may still reach the shorter "fiyat"
+        for candidate in candidates:
+            distance = edit_distance(folded, candidate, bound)
+            if distance <= bound:
+                matches.append((distance, candidate))
+        matches.sort()
+        # A tuple, since cached results are shared between callers
+        return tuple(word for _, folded_word in matches for word in self._words[folded_word])
+
+
+class FuzzyKeywords:
+    """Fuzzy counterpart of KeywordAutomaton.find_groups for word and phrase keywords.
+
+    Keywords are first found as substrings of the folded message, like the
+    exact matcher does ("tesekkurler" contains "teşekkür"). Then each message
+    word is looked up once in an index of single keyword words; a phrase
+    keyword matches a run of message words that each match its word in that
+    position.
+    """
+
+    def __init__(self, groups):
+        """Build from an iterable of (group_name, keywords) pairs"""
+        groups = list(groups)
+        self._folded = KeywordAutomaton((name, [fold(keyword) for keyword in keywords]) for name, keywords in groups)
+        # first word -> [(remaining words, group names)]
+        self._phrases = {}
+        words = set()
+        for name, keywords in groups:
+            for keyword in keywords:
+                parts = tuple(keyword.split())
+                if not parts:
+                    continue
+                words.update(parts)
+                self._phrases.setdefault(parts[0], []).append((parts[1:], name))
+        self.index = FuzzyIndex(words)
+
+    def find_groups(self, text):
+        """Group names with a keyword within edit bound of a word (or run of words) in text"""
+        found = self._folded.find_groups(fold(text))
+        lookup = self.index.lookup
+        phrases = self._phrases
+        matches = [lookup(word) for word in _WORD.findall(text)]
+        for start, words in enumerate(matches):
+            for word in words:
+                for rest, name in phrases.get(word, ()):
+                    if name not in found and all(
+                            start + offset < len(matches) and part in matches[start + offset]
+                            for offset, part in enumerate(rest, 1)):
+                        found.add(name)
+        return found
+
+
+def fuzzy_stats():
+    """Per-engine counts of exact misses and how many fuzzy matching recovered"""
+    counts = REGISTRY.snapshot()
+    stats = {}
+    for engine in ('professional', 'simple'):
+        recovered = counts.get((FUZZY_MATCHES, (engine, 'recovered')), [0])[0]
+        missed = counts.get((FUZZY_MATCHES, (engine, 'missed')), [0])[0]
+        attempts = recovered + missed
+        stats[engine] = {
+            'attempts': attempts,
+            'recovered': recovered,
+            'hit_rate': round(recovered / attempts, 4) if attempts else 0.0
+        }
+    return stats
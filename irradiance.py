@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Per-province solar irradiance table for Turkey
+
+The bundled table is loaded once into flat float arrays indexed by province
+number. Index -1 (the last slot) holds the default for unknown locations, so
+scalar and NumPy lookups need no special case.
+"""
+
+import os
+from array import array
+from functools import lru_cache
+
+import yaml
+
+from entities import SafeLoader, extract_entities
+
+DEFAULT_TABLE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'content', 'irradiance_tr.yml')
+
+UNKNOWN = -1
+
+
+class IrradianceTable:
+    """Peak sun hours and annual yield per province"""
+
+    def __init__(self, provinces, performance_ratio=0.8, tariff=2.6, default_peak_sun_hours=5.0):
+        self.provinces = list(provinces)
+        self.performance_ratio = performance_ratio
+        self.tariff = tariff
+        self._index = {name: i for i, name in enumerate(self.provinces)}
+
+        hours = [float(provinces[name]) for name in self.provinces] + [float(default_peak_sun_hours)]
+        # kWh/m²/day for each province, default last
+        self.peak_sun_hours = array('d', hours)
+        # kWh produced per installed kW per year
+        self.annual_yield = array('d', (h * 365 * performance_ratio for h in hours))
+
+    def index(self, province):
+        """Position of a province in the arrays, or UNKNOWN"""
+        return self._index.get(province, UNKNOWN)
+
+    def arrays(self):
+        """(peak_sun_hours, annual_yield) as NumPy views over the same memory"""
+        import numpy as np
+
+        return np.frombuffer(self.peak_sun_hours), np.frombuffer(self.annual_yield)
+
+
+def load_irradiance(path=DEFAULT_TABLE_PATH):
+    """Load an irradiance table from YAML/JSON"""
+    with open(path, encoding='utf-8') as f:
+        spec = yaml.load(f, Loader=SafeLoader)
+    return IrradianceTable(spec['provinces'], spec.get('performance_ratio', 0.8),
+                           spec.get('tariff_tl_per_kwh', 2.6), spec.get('default_peak_sun_hours', 5.0))
+
+
+TABLE = load_irradiance()
+
+
+@lru_cache(maxsize=4096)
+def province_index(location):
+    """Table index for a free-text location ("Kadıköy, İstanbul", "izmir"), or UNKNOWN"""
+    if not location:
+        return UNKNOWN
+    index = TABLE.index(location)
+    if index == UNKNOWN:
+        index = TABLE.index(extract_entities(location).get('province'))
+    return index
+
+
+def peak_sun_hours(location):
+    """Average daily peak sun hours for a location (the default when unknown)"""
+    return TABLE.peak_sun_hours[province_index(location)]
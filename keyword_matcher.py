@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Compiled multi-keyword matcher for single-pass intent keyword detection
+
+The keyword trie is compiled into one regex so the scan runs in the C regex
+engine; a per-character Aho-Corasick loop in pure Python is slower than the
+built-in substring search it replaces. Keywords nested inside or overlapping
+the end of a match are resolved from tables precomputed per keyword.
+"""
+
+import re
+
+
+def _trie_pattern(keywords):
+    """Build a regex that matches the longest keyword starting at a position"""
+    trie = {}
+    for keyword in keywords:
+        node = trie
+        for ch in keyword:
+            node = node.setdefault(ch, {})
+        node[''] = True
+
+    def emit(node):
+        alternatives = [re.escape(ch) + emit(child) for ch, child in sorted(node.items()) if ch]
+        if not alternatives:
+            return ''
+        body = alternatives[0] if len(alternatives) == 1 else '(?:' + '|'.join(alternatives) + ')'
+        if '' in node:
+            body = '(?:' + body + ')?'
+        return body
+
+    return emit(trie)
+
+
+class KeywordAutomaton:
+    """Finds every keyword group that occurs as a substring of a text in one pass"""
+
+    def __init__(self, groups):
+        """Build the matcher from an iterable of (group_name, keywords) pairs"""
+        self.groups = []
+        keyword_groups = {}
+        for name, keywords in groups:
+            self.groups.append(name)
+            for keyword in keywords:
+                if keyword:
+                    keyword_groups.setdefault(keyword, set()).add(name)
+
+        keywords = list(keyword_groups)
+        self._closure = {}
+        self._straddles = {}
+        for keyword in keywords:
+            closure = set()
+            straddles = []
+            for other in keywords:
+                if other in keyword:
+                    closure |= keyword_groups[other]
+            for other in keywords:
+                for offset in range(1, len(keyword)):
+                    tail = keyword[offset:]
+                    if len(other) > len(tail) and other.startswith(tail):
+                        extra = frozenset(keyword_groups[other] - closure)
+                        if extra:
+                            straddles.append((offset, other, extra))
+            self._closure[keyword] = frozenset(closure)
+            self._straddles[keyword] = tuple(straddles)
+
+        self.pattern = re.compile(_trie_pattern(keywords)) if keywords else None
+
+    def find_groups(self, text):
+        """Return the set of group names with at least one keyword in text"""
+        found = set()
+        if self.pattern is None:
+            return found
+        closure = self._closure
+        straddles = self._straddles
+        for match in self.pattern.finditer(text):
+            keyword = match.group()
+            found |= closure[keyword]
+            for offset, other, extra in straddles[keyword]:
+                if not extra <= found and text.startswith(other, match.start() + offset):
+                    found |= extra
+        return found
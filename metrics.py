@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+In-process counters and fixed-bucket histograms rendered in Prometheus text format
+
+Every thread writes to its own shard, so recording takes no lock: a
+thread-local lookup, a dict lookup and an integer add. A scrape copies the
+shards and sums them. Shards of threads that have exited are folded into a
+retired total, so per-request threads do not pile up.
+"""
+
+import math
+import threading
+from bisect import bisect_left
+
+# Latency buckets in seconds, from 0.5 ms to 10 s
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def _format_value(value):
+    if value == math.inf:
+        return '+Inf'
+    if isinstance(value, float) and value.is_integer() and abs(value) < 1e15:
+        return str(int(value))
+    return repr(value)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _family(name, kind):
+    # In the 0.0.4 text format a family is named exactly like its samples, so counters keep _total
+    return name + '_total' if kind == 'counter' else name
+
+
+def _label_text(names, values, extra=None):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(f'{extra[0]}="{extra[1]}"')
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+class Metric:
+    """Base for metrics: each thread records into its own {labels: value} shard"""
+    kind = None
+
+    def __init__(self, registry, name, help, labelnames=()):
+        self.registry = registry
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._local = threading.local()
+
+    def _series(self, labels):
+        """Slow path of recording: create this thread's shard and/or the series"""
+        shard = getattr(self._local, 'series', None)
+        if shard is None:
+            shard = self._local.series = {}
+            self.registry._adopt(self, shard)
+        return shard.setdefault(labels, self._empty())
+
+
+class Counter(Metric):
+    """Monotonic count per label tuple"""
+    kind = 'counter'
+
+    def _empty(self):
+        return [0]
+
+    def inc(self, labels=(), amount=1):
+        """Add amount for a tuple of label values (in labelnames order)"""
+        try:
+            self._local.series[labels][0] += amount
+        except (AttributeError, KeyError):
+            self._series(labels)[0] += amount
+
+    def _samples(self, labels, cells):
+        yield self.name + '_total', _label_text(self.labelnames, labels), cells[0]
+
+
+class Histogram(Metric):
+    """Fixed-bucket distribution per label tuple"""
+    kind = 'histogram'
+
+    def __init__(self, registry, name, help, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(registry, name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _empty(self):
+        # One cell per bucket, one for +Inf, then the sum
+        return [0] * (len(self.buckets) + 1) + [0.0]
+
+    def observe(self, value, labels=()):
+        """Record one value for a tuple of label values (in labelnames order)"""
+        try:
+            cells = self._local.series[labels]
+        except (AttributeError, KeyError):
+            cells = self._series(labels)
+        cells[bisect_left(self.buckets, value)] += 1
+        cells[-1] += value
+
+    def _samples(self, labels, cells):
+        cumulative = 0
+        for bound, count in zip(self.buckets + (math.inf,), cells):
+            cumulative += count
+            yield self.name + '_bucket', _label_text(self.labelnames, labels, ('le', _format_value(float(bound)))), cumulative
+        label_text = _label_text(self.labelnames, labels)
+        yield self.name + '_sum', label_text, cells[-1]
+        yield self.name + '_count', label_text, cumulative
+
+
+class Registry:
+    """Owns the metrics and the per-thread shards they record into"""
+
+    def __init__(self):
+        self._metrics = []
+        self._collectors = []
+        self._shards = []
+        self._retired = {}
+        self._lock = threading.Lock()
+
+    def counter(self, name, help, labelnames=()):
+        return self._add(Counter(self, name, help, labelnames))
+
+    def histogram(self, name, help, labelnames=(), buckets=LATENCY_BUCKETS):
+        return self._add(Histogram(self, name, help, labelnames, buckets))
+
+    def _add(self, metric):
+        with self._lock:
+            if any(existing.name == metric.name for existing in self._metrics):
+                raise ValueError(f"Metric '{metric.name}' is already registered")
+            self._metrics.append(metric)
+        return metric
+
+    def add_collector(self, collect):
+        """Register a callable returning (name, type, help, [(labels dict, value), ...]) tuples at scrape time"""
+        self._collectors.append(collect)
+
+    def _adopt(self, metric, shard):
+        """Track a new thread's shard so scrapes can find it"""
+        with self._lock:
+            if len(self._shards) >= 256:
+                self._retire_dead_shards()
+            self._shards.append((threading.current_thread(), metric, shard))
+
+    def _retire_dead_shards(self):
+        """Fold shards of exited threads into the retired totals (caller holds the lock)"""
+        alive = []
+        for thread, metric, shard in self._shards:
+            if thread.is_alive():
+                alive.append((thread, metric, shard))
+            else:
+                self._fold(self._retired, metric, shard)
+        self._shards = alive
+
+    @staticmethod
+    def _fold(totals, metric, shard):
+        # dict.copy() and list() run without releasing the GIL, so the
+        # owning thread cannot change a shard halfway through the copy
+        for labels, cells in shard.copy().items():
+            cells = list(cells)
+            total = totals.get((metric, labels))
+            if total is None:
+                totals[(metric, labels)] = cells
+            else:
+                for i, value in enumerate(cells):
+                    total[i] += value
+
+    def snapshot(self):
+        """Return {(metric, labels): merged cells} across all threads"""
+        with self._lock:
+            self._retire_dead_shards()
+            totals = {key: list(cells) for key, cells in self._retired.items()}
+            for _, metric, shard in self._shards:
+                self._fold(totals, metric, shard)
+        return totals
+
+    def value(self, metric, labels=()):
+        """Merged value of one series (a count, or histogram cells), or None if never recorded"""
+        cells = self.snapshot().get((metric, labels))
+        if cells is None or metric.kind != 'counter':
+            return cells
+        return cells[0]
+
+    def render(self):
+        """Render every metric in the Prometheus text exposition format"""
+        by_metric = {}
+        for (metric, labels), value in self.snapshot().items():
+            by_metric.setdefault(metric, []).append((labels, value))
+
+        lines = []
+        for metric in self._metrics:
+            family = _family(metric.name, metric.kind)
+            lines.append(f"# HELP {family} {metric.help}")
+            lines.append(f"# TYPE {family} {metric.kind}")
+            for labels, value in sorted(by_metric.get(metric, []), key=lambda item: item[0]):
+                for name, label_text, sample in metric._samples(labels, value):
+                    lines.append(f"{name}{label_text} {_format_value(sample)}")
+
+        for collect in self._collectors:
+            try:
+                families = list(collect())
+            except Exception as e:
+                print(f"Error in metrics collector: {e}")
+                continue
+            for name, kind, help, samples in families:
+                family = _family(name, kind)
+                lines.append(f"# HELP {family} {help}")
+                lines.append(f"# TYPE {family} {kind}")
+                for labels, value in samples:
+                    lines.append(f"{family}{_label_text(labels.keys(), labels.values())} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+# Process-wide registry shared by the apps, the Rasa client and the TTS cache
+REGISTRY = Registry()
+
+HTTP_REQUESTS = REGISTRY.counter('chatbot_http_requests', "HTTP requests by route, method and status",
+                                 ('route', 'method', 'status'))
+HTTP_LATENCY = REGISTRY.histogram('chatbot_http_request_seconds', "Time to build the HTTP response by route",
+                                  ('route', 'method'))
+INTENT_LATENCY = REGISTRY.histogram('chatbot_intent_seconds', "Time to answer a message by resolved intent",
+                                    ('intent',))
+RASA_LATENCY = REGISTRY.histogram('chatbot_rasa_request_seconds', "Rasa proxy calls by outcome "
+                                  "(success, timeout, error, fallback)", ('outcome',))
+TTS_LATENCY = REGISTRY.histogram('chatbot_tts_synthesis_seconds', "TTS synthesis time by backend and mode "
+                                 "(stream includes sending the chunks)",
+                                 ('backend', 'mode'))
+
+
+def instrument_app(app):
+    """Count and time every request of a Flask app and serve the registry at /metrics.
+
+    Streaming responses are timed until the response object is returned,
+    not until the last chunk is sent.
+    """
+    from time import perf_counter
+
+    from flask import g, request
+
+    @app.before_request
+    def _start_timer():
+        g._metrics_start = perf_counter()
+
+    @app.after_request
+    def _record_request(response):
+        start = g.pop('_metrics_start', None)
+        if start is not None:
+            # The URL rule keeps the label set bounded; unmatched paths share one label
+            route = request.url_rule.rule if request.url_rule is not None else '<unmatched>'
+            HTTP_LATENCY.observe(perf_counter() - start, (route, request.method))
+            HTTP_REQUESTS.inc((route, request.method, str(response.status_code)))
+        return response
+
+    @app.route('/metrics')
+    def metrics():
+        """Prometheus scrape endpoint"""
+        return app.response_class(REGISTRY.render(), content_type=CONTENT_TYPE)
+
+    return app
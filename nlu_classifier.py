@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+"""
+In-process intent classifier trained from data/nlu.yml
+
+Follows the featurizers in config.yml: word tokens plus char_wb n-grams
+(each word padded with spaces, 1-4 characters), weighted by TF-IDF and
+L2-normalized, then a softmax (multinomial logistic regression) layer.
+Training on the ~100 examples takes well under a second; the artifact is a
+compressed .npz holding the vocabulary, IDF weights and the weight matrix.
+
+Predictions use the FallbackClassifier settings from config.yml: when the
+top confidence is below `threshold`, or the gap to the runner-up is below
+`ambiguity_threshold`, the intent is `nlu_fallback`, as Rasa reports it.
+
+Usage:
+    python nlu_classifier.py train [--data data/nlu.yml] [--config config.yml] [--out models/nlu_classifier.npz]
+    python nlu_classifier.py parse "how much does it cost" ["another message" ...]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+import time
+
+import numpy as np
+
+from content_store import load_yaml
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+NLU_PATH = os.path.join(ROOT, 'data', 'nlu.yml')
+CONFIG_PATH = os.path.join(ROOT, 'config.yml')
+MODEL_PATH = os.path.join(ROOT, 'models', 'nlu_classifier.npz')
+
+FALLBACK_INTENT = 'nlu_fallback'
+# Rasa's FallbackClassifier defaults, used when config.yml has no FallbackClassifier
+DEFAULT_THRESHOLD = 0.3
+DEFAULT_AMBIGUITY_THRESHOLD = 0.1
+# Rasa reports the top ten intents
+RANKING_LENGTH = 10
+
+_WORD = re.compile(r"\w+")
+# [value](entity) and [value]{"entity": ...}; training text keeps only the value
+_ENTITY = re.compile(r'\[([^\]]+)\](?:\([^)]*\)|\{[^}]*\})')
+# Word features share the vocabulary with n-grams; '#' never occurs inside an n-gram
+_WORD_PREFIX = '#'
+
+
+def load_training_data(path=NLU_PATH):
+    """[(text, intent)] from a Rasa NLU file, with entity markup reduced to its text"""
+    spec = load_yaml(path) or {}
+    examples = []
+    for block in spec.get('nlu') or []:
+        if 'intent' not in block:
+            continue
+        for line in (block.get('examples') or '').splitlines():
+            line = line.strip()
+            if line.startswith('- '):
+                examples.append((_ENTITY.sub(r'\1', line[2:].strip()), block['intent']))
+    return examples
+
+
+def read_fallback_thresholds(path=CONFIG_PATH):
+    """(threshold, ambiguity_threshold) of the FallbackClassifier in a Rasa config file"""
+    for component in (load_yaml(path) or {}).get('pipeline') or []:
+        if component.get('name') == 'FallbackClassifier':
+            return (float(component.get('threshold', DEFAULT_THRESHOLD)),
+                    float(component.get('ambiguity_threshold', DEFAULT_AMBIGUITY_THRESHOLD)))
+    return DEFAULT_THRESHOLD, DEFAULT_AMBIGUITY_THRESHOLD
+
+
+def read_ngram_range(path=CONFIG_PATH):
+    """(min_ngram, max_ngram) of the char_wb CountVectorsFeaturizer in a Rasa config file"""
+    for component in (load_yaml(path) or {}).get('pipeline') or []:
+        if component.get('name') == 'CountVectorsFeaturizer' and component.get('analyzer') == 'char_wb':
+            return int(component.get('min_ngram', 1)), int(component.get('max_ngram', 4))
+    return 1, 4
+
+
+def fingerprint(paths):
+    """Digest of the training inputs; a saved model is stale once it differs"""
+    digest = hashlib.sha256()
+    for path in paths:
+        with open(path, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def analyze(text, min_n=1, max_n=4):
+    """Word and char_wb n-gram features of text, repeats included (scikit-learn's char_wb order)"""
+    features = []
+    append = features.append
+    for word in _WORD.findall(text.lower()):
+        append(_WORD_PREFIX + word)
+        padded = f" {word} "
+        length = len(padded)
+        for n in range(min_n, max_n + 1):
+            offset = 0
+            append(padded[:n])
+            while offset + n < length:
+                offset += 1
+                append(padded[offset:offset + n])
+            # A word shorter than n is counted once, as itself
+            if offset == 0:
+                break
+    return features
+
+
+def _softmax(scores):
+    scores = scores - scores.max(axis=-1, keepdims=True)
+    np.exp(scores, out=scores)
+    scores /= scores.sum(axis=-1, keepdims=True)
+    return scores
+
+
+class NLUClassifier:
+    """TF-IDF weighted char n-grams and a linear softmax layer over the intents"""
+
+    def __init__(self, vocabulary, idf, weights, bias, intents, ngram_range=(1, 4),
+                 threshold=DEFAULT_THRESHOLD, ambiguity_threshold=DEFAULT_AMBIGUITY_THRESHOLD,
+                 fingerprint=None):
+        # feature -> column
+        self.vocabulary = {feature: column for column, feature in enumerate(vocabulary)}
+        self.idf = np.asarray(idf, dtype=np.float32)
+        self.weights = np.asarray(weights, dtype=np.float32)
+        self.bias = np.asarray(bias, dtype=np.float32)
+        self.intents = list(intents)
+        self.ngram_range = tuple(int(n) for n in ngram_range)
+        self.threshold = float(threshold)
+        self.ambiguity_threshold = float(ambiguity_threshold)
+        self.fingerprint = fingerprint
+
+    @classmethod
+    def train(cls, examples, ngram_range=(1, 4), threshold=DEFAULT_THRESHOLD,
+              ambiguity_threshold=DEFAULT_AMBIGUITY_THRESHOLD, epochs=300, learning_rate=2.0,
+              l2=1e-4, fingerprint=None):
+        """Fit on [(text, intent)] with full-batch gradient descent (the problem is tiny and convex)"""
+        if not examples:
+            raise ValueError("no training examples")
+        intents = sorted({intent for _, intent in examples})
+        analyzed = [analyze(text, *ngram_range) for text, _ in examples]
+        vocabulary = sorted({feature for features in analyzed for feature in features})
+        columns = {feature: column for column, feature in enumerate(vocabulary)}
+
+        counts = np.zeros((len(examples), len(vocabulary)))
+        for row, features in enumerate(analyzed):
+            for feature in features:
+                counts[row, columns[feature]] += 1
+        # Smoothed IDF, as scikit-learn's TfidfTransformer computes it
+        document_frequency = np.count_nonzero(counts, axis=0)
+        idf = np.log((1 + len(examples)) / (1 + document_frequency)) + 1
+        features = counts * idf
+        features /= np.maximum(np.linalg.norm(features, axis=1, keepdims=True), 1e-12)
+
+        targets = np.zeros((len(examples), len(intents)))
+        targets[np.arange(len(examples)), [intents.index(intent) for _, intent in examples]] = 1
+        weights = np.zeros((len(vocabulary), len(intents)))
+        bias = np.zeros(len(intents))
+        velocity_w = np.zeros_like(weights)
+        velocity_b = np.zeros_like(bias)
+        for _ in range(epochs):
+            # Nesterov momentum: gradient at the look-ahead point
+            ahead_w = weights + 0.9 * velocity_w
+            ahead_b = bias + 0.9 * velocity_b
+            error = (_softmax(features @ ahead_w + ahead_b) - targets) / len(examples)
+            velocity_w = 0.9 * velocity_w - learning_rate * (features.T @ error + l2 * ahead_w)
+            velocity_b = 0.9 * velocity_b - learning_rate * error.sum(axis=0)
+            weights += velocity_w
+            bias += velocity_b
+
+        return cls(vocabulary, idf, weights, bias, intents, ngram_range, threshold, ambiguity_threshold,
+                   fingerprint)
+
+    @classmethod
+    def from_files(cls, data_path=NLU_PATH, config_path=CONFIG_PATH, **options):
+        """Train from an NLU file with the featurizer and fallback settings of a Rasa config"""
+        threshold, ambiguity_threshold = read_fallback_thresholds(config_path)
+        return cls.train(load_training_data(data_path), ngram_range=read_ngram_range(config_path),
+                         threshold=threshold, ambiguity_threshold=ambiguity_threshold,
+                         fingerprint=fingerprint((data_path, config_path)), **options)
+
+    def save(self, path=MODEL_PATH):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        vocabulary = sorted(self.vocabulary, key=self.vocabulary.get)
+        # Written under a temporary name so a reader never loads half a file
+        temporary = f"{path}.{os.getpid()}.tmp.npz"
+        np.savez_compressed(temporary, vocabulary=np.array(vocabulary), idf=self.idf, weights=self.weights,
+                            bias=self.bias, intents=np.array(self.intents),
+                            ngram_range=np.array(self.ngram_range),
+                            thresholds=np.array([self.threshold, self.ambiguity_threshold]),
+                            fingerprint=np.array(self.fingerprint or ''))
+        os.replace(temporary, path)
+
+    @classmethod
+    def load(cls, path=MODEL_PATH):
+        with np.load(path, allow_pickle=False) as saved:
+            threshold, ambiguity_threshold = saved['thresholds'].tolist()
+            return cls(saved['vocabulary'].tolist(), saved['idf'], saved['weights'], saved['bias'],
+                       saved['intents'].tolist(), saved['ngram_range'].tolist(), threshold, ambiguity_threshold,
+                       str(saved['fingerprint']) or None)
+
+    def _counts(self, text):
+        """{column: count} of the known features in text"""
+        vocabulary = self.vocabulary
+        counts = {}
+        for feature in analyze(text, *self.ngram_range):
+            column = vocabulary.get(feature)
+            if column is not None:
+                counts[column] = counts.get(column, 0) + 1
+        return counts
+
+    def probabilities(self, text):
+        """Confidence of every intent (in self.intents order) for one message"""
+        counts = self._counts(text)
+        columns = np.fromiter(counts, dtype=np.intp, count=len(counts))
+        values = np.fromiter(counts.values(), dtype=np.float32, count=len(counts)) * self.idf[columns]
+        norm = np.sqrt(values @ values)
+        if norm:
+            values /= norm
+        return _softmax(values @ self.weights[columns] + self.bias)
+
+    def batch_probabilities(self, texts):
+        """Confidences for many messages as one (len(texts), intents) array"""
+        rows = [self._counts(text) for text in texts]
+        lengths = np.fromiter(map(len, rows), dtype=np.intp, count=len(rows))
+        total = int(lengths.sum())
+        columns = np.fromiter((column for counts in rows for column in counts), dtype=np.intp, count=total)
+        values = np.fromiter((count for counts in rows for count in counts.values()), dtype=np.float64,
+                             count=total) * self.idf[columns]
+        # Row sums as differences of a running total, so the whole batch is a few array operations
+        ends = np.cumsum(lengths)
+        starts = ends - lengths
+
+        def row_sums(items):
+            totals = np.zeros((total + 1,) + items.shape[1:])
+            np.cumsum(items, axis=0, out=totals[1:])
+            return totals[ends] - totals[starts]
+
+        norms = np.sqrt(np.maximum(row_sums(values * values), 0))
+        values /= np.repeat(np.where(norms > 0, norms, 1), lengths)
+        scores = row_sums(values[:, None] * self.weights[columns])
+        return _softmax(scores.astype(np.float32) + self.bias)
+
+    def _result(self, text, confidences):
+        order = np.argsort(-confidences, kind='stable')[:RANKING_LENGTH]
+        ranking = [{'name': self.intents[i], 'confidence': float(confidences[i])} for i in order]
+        if self.is_fallback(ranking):
+            # FallbackClassifier reports nlu_fallback at the threshold, ahead of the original ranking
+            ranking.insert(0, {'name': FALLBACK_INTENT, 'confidence': self.threshold})
+        return {'text': text, 'intent': ranking[0], 'intent_ranking': ranking}
+
+    def is_fallback(self, ranking):
+        """True when the top intent is too unsure, or too close to the runner-up, to act on"""
+        if not ranking or ranking[0]['confidence'] < self.threshold:
+            return True
+        return len(ranking) > 1 and ranking[0]['confidence'] - ranking[1]['confidence'] < self.ambiguity_threshold
+
+    def parse(self, text):
+        """Rasa-style parse result: {'text', 'intent': {'name', 'confidence'}, 'intent_ranking'}"""
+        return self._result(text, self.probabilities(text))
+
+    def parse_batch(self, texts):
+        texts = list(texts)
+        return [self._result(text, confidences)
+                for text, confidences in zip(texts, self.batch_probabilities(texts))]
+
+    def stats(self):
+        return {
+            'intents': len(self.intents),
+            'features': len(self.vocabulary),
+            'ngram_range': list(self.ngram_range),
+            'threshold': self.threshold,
+            'ambiguity_threshold': self.ambiguity_threshold
+        }
+
+
+def load_or_train(model_path=MODEL_PATH, data_path=NLU_PATH, config_path=CONFIG_PATH):
+    """The saved model, retrained and saved again when the NLU data or config has changed since"""
+    current = fingerprint((data_path, config_path))
+    if os.path.exists(model_path):
+        try:
+            model = NLUClassifier.load(model_path)
+            if model.fingerprint == current:
+                return model
+        except (OSError, KeyError, ValueError) as e:
+            print(f"⚠️  Could not read {model_path} ({e}); retraining")
+    model = NLUClassifier.from_files(data_path, config_path)
+    try:
+        model.save(model_path)
+    except OSError as e:
+        print(f"⚠️  Could not save {model_path}: {e}")
+    return model
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    commands = parser.add_subparsers(dest='command', required=True)
+    train = commands.add_parser('train', help='train from the NLU data and save the model')
+    train.add_argument('--data', default=NLU_PATH)
+    train.add_argument('--config', default=CONFIG_PATH)
+    train.add_argument('--out', default=MODEL_PATH)
+    parse = commands.add_parser('parse', help='print the parse result of each message')
+    parse.add_argument('--model', default=MODEL_PATH)
+    parse.add_argument('messages', nargs='+')
+    args = parser.parse_args(argv)
+
+    if args.command == 'train':
+        examples = load_training_data(args.data)
+        start = time.perf_counter()
+        model = NLUClassifier.from_files(args.data, args.config)
+        seconds = time.perf_counter() - start
+        model.save(args.out)
+        results = model.parse_batch(text for text, _ in examples)
+        correct = sum(result['intent']['name'] == intent for result, (_, intent) in zip(results, examples))
+        print(f"✅ Trained on {len(examples)} examples of {len(model.intents)} intents in {seconds:.2f}s "
+              f"({len(model.vocabulary):,} features); {correct}/{len(examples)} training examples recognized")
+        print(f"   Saved {args.out} ({os.path.getsize(args.out) / 1024:.0f} KiB)")
+        return 0
+
+    model = NLUClassifier.load(args.model)
+    for result in model.parse_batch(args.messages):
+        print(json.dumps(result, ensure_ascii=False))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
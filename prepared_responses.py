@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Response catalogs: frozen once at import, shared by every chatbot instance,
+and pre-serialized to JSON bytes with strong ETags
+"""
+
+import hashlib
+import json
+
+
+def encode_json(payload):
+    """Encode a payload as compact UTF-8 JSON bytes"""
+    return json.dumps(payload, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def _read_only(self, *args, **kwargs):
+    raise TypeError("response catalog is read-only")
+
+
+class FrozenDict(dict):
+    """A dict that refuses changes; json and jsonify still encode it as a plain object"""
+    __slots__ = ()
+    __setitem__ = __delitem__ = __ior__ = _read_only
+    clear = pop = popitem = setdefault = update = _read_only
+
+    def __reduce__(self):
+        # pickle and copy would otherwise rebuild it item by item through __setitem__
+        return (FrozenDict, (dict(self),))
+
+
+class FrozenList(list):
+    """A list that refuses changes; compares equal to the plain list it was made from"""
+    __slots__ = ()
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _read_only
+    append = extend = insert = pop = remove = clear = sort = reverse = _read_only
+
+    def __reduce__(self):
+        return (FrozenList, (list(self),))
+
+
+def freeze(value):
+    """Read-only copy of a response catalog: every dict and list in it is frozen"""
+    if isinstance(value, dict):
+        return FrozenDict((key, freeze(item)) for key, item in value.items())
+    if isinstance(value, list):
+        return FrozenList(freeze(item) for item in value)
+    return value
+
+
+def thaw(value):
+    """Mutable deep copy of a frozen catalog (strings are shared, not copied)"""
+    if isinstance(value, dict):
+        return {key: thaw(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [thaw(item) for item in value]
+    return value
+
+
+class PreparedResponse:
+    """Immutable /api/chat reply: the message payload, its JSON body and ETag"""
+    __slots__ = ('payload', 'body', 'etag')
+
+    def __init__(self, payload):
+        body = encode_json([payload])
+        object.__setattr__(self, 'payload', payload)
+        object.__setattr__(self, 'body', body)
+        object.__setattr__(self, 'etag', '"' + hashlib.sha256(body).hexdigest()[:32] + '"')
+
+    def __setattr__(self, name, value):
+        raise AttributeError("PreparedResponse is immutable")
+
+
+def as_payload(response):
+    """Wrap a response template the way get_response_json does"""
+    if isinstance(response, dict):
+        return response
+    return {"type": "text", "content": response}
+
+
+def prepare_responses(responses):
+    """Encode every static response variant: intent -> tuple of PreparedResponse"""
+    return {
+        intent: tuple(PreparedResponse(as_payload(option)) for option in options)
+        for intent, options in responses.items()
+    }
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Opt-in cProfile sampling of Flask requests, with a hot-function report
+
+Off by default. When switched on (CHATBOT_PROFILE_EVERY, or POST
+/admin/profiling), one request in N is profiled and its stats are written
+to a directory that keeps only the newest files. A single request can also
+be profiled by sending `X-Profile: 1` together with the admin token.
+"""
+
+import hashlib
+import itertools
+import os
+import re
+import threading
+import time
+
+from admin import is_admin
+
+_SLUG = re.compile(r'[^A-Za-z0-9]+')
+_local = threading.local()
+
+
+def _slug(value):
+    return _SLUG.sub('-', str(value)).strip('-') or 'none'
+
+
+def sender_hash(sender):
+    """Short stable hash so profile names do not carry sender ids"""
+    return hashlib.sha256(str(sender).encode('utf-8')).hexdigest()[:10]
+
+
+def note_intent(intent):
+    """Record the resolved intent of the request running on this thread"""
+    _local.intent = intent
+
+
+class RequestProfiler:
+    """Decides which requests to profile and keeps the captured profiles"""
+
+    def __init__(self, directory, sample_every=0, max_files=200):
+        self.directory = directory
+        self.sample_every = sample_every
+        self.max_files = max_files
+        self.captured = 0
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+
+    def should_sample(self):
+        """True for one call in every `sample_every` (never when 0)"""
+        every = self.sample_every
+        return bool(every) and next(self._counter) % every == 0
+
+    def start(self):
+        # Imported on first use so the apps do not pay for it while sampling is off
+        import cProfile
+
+        _local.intent = None
+        profile = cProfile.Profile()
+        profile.enable()
+        return profile
+
+    def finish(self, profile, route, sender):
+        """Stop a profile and write it as <time>_<route>_<intent>_<sender hash>.prof"""
+        profile.disable()
+        intent = getattr(_local, 'intent', None)
+        now = time.time()
+        stamp = time.strftime('%Y%m%dT%H%M%S', time.localtime(now)) + f"-{int(now % 1 * 1e6):06d}"
+        name = f"{stamp}_{_slug(route)}_{_slug(intent)}_{sender_hash(sender)}.prof"
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, name)
+        profile.dump_stats(path)
+        with self._lock:
+            self.captured += 1
+            self._rotate()
+        return path
+
+    def files(self):
+        """Captured profile paths, oldest first"""
+        try:
+            names = sorted(name for name in os.listdir(self.directory) if name.endswith('.prof'))
+        except FileNotFoundError:
+            return []
+        return [os.path.join(self.directory, name) for name in names]
+
+    def _rotate(self):
+        files = self.files()
+        for path in files[:max(0, len(files) - self.max_files)]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def report(self, top=20, sort='tottime', route=None, intent=None):
+        """Aggregate the captured profiles into the `top` hottest functions.
+
+        route and intent filter on the profile file names.
+        """
+        import pstats
+
+        selected = []
+        for path in self.files():
+            parts = os.path.basename(path)[:-len('.prof')].split('_')
+            if len(parts) != 4:
+                continue
+            _, route_part, intent_part, _ = parts
+            if route is not None and route_part != _slug(route):
+                continue
+            if intent is not None and intent_part != _slug(intent):
+                continue
+            selected.append(path)
+
+        stats = None
+        loaded = 0
+        for path in selected:
+            try:
+                if stats is None:
+                    stats = pstats.Stats(path)
+                else:
+                    stats.add(path)
+            except (OSError, EOFError, TypeError, ValueError):
+                # Removed by rotation or still being written
+                continue
+            loaded += 1
+
+        result = {'profiles': loaded, 'sort': sort, 'functions': []}
+        if stats is None:
+            return result
+        column = {'tottime': 2, 'cumtime': 3, 'calls': 1}[sort]
+        rows = sorted(stats.stats.items(), key=lambda item: item[1][column], reverse=True)[:top]
+        result['total_seconds'] = round(stats.total_tt, 6)
+        for (filename, line, function), (_, calls, tottime, cumtime, _) in rows:
+            result['functions'].append({
+                'function': function,
+                'file': filename,
+                'line': line,
+                'calls': calls,
+                'tottime': round(tottime, 6),
+                'cumtime': round(cumtime, 6),
+                'tottime_per_profile_ms': round(tottime / loaded * 1000, 3)
+            })
+        return result
+
+    def stats(self):
+        return {
+            'sample_every': self.sample_every,
+            'directory': self.directory,
+            'max_files': self.max_files,
+            'captured': self.captured,
+            'files': len(self.files())
+        }
+
+
+def install_profiling(app, profiler, admin_token=None):
+    """Profile sampled requests of a Flask app and add the /admin/profiling endpoints.
+
+    The admin endpoints and the X-Profile header need the X-Admin-Token header
+    to match admin_token; without a token they are only open to localhost,
+    and not to requests a proxy or tunnel such as ngrok forwarded from there.
+    Streaming responses are profiled until the response object is returned.
+    """
+    from flask import g, jsonify, request
+
+    @app.before_request
+    def _start_profile():
+        forced = request.headers.get('X-Profile') == '1' and is_admin(request, admin_token)
+        if (forced or profiler.should_sample()) and not request.path.startswith('/admin/'):
+            g._profile = profiler.start()
+
+    @app.after_request
+    def _finish_profile(response):
+        profile = g.pop('_profile', None)
+        if profile is not None:
+            route = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+            data = request.get_json(silent=True)
+            sender = data.get('sender', 'user') if isinstance(data, dict) else request.args.get('sender', 'user')
+            try:
+                profiler.finish(profile, route, sender)
+            except OSError as e:
+                print(f"Error writing profile: {e}")
+        return response
+
+    @app.route('/admin/profiling', methods=['GET', 'POST'])
+    def profiling_settings():
+        """Show or change the sampling rate ({"sample_every": N}, 0 turns sampling off)"""
+        if not is_admin(request, admin_token):
+            return jsonify({'error': 'Forbidden'}), 403
+        if request.method == 'POST':
+            data = request.get_json(silent=True) or {}
+            try:
+                every = int(data.get('sample_every', 0))
+            except (TypeError, ValueError):
+                every = -1
+            if every < 0:
+                return jsonify({'error': 'sample_every must be a non-negative integer'}), 400
+            profiler.sample_every = every
+        return jsonify(profiler.stats())
+
+    @app.route('/admin/profiling/report')
+    def profiling_report():
+        """Top-N hot functions across the captured profiles"""
+        if not is_admin(request, admin_token):
+            return jsonify({'error': 'Forbidden'}), 403
+        sort = request.args.get('sort', 'tottime')
+        if sort not in ('tottime', 'cumtime', 'calls'):
+            return jsonify({'error': 'sort must be tottime, cumtime or calls'}), 400
+        top = request.args.get('top', 20, type=int)
+        return jsonify(profiler.report(top=top, sort=sort, route=request.args.get('route'),
+                                       intent=request.args.get('intent')))
+
+    return app
+
+
+def profiler_from_env(default_directory):
+    """RequestProfiler configured by CHATBOT_PROFILE_* environment variables"""
+    return RequestProfiler(os.environ.get('CHATBOT_PROFILE_DIR', default_directory),
+                           sample_every=int(os.environ.get('CHATBOT_PROFILE_EVERY', 0)),
+                           max_files=int(os.environ.get('CHATBOT_PROFILE_MAX_FILES', 200)))
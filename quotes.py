@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+Solar system quotes: the scalar recommendation formula and a vectorized bulk engine
+
+Usage:
+    python quotes.py leads.csv -o quotes.csv
+    python quotes.py leads.jsonl -o quotes.jsonl --chunk-size 50000
+    cat leads.csv | python quotes.py - --format csv > quotes.csv
+
+Input rows need a monthly consumption column (energy_usage, kwh or
+monthly_kwh) and may have a location column. Rows are read, quoted and
+written one chunk at a time, so memory use does not grow with the file.
+"""
+
+import argparse
+import csv
+import itertools
+import json
+import math
+import os
+import sys
+from functools import lru_cache
+
+from entities import parse_number
+from irradiance import TABLE, UNKNOWN, province_index
+
+SIZING_FACTOR = 1.5
+PRICE_PER_WATT = 30  # TL
+DEFAULT_ENERGY_USAGE = 1000  # kWh per month
+DEFAULT_LOCATION = "bölgenizde"
+# Consumption is rounded to this many kWh before sizing, so quotes can be memoized
+KWH_STEP = 10
+
+# Price divisor per chatbot: ProfessionalChatbot prices per watt, SolarChatbot per kW
+PRICING = {'professional': 1, 'simple': 1000}
+
+ENERGY_FIELDS = ('energy_usage', 'kwh', 'monthly_kwh')
+LOCATION_FIELDS = ('location', 'il', 'city')
+QUOTE_FIELDS = ('system_size', 'price', 'bill_reduction', 'payback_years')
+
+
+def quantize(energy_usage):
+    """Round monthly kWh to the nearest KWH_STEP (at least one step)"""
+    return max(KWH_STEP, math.floor(energy_usage / KWH_STEP + 0.5) * KWH_STEP)
+
+
+@lru_cache(maxsize=8192)
+def _quote(province, energy_usage, price_divisor, price_per_watt):
+    peak_sun_hours = TABLE.peak_sun_hours[province]
+
+    daily_usage = energy_usage / 30
+    system_size = round(daily_usage / peak_sun_hours * SIZING_FACTOR, 1)
+    system_watts = system_size * 1000
+    price = round(system_watts * price_per_watt / price_divisor, 0)
+    bill_reduction = min(95, max(70, int(system_size * 8)))
+
+    # Savings are capped at the customer's own consumption
+    annual_savings = min(system_size * TABLE.annual_yield[province], energy_usage * 12) * TABLE.tariff
+    payback_years = round(price / annual_savings, 1) if annual_savings else None
+
+    return {
+        'system_size': system_size,
+        'price': price,
+        'bill_reduction': bill_reduction,
+        'payback_years': payback_years
+    }
+
+
+def recommend(energy_usage=None, location=None, price_divisor=1, price_per_watt=PRICE_PER_WATT):
+    """Size and price a system for one customer, using the province's irradiance"""
+    if not energy_usage:
+        energy_usage = DEFAULT_ENERGY_USAGE
+
+    if not location:
+        location = DEFAULT_LOCATION
+
+    quote = _quote(province_index(location), quantize(energy_usage), price_divisor, price_per_watt)
+    return dict(quote, location=location)
+
+
+def quote_cache_info():
+    """Hit/miss counters of the (province, kWh) quote cache"""
+    return _quote.cache_info()._asdict()
+
+
+def _round_like_python(values, ndigits):
+    """np.round that returns exactly what round(float, ndigits) returns.
+
+    np.round scales by 10**ndigits before rounding, which can move a value
+    that sits next to a .5 boundary across it; those few elements are
+    rounded again with Python's correctly rounded round().
+    """
+    import numpy as np
+
+    scale = 10.0 ** ndigits
+    scaled = values * scale
+    rounded = np.rint(scaled) / scale
+    distance = np.abs(scaled - np.floor(scaled) - 0.5)
+    near_tie = np.flatnonzero(distance <= np.abs(scaled) * 1e-12 + 1e-9)
+    if near_tie.size:
+        rounded[near_tie] = [round(value, ndigits) for value in values[near_tie].tolist()]
+    return rounded
+
+
+def recommend_many(energy_usage, price_divisor=1, provinces=None, price_per_watt=PRICE_PER_WATT):
+    """Vectorized recommend(): arrays of system_size, price, bill_reduction and payback_years.
+
+    energy_usage is an array of monthly kWh; zeros and NaNs get the default
+    consumption, like a missing value does in recommend(). provinces is an
+    array of irradiance table indices (UNKNOWN for no province); when it is
+    omitted every row uses the default peak sun hours. Payback is NaN where
+    recommend() returns None.
+    """
+    import numpy as np
+
+    energy = np.asarray(energy_usage, dtype=np.float64)
+    energy = np.where((energy == 0) | np.isnan(energy), float(DEFAULT_ENERGY_USAGE), energy)
+    energy = np.maximum(np.floor(energy / KWH_STEP + 0.5) * KWH_STEP, KWH_STEP)
+
+    if provinces is None:
+        provinces = np.full(energy.shape, UNKNOWN, dtype=np.intp)
+    hours_by_province, yield_by_province = TABLE.arrays()
+    peak_sun_hours = hours_by_province[provinces]
+
+    daily_usage = energy / 30
+    system_size = _round_like_python(daily_usage / peak_sun_hours * SIZING_FACTOR, 1)
+    system_watts = system_size * 1000
+    # round(x, 0) on a float is round-half-even of the exact value, which rint matches
+    price = np.rint(system_watts * price_per_watt / price_divisor)
+    bill_reduction = np.clip(np.trunc(system_size * 8), 70, 95).astype(np.int64)
+
+    annual_savings = np.minimum(system_size * yield_by_province[provinces], energy * 12) * TABLE.tariff
+    payback = np.divide(price, annual_savings, out=np.full(energy.shape, np.nan), where=annual_savings != 0)
+    payback_years = _round_like_python(payback, 1)
+
+    return {'system_size': system_size, 'price': price, 'bill_reduction': bill_reduction,
+            'payback_years': payback_years}
+
+
+def _field(row, names):
+    for name in names:
+        if name in row:
+            return row[name]
+    return None
+
+
+def _energy_value(value):
+    if value is None or value == '':
+        return math.nan
+    if isinstance(value, str):
+        return parse_number(value.strip())
+    return float(value)
+
+
+def quote_rows(rows, chunk_size=10000, price_divisor=1):
+    """Yield each input row (a dict) extended with its quote, chunk by chunk.
+
+    A row whose consumption cannot be parsed is passed through with an
+    'error' field and no quote.
+    """
+    import numpy as np
+
+    rows = iter(rows)
+    while True:
+        chunk = list(itertools.islice(rows, chunk_size))
+        if not chunk:
+            return
+
+        energy = np.empty(len(chunk))
+        provinces = np.empty(len(chunk), dtype=np.intp)
+        errors = {}
+        for i, row in enumerate(chunk):
+            provinces[i] = province_index(_field(row, LOCATION_FIELDS))
+            try:
+                energy[i] = _energy_value(_field(row, ENERGY_FIELDS))
+            except (TypeError, ValueError):
+                energy[i] = np.nan
+                errors[i] = f"Invalid energy usage: {_field(row, ENERGY_FIELDS)!r}"
+
+        quotes = recommend_many(energy, price_divisor, provinces)
+        columns = [quotes[name].tolist() for name in QUOTE_FIELDS]
+        columns[-1] = [None if math.isnan(years) else years for years in columns[-1]]
+
+        for i, row in enumerate(chunk):
+            out = dict(row)
+            if i in errors:
+                out['error'] = errors[i]
+                yield out
+                continue
+            for name, column in zip(QUOTE_FIELDS, columns):
+                out[name] = column[i]
+            out['location'] = _field(row, LOCATION_FIELDS) or DEFAULT_LOCATION
+            yield out
+
+
+def read_rows(stream, fmt):
+    """Lazily read dict rows from a CSV or JSONL stream"""
+    if fmt == 'csv':
+        yield from csv.DictReader(stream)
+    else:
+        for line in stream:
+            if line.strip():
+                yield json.loads(line)
+
+
+def write_rows(rows, stream, fmt, flush_every=10000):
+    """Write rows as CSV or JSONL as they arrive; returns the row count"""
+    count = 0
+    writer = None
+    for row in rows:
+        if fmt == 'csv':
+            if writer is None:
+                fields = list(row) + [name for name in QUOTE_FIELDS + ('location', 'error') if name not in row]
+                writer = csv.DictWriter(stream, fieldnames=fields, extrasaction='ignore')
+                writer.writeheader()
+            writer.writerow(row)
+        else:
+            stream.write(json.dumps(row, ensure_ascii=False) + '\n')
+        count += 1
+        if count % flush_every == 0:
+            stream.flush()
+    stream.flush()
+    return count
+
+
+def _format_for(path, explicit):
+    if explicit:
+        return explicit
+    return 'jsonl' if os.path.splitext(path)[1].lower() in ('.jsonl', '.json', '.ndjson') else 'csv'
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bulk solar quotes for a lead list")
+    parser.add_argument('input', help="CSV or JSONL file, or - for stdin")
+    parser.add_argument('-o', '--output', default='-', help="output file (default: stdout)")
+    parser.add_argument('--format', choices=('csv', 'jsonl'), help="input format (default: from extension)")
+    parser.add_argument('--output-format', choices=('csv', 'jsonl'), help="output format (default: from extension)")
+    parser.add_argument('--chunk-size', type=int, default=10000)
+    parser.add_argument('--pricing', choices=sorted(PRICING), default='professional')
+    args = parser.parse_args(argv)
+
+    in_format = _format_for(args.input, args.format)
+    out_format = _format_for(args.output, args.output_format or (args.format if args.output == '-' else None))
+
+    source = sys.stdin if args.input == '-' else open(args.input, newline='', encoding='utf-8')
+    target = sys.stdout if args.output == '-' else open(args.output, 'w', newline='', encoding='utf-8')
+    try:
+        rows = quote_rows(read_rows(source, in_format), args.chunk_size, PRICING[args.pricing])
+        count = write_rows(rows, target, out_format, flush_every=args.chunk_size)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if target is not sys.stdout:
+            target.close()
+
+    print(f"Quoted {count} rows", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Pooled Rasa REST client guarded by a circuit breaker and a background health probe
+"""
+
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from metrics import RASA_LATENCY
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitBreaker:
+    """Closed -> open after consecutive failures; half-open trial after a cool-down"""
+
+    def __init__(self, failure_threshold=3, reset_timeout=10):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.trial_in_flight = False
+        self.times_opened = 0
+        self._lock = threading.Lock()
+
+    def allow_request(self):
+        """Return True if a request may be sent to Rasa now"""
+        state = self.state
+        if state == CLOSED:
+            return True
+        with self._lock:
+            if self.state == OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = HALF_OPEN
+                self.trial_in_flight = False
+            if self.state == HALF_OPEN and not self.trial_in_flight:
+                # Let exactly one trial request through
+                self.trial_in_flight = True
+                return True
+            return self.state == CLOSED
+
+    def record_success(self):
+        if self.state == CLOSED and not self.failures:
+            return
+        with self._lock:
+            self.state = CLOSED
+            self.failures = 0
+            self.trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+                self._open()
+
+    def probe_succeeded(self):
+        """Health probe reached Rasa: allow a trial request without waiting for the cool-down"""
+        if self.state != OPEN:
+            return
+        with self._lock:
+            if self.state == OPEN:
+                self.state = HALF_OPEN
+                self.trial_in_flight = False
+
+    def probe_failed(self):
+        """Health probe could not reach Rasa: stop sending traffic"""
+        with self._lock:
+            if self.state != OPEN:
+                self._open()
+            else:
+                self.opened_at = time.monotonic()
+
+    def _open(self):
+        if self.state != OPEN:
+            self.times_opened += 1
+        self.state = OPEN
+        self.opened_at = time.monotonic()
+        self.trial_in_flight = False
+
+    def stats(self):
+        return {
+            'state': self.state,
+            'consecutive_failures': self.failures,
+            'times_opened': self.times_opened,
+            'failure_threshold': self.failure_threshold,
+            'reset_timeout': self.reset_timeout
+        }
+
+
+class RasaClient:
+    """Keep-alive connection pool to the Rasa REST webhook"""
+
+    def __init__(self, base_url='http://localhost:5005', timeout=2, pool_size=10,
+                 probe_interval=5, breaker=None):
+        self.base_url = base_url.rstrip('/')
+        self.webhook_url = self.base_url + '/webhooks/rest/webhook'
+        self.timeout = timeout
+        self.probe_interval = probe_interval
+        self.breaker = breaker or CircuitBreaker()
+
+        self.session = requests.Session()
+        self.adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount('http://', self.adapter)
+        self.session.mount('https://', self.adapter)
+
+        self.successes = 0
+        self.timeouts = 0
+        self.errors = 0
+        self.short_circuited = 0
+        self.last_probe_ok = None
+        self.last_outcome = None
+
+        self._stop = threading.Event()
+        self._prober = None
+
+    def send_message(self, sender, message):
+        """Return Rasa's reply list, or None when the caller should use the fallback"""
+        start = time.perf_counter()
+        if not self.breaker.allow_request():
+            self.short_circuited += 1
+            self.last_outcome = 'fallback'
+            RASA_LATENCY.observe(time.perf_counter() - start, ('fallback',))
+            return None
+
+        try:
+            response = self.session.post(self.webhook_url, json={'sender': sender, 'message': message},
+                                         timeout=self.timeout)
+            response.raise_for_status()
+            reply = response.json()
+        except requests.Timeout:
+            self.timeouts += 1
+            self.last_outcome = 'timeout'
+            self.breaker.record_failure()
+            RASA_LATENCY.observe(time.perf_counter() - start, ('timeout',))
+            return None
+        except (requests.RequestException, ValueError):
+            self.errors += 1
+            self.last_outcome = 'error'
+            self.breaker.record_failure()
+            RASA_LATENCY.observe(time.perf_counter() - start, ('error',))
+            return None
+
+        self.successes += 1
+        self.last_outcome = 'success'
+        self.breaker.record_success()
+        RASA_LATENCY.observe(time.perf_counter() - start, ('success',))
+        return reply
+
+    def probe(self):
+        """Check Rasa's root endpoint once and feed the result to the breaker"""
+        try:
+            ok = self.session.get(self.base_url + '/', timeout=self.timeout).status_code == 200
+        except requests.RequestException:
+            ok = False
+        self.last_probe_ok = ok
+        if ok:
+            self.breaker.probe_succeeded()
+        else:
+            self.breaker.probe_failed()
+        return ok
+
+    def start_health_probe(self):
+        """Start the background health probe thread"""
+        if self._prober is not None and self._prober.is_alive():
+            return
+        self._stop.clear()
+        self._prober = threading.Thread(target=self._probe_loop, name='rasa-health-probe', daemon=True)
+        self._prober.start()
+
+    def stop_health_probe(self):
+        self._stop.set()
+        if self._prober is not None:
+            self._prober.join()
+            self._prober = None
+
+    def _probe_loop(self):
+        while not self._stop.is_set():
+            self.probe()
+            self._stop.wait(self.probe_interval)
+
+    @property
+    def connected(self):
+        return bool(self.last_probe_ok) and self.breaker.state == CLOSED
+
+    def pool_stats(self):
+        """Connection pool counters from urllib3"""
+        container = self.adapter.poolmanager.pools
+        pools = [container[key] for key in container.keys()]
+        return {
+            'max_size': self.adapter._pool_maxsize,
+            'hosts': len(pools),
+            'connections_opened': sum(pool.num_connections for pool in pools),
+            'requests_sent': sum(pool.num_requests for pool in pools),
+            'idle_connections': sum(pool.pool.qsize() for pool in pools if pool.pool is not None)
+        }
+
+    def stats(self):
+        return {
+            'breaker': self.breaker.stats(),
+            'pool': self.pool_stats(),
+            'last_probe_ok': self.last_probe_ok,
+            'successes': self.successes,
+            'timeouts': self.timeouts,
+            'errors': self.errors,
+            'fallbacks': self.short_circuited + self.timeouts + self.errors
+        }
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Parallel Rasa process startup with HTTP readiness polling
+"""
+
+import os
+import subprocess
+import threading
+import time
+
+import requests
+
+ACTION_SERVER_URL = "http://localhost:5055/health"
+CORE_SERVER_URL = "http://localhost:5005/"
+
+COMPONENTS = [
+    ('action_server', ["rasa", "run", "actions"], ACTION_SERVER_URL),
+    ('core_server', ["rasa", "run", "--enable-api", "--cors", "*"], CORE_SERVER_URL)
+]
+
+
+def wait_until_ready(url, deadline, process=None, initial_delay=0.1, max_delay=2.0):
+    """Poll url with exponential backoff until it answers 200, the process exits, or the deadline passes"""
+    delay = initial_delay
+    while True:
+        try:
+            if requests.get(url, timeout=1).status_code == 200:
+                return True
+        except requests.RequestException:
+            pass
+
+        if process is not None and process.poll() is not None:
+            return False
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return False
+        time.sleep(min(delay, remaining))
+        delay = min(delay * 2, max_delay)
+
+
+def launch_rasa(cwd=None, timeout=180, log_dir=None, components=COMPONENTS):
+    """Start the Rasa servers in parallel and wait for each to report ready.
+
+    Returns {name: {'process', 'ready', 'seconds'}}; 'seconds' is the time from
+    launch until the component answered its readiness URL.
+    """
+    started = time.monotonic()
+    deadline = started + timeout
+    results = {}
+
+    for name, command, url in components:
+        if log_dir:
+            os.makedirs(log_dir, exist_ok=True)
+            output = open(os.path.join(log_dir, f"rasa_{name}.log"), 'ab')
+        else:
+            output = subprocess.DEVNULL
+        try:
+            process = subprocess.Popen(command, cwd=cwd, stdout=output, stderr=subprocess.STDOUT)
+        except Exception:
+            for result in results.values():
+                result['process'].terminate()
+            raise
+        finally:
+            if output is not subprocess.DEVNULL:
+                output.close()
+        results[name] = {'process': process, 'ready': False, 'seconds': None}
+
+    def watch(name, url):
+        result = results[name]
+        result['ready'] = wait_until_ready(url, deadline, process=result['process'])
+        result['seconds'] = round(time.monotonic() - started, 2)
+
+    watchers = [threading.Thread(target=watch, args=(name, url), daemon=True)
+                for name, _, url in components]
+    for watcher in watchers:
+        watcher.start()
+    for watcher in watchers:
+        watcher.join()
+
+    return results
+
+
+def format_startup_report(results):
+    """One line per component with its readiness time"""
+    lines = []
+    for name, result in results.items():
+        if result['ready']:
+            lines.append(f"✓ {name.replace('_', ' ').title()} ready in {result['seconds']:.2f}s")
+        else:
+            lines.append(f"✗ {name.replace('_', ' ').title()} not ready after {result['seconds']:.2f}s")
+    return "\n".join(lines)
@@ -7,10 +7,10 @@ This script helps set up and run the complete chatbot system.
 import os
 import sys
 import subprocess
-import time
 import threading
 import webbrowser
 from pathlib import Path
+from rasa_launcher import launch_rasa, format_startup_report
 
 def check_python_version():
     """Check if Python version is compatible"""
@@ -55,30 +55,11 @@ def train_rasa_model():
         return False
 
 def start_rasa_servers():
-    """Start Rasa action server and core server"""
+    """Start Rasa action server and core server in parallel and wait until both are ready"""
     print("Starting Rasa servers...")
 
-    # Start action server
     try:
-        action_process = subprocess.Popen(
-            ["rasa", "run", "actions"],
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE
-        )
-        time.sleep(3)
-        print("✓ Rasa Action Server started")
-
-        # Start main server
-        rasa_process = subprocess.Popen(
-            ["rasa", "run", "--enable-api", "--cors", "*"],
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE
-        )
-        time.sleep(5)
-        print("✓ Rasa Core Server started")
-
-        return action_process, rasa_process
-
+        results = launch_rasa(log_dir="logs")
     except FileNotFoundError:
         print("Error: Rasa not found. Please install Rasa first.")
         return None, None
@@ -86,6 +67,9 @@ def start_rasa_servers():
         print(f"Error starting Rasa servers: {e}")
         return None, None
 
+    print(format_startup_report(results))
+    return results['action_server']['process'], results['core_server']['process']
+
 def start_flask_app():
     """Start the Flask web application"""
     print("Starting Flask web application...")
@@ -93,11 +77,10 @@ def start_flask_app():
         # Import and run the Flask app
         from app import app, rasa_manager
 
-        # Start Rasa if not already running
+        # Start Rasa if not already running; Flask answers with fallbacks until it is ready
         if not rasa_manager.rasa_running:
             rasa_thread = threading.Thread(target=rasa_manager.start_rasa, daemon=True)
             rasa_thread.start()
-            time.sleep(8)
 
         print("✓ Flask application started")
         print("\n🌟 Solar Panel Chatbot is ready!")
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Split chat replies into display/speech segments for streaming
+"""
+
+from prepared_responses import as_payload
+
+
+def iter_segments(payload):
+    """Yield {'kind', 'text', ...} segments for a get_response_json payload, in display order"""
+    kind = payload.get('type')
+
+    if kind == 'menu':
+        yield {'kind': 'title', 'text': payload['title']}
+        for option in payload.get('options', []):
+            yield {
+                'kind': 'option',
+                'text': f"{option['text']}: {option['description']}",
+                'action': option.get('action')
+            }
+
+    elif kind == 'list':
+        yield {'kind': 'title', 'text': payload['title']}
+        for item in payload.get('items', []):
+            yield {
+                'kind': 'item',
+                'text': f"{item['title']}: " + ", ".join(item.get('details', [])),
+                'title': item['title'],
+                'details': item.get('details', [])
+            }
+        if payload.get('footer'):
+            for paragraph in payload['footer'].split('\n\n'):
+                if paragraph.strip():
+                    yield {'kind': 'footer', 'text': paragraph.strip()}
+
+    else:
+        # Plain text: one segment per paragraph
+        for paragraph in payload.get('content', '').split('\n\n'):
+            if paragraph.strip():
+                yield {'kind': 'text', 'text': paragraph.strip()}
+
+
+def segment_texts(responses):
+    """Every segment text in a response catalog (for TTS pre-warming)"""
+    texts = []
+    for options in responses.values():
+        for option in options:
+            texts.extend(segment['text'] for segment in iter_segments(as_payload(option)))
+    return texts
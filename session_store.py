@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Per-sender conversation session store with LRU and idle-TTL eviction
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+
+class ConversationState:
+    """Compact per-sender dialogue state"""
+    __slots__ = ('current_state', 'last_intent', 'user_data', 'last_seen', 'lock')
+
+    def __init__(self):
+        self.current_state = "MAIN_MENU"
+        self.last_intent = None
+        self.user_data = {}
+        self.last_seen = time.monotonic()
+        self.lock = threading.Lock()
+
+    def apply_to(self, chatbot):
+        """Load this session into a chatbot engine before a turn"""
+        chatbot.current_state = self.current_state
+        chatbot.last_intent = self.last_intent
+        chatbot.user_data = self.user_data
+
+    def capture(self, chatbot):
+        """Store the chatbot engine's state back into this session after a turn"""
+        self.current_state = chatbot.current_state
+        self.last_intent = chatbot.last_intent
+        self.user_data = chatbot.user_data
+
+
+class SessionStore:
+    def __init__(self, max_sessions=50000, idle_ttl=1800, sweep_interval=60):
+        self.max_sessions = max_sessions
+        self.idle_ttl = idle_ttl
+        self.sweep_interval = sweep_interval
+
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._sweeper = None
+
+        self.hits = 0
+        self.misses = 0
+        self.lru_evictions = 0
+        self.ttl_evictions = 0
+
+    def get(self, sender):
+        """Return the session for sender, creating it if needed"""
+        now = time.monotonic()
+        with self._lock:
+            session = self._sessions.get(sender)
+            if session is not None and now - session.last_seen > self.idle_ttl:
+                # Expired but not swept yet
+                del self._sessions[sender]
+                self.ttl_evictions += 1
+                session = None
+
+            if session is None:
+                self.misses += 1
+                session = ConversationState()
+                self._sessions[sender] = session
+                while len(self._sessions) > self.max_sessions:
+                    self._sessions.popitem(last=False)
+                    self.lru_evictions += 1
+            else:
+                self.hits += 1
+                self._sessions.move_to_end(sender)
+
+            session.last_seen = now
+            return session
+
+    def reset(self, sender):
+        """Drop the session for sender"""
+        with self._lock:
+            return self._sessions.pop(sender, None) is not None
+
+    def sweep(self):
+        """Evict every session idle for longer than the TTL"""
+        cutoff = time.monotonic() - self.idle_ttl
+        evicted = 0
+        with self._lock:
+            # Sessions are kept in access order, so expired ones are at the front
+            while self._sessions:
+                sender, session = next(iter(self._sessions.items()))
+                if session.last_seen > cutoff:
+                    break
+                del self._sessions[sender]
+                evicted += 1
+            self.ttl_evictions += evicted
+        return evicted
+
+    def start_sweeper(self):
+        """Start the background TTL sweeper thread"""
+        if self._sweeper is not None and self._sweeper.is_alive():
+            return
+        self._stop.clear()
+        self._sweeper = threading.Thread(target=self._sweep_loop, name='session-sweeper', daemon=True)
+        self._sweeper.start()
+
+    def stop_sweeper(self):
+        """Stop the background TTL sweeper thread"""
+        self._stop.set()
+        if self._sweeper is not None:
+            self._sweeper.join()
+            self._sweeper = None
+
+    def _sweep_loop(self):
+        while not self._stop.wait(self.sweep_interval):
+            try:
+                self.sweep()
+            except Exception as e:
+                print(f"Error in session sweeper: {e}")
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def stats(self):
+        """Return session counters"""
+        lookups = self.hits + self.misses
+        return {
+            'active': len(self._sessions),
+            'max_sessions': self.max_sessions,
+            'idle_ttl': self.idle_ttl,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+            'lru_evictions': self.lru_evictions,
+            'ttl_evictions': self.ttl_evictions
+        }
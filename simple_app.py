@@ -3,18 +3,156 @@
 Simple Flask app for solar panel chatbot demo
 """
 
-from flask import Flask, render_template, request, jsonify, send_from_directory
 import os
-import tempfile
+import argparse
 import uuid
-from gtts import gTTS
+import atexit
 import base64
-from professional_chatbot import ProfessionalChatbot as SolarChatbot
-from pyngrok import ngrok
+import json
+import time
+from urllib.parse import urlencode
+
+# Created before the heavy imports so they show up in the startup report
+from startup import StartupTimer
+startup = StartupTimer(budget_ms=int(os.environ.get('CHATBOT_STARTUP_BUDGET_MS', 1000)))
+
+from flask import Flask, render_template, request, jsonify, send_from_directory, stream_with_context
+startup.mark('import flask')
+from professional_chatbot import CONTENT, ProfessionalChatbot as SolarChatbot
+startup.mark('import chatbot')
+from session_store import SessionStore
+from batch import run_batch
+from segments import iter_segments, segment_texts
+from sse import sse_event, sse_response
+from tts import AudioCache, Prefetcher, get_backend, prewarm, speakable_texts
+from metrics import INTENT_LATENCY, REGISTRY, instrument_app
+from profiling import install_profiling, note_intent, profiler_from_env
+from conversation_log import log_from_env
+from content_store import install_content_admin
+from fuzzy_matcher import fuzzy_stats
 import threading
+startup.mark('import app modules')
 
 app = Flask(__name__)
-chatbot = SolarChatbot()
+instrument_app(app)
+
+# Request profiling is off unless CHATBOT_PROFILE_EVERY or /admin/profiling turns it on
+profiler = profiler_from_env(os.path.join(os.path.dirname(os.path.abspath(__file__)), '.profiles'))
+install_profiling(app, profiler, admin_token=os.environ.get('CHATBOT_ADMIN_TOKEN'))
+
+# Menu and reply files are reloaded in the background when they change
+# (CHATBOT_CONTENT_WATCH seconds between checks, 0 disables; POST /admin/content reloads now)
+CONTENT.watch(float(os.environ.get('CHATBOT_CONTENT_WATCH', 2)))
+install_content_admin(app, [CONTENT], admin_token=os.environ.get('CHATBOT_ADMIN_TOKEN'))
+
+# Session limits (override with environment variables)
+MAX_SESSIONS = int(os.environ.get('CHATBOT_MAX_SESSIONS', 50000))
+SESSION_IDLE_TTL = int(os.environ.get('CHATBOT_SESSION_TTL', 1800))
+MAX_BATCH_ITEMS = int(os.environ.get('CHATBOT_MAX_BATCH_ITEMS', 10000))
+BATCH_WORKERS = int(os.environ.get('CHATBOT_BATCH_WORKERS', 8))
+
+sessions = SessionStore(max_sessions=MAX_SESSIONS, idle_ttl=SESSION_IDLE_TTL)
+sessions.start_sweeper()
+
+# Turn transcripts, written off the request thread (CHATBOT_LOG_BACKEND=off disables)
+conversation_log = log_from_env(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'logs', 'conversations'))
+if conversation_log is not None:
+    atexit.register(conversation_log.close)
+
+# TTS settings (override with environment variables)
+TTS_BACKEND = os.environ.get('CHATBOT_TTS_BACKEND', 'gtts')
+TTS_CACHE_DIR = os.environ.get('CHATBOT_TTS_CACHE_DIR',
+                               os.path.join(os.path.dirname(os.path.abspath(__file__)), '.tts_cache'))
+TTS_CACHE_MB = int(os.environ.get('CHATBOT_TTS_CACHE_MB', 64))
+TTS_PREWARM = os.environ.get('CHATBOT_TTS_PREWARM', '0') == '1'
+TTS_PREWARM_WORKERS = int(os.environ.get('CHATBOT_TTS_PREWARM_WORKERS', 4))
+TTS_PREFETCH_PENDING = int(os.environ.get('CHATBOT_TTS_PREFETCH_PENDING', 16))
+
+tts_cache = AudioCache(get_backend(TTS_BACKEND), memory_limit=TTS_CACHE_MB * 1024 * 1024,
+                       cache_dir=TTS_CACHE_DIR or None)
+
+# Synthesizes later SSE segments while the browser plays the first one
+tts_prefetch = Prefetcher(tts_cache, workers=2, max_pending=TTS_PREFETCH_PENDING)
+
+# HTTPS tunnel for microphone access from other devices (CHATBOT_TUNNEL=0 or --no-tunnel disables)
+TUNNEL = os.environ.get('CHATBOT_TUNNEL', '1') == '1'
+
+def start_tunnel(port):
+    """Open an ngrok HTTPS tunnel to port; pyngrok is only imported when a tunnel is wanted"""
+    try:
+        from pyngrok import ngrok
+
+        public_url = ngrok.connect(port).public_url
+        print("🔒 HTTPS Tunnel: " + public_url)
+        print("🎤 Mikrofon izni için HTTPS linkini kullanın!")
+    except Exception as e:
+        print(f"⚠️  Ngrok başlatılamadı: {e}")
+        print("🔒 HTTPS olmadan mikrofon çalışmayabilir!")
+
+def prewarm_tts():
+    """Synthesize every static response string and segment into the TTS cache"""
+    responses = SolarChatbot().responses
+    texts = list(dict.fromkeys(speakable_texts(responses) + segment_texts(responses)))
+    failures = prewarm(tts_cache, texts, lang='tr', workers=TTS_PREWARM_WORKERS)
+    print(f"🔊 TTS cache pre-warmed: {len(texts) - failures}/{len(texts)} texts")
+
+# One engine per worker thread; conversation state lives in the session store
+_engines = threading.local()
+
+def get_engine():
+    """Return the chatbot engine for the current thread"""
+    engine = getattr(_engines, 'chatbot', None)
+    if engine is None:
+        engine = _engines.chatbot = SolarChatbot()
+    return engine
+
+def handle_message(sender, message):
+    """Run one conversation turn for sender and return the prepared response"""
+    start = time.perf_counter()
+    session = sessions.get(sender)
+    engine = get_engine()
+    with session.lock:
+        state_before = session.current_state
+        session.apply_to(engine)
+        prepared = engine.get_prepared_response(message)
+        session.capture(engine)
+        intent = engine.last_intent
+        state_after = engine.current_state
+        # Only what this message mentioned, not the session's accumulated user_data
+        entities = dict(engine.last_entities)
+    latency = time.perf_counter() - start
+    INTENT_LATENCY.observe(latency, (intent,))
+    note_intent(intent)
+    if conversation_log is not None:
+        conversation_log.log_turn('simple', sender, message, state_before, state_after, intent, entities, latency)
+    return prepared
+
+def collect_metrics():
+    """Session, TTS cache and content figures, read at scrape time"""
+    session_stats = sessions.stats()
+    cache_stats = tts_cache.stats()
+    yield ('chatbot_sessions_active', 'gauge', "Conversation sessions in the store",
+           [({}, session_stats['active'])])
+    yield ('chatbot_session_evictions', 'counter', "Sessions evicted by reason",
+           [({'reason': 'lru'}, session_stats['lru_evictions']), ({'reason': 'ttl'}, session_stats['ttl_evictions'])])
+    yield ('chatbot_tts_cache_lookups', 'counter', "TTS cache lookups by result",
+           [({'result': 'memory_hit'}, cache_stats['memory_hits']), ({'result': 'disk_hit'}, cache_stats['disk_hits']),
+            ({'result': 'miss'}, cache_stats['misses'])])
+    yield ('chatbot_tts_cache_bytes', 'gauge', "Audio bytes held in the TTS memory cache",
+           [({}, cache_stats['memory_bytes'])])
+    content_stats = CONTENT.stats()
+    yield ('chatbot_content_version', 'gauge', "Content version being served (1 until the first reload)",
+           [({}, content_stats['version'])])
+    yield ('chatbot_content_reloads', 'counter', "Content reloads by result",
+           [({'result': 'ok'}, content_stats['reloads']), ({'result': 'error'}, content_stats['reload_errors'])])
+    if conversation_log is not None:
+        log_stats = conversation_log.stats()
+        yield ('chatbot_conversation_log_events', 'counter', "Conversation turns by outcome",
+               [({'result': 'written'}, log_stats['written']), ({'result': 'dropped'}, log_stats['dropped'])])
+        yield ('chatbot_conversation_log_queued', 'gauge', "Turns waiting for the log writer",
+               [({}, log_stats['queued'])])
+
+REGISTRY.add_collector(collect_metrics)
 
 @app.route('/')
 def index():
@@ -37,10 +175,12 @@ def chat():
         if not message:
             return jsonify({'error': 'No message provided'}), 400
 
-        # Get response from our simple chatbot
-        response = chatbot.get_response_json(message)
+        # Get response from this sender's conversation
+        prepared = handle_message(sender, message)
 
-        return jsonify([response])
+        # Static replies are already serialized; write the bytes straight out
+        return app.response_class(prepared.body, mimetype='application/json',
+                                  headers={'ETag': prepared.etag})
 
     except Exception as e:
         print(f"Error in chat endpoint: {e}")
@@ -49,6 +189,64 @@ def chat():
             'error': str(e)
         }]), 500
 
+@app.route('/api/chat/batch', methods=['POST'])
+def chat_batch():
+    """Handle an array of {sender, message} items in one request"""
+    data = request.get_json(silent=True)
+    items = data.get('messages') if isinstance(data, dict) else data
+
+    if not isinstance(items, list) or not items:
+        return jsonify({'error': 'Expected a non-empty array of {sender, message} items'}), 400
+    if len(items) > MAX_BATCH_ITEMS:
+        return jsonify({'error': f'Too many items (limit {MAX_BATCH_ITEMS})'}), 413
+
+    def generate():
+        start = time.perf_counter()
+        errors = 0
+        yield b'{"results":['
+        for count, (index, sender, prepared, seconds, error) in enumerate(
+                run_batch(items, handle_message, workers=BATCH_WORKERS)):
+            # Each result is written as soon as it is ready; prepared bodies are spliced in as-is
+            head = {'index': index, 'sender': sender, 'ms': round(seconds * 1000, 3)}
+            if error:
+                errors += 1
+                head['error'] = error
+                chunk = json.dumps(head, ensure_ascii=False).encode('utf-8')
+            else:
+                chunk = json.dumps(head, ensure_ascii=False)[:-1].encode('utf-8') + b',"response":' + prepared.body + b'}'
+            yield (b',' if count else b'') + chunk
+        summary = {'count': len(items), 'errors': errors, 'elapsed_ms': round((time.perf_counter() - start) * 1000, 3)}
+        yield b'],' + json.dumps(summary)[1:].encode('utf-8')
+
+    return app.response_class(generate(), mimetype='application/json')
+
+@app.route('/api/chat/stream', methods=['GET', 'POST'])
+def chat_stream():
+    """Stream a chat reply as Server-Sent Events, one event per segment"""
+    data = (request.get_json(silent=True) if request.method == 'POST' else request.args) or {}
+    message = data.get('message', '')
+    sender = data.get('sender', 'user')
+    with_audio = str(data.get('tts', '0')).lower() in ('1', 'true')
+
+    if not message:
+        return jsonify({'error': 'No message provided'}), 400
+
+    prepared = handle_message(sender, message)
+
+    def generate():
+        count = 0
+        for index, segment in enumerate(iter_segments(prepared.payload)):
+            if with_audio:
+                segment['audio'] = '/api/tts/stream?' + urlencode({'text': segment['text']})
+                if index:
+                    tts_prefetch.submit(segment['text'])
+            segment['index'] = index
+            count += 1
+            yield sse_event('segment', segment)
+        yield sse_event('done', {'type': prepared.payload.get('type'), 'segments': count})
+
+    return sse_response(generate())
+
 @app.route('/api/status')
 def status():
     """Check the status of the chatbot system"""
@@ -56,10 +254,21 @@ def status():
         'flask': 'running',
         'chatbot': 'simple rule-based',
         'status': 'ready',
+        'sessions': sessions.stats(),
+        'tts_cache': tts_cache.stats(),
+        'tts_prefetch': tts_prefetch.stats(),
+        'conversation_log': conversation_log.stats() if conversation_log is not None else None,
+        'content': CONTENT.stats(),
+        'fuzzy_matching': fuzzy_stats(),
+        'startup': startup.report(),
         'endpoints': {
             'chat': '/api/chat',
+            'chat_batch': '/api/chat/batch',
+            'chat_stream': '/api/chat/stream',
             'status': '/api/status',
-            'tts': '/api/tts'
+            'metrics': '/metrics',
+            'tts': '/api/tts',
+            'tts_stream': '/api/tts/stream'
         }
     })
 
@@ -73,21 +282,9 @@ def text_to_speech():
         if not text:
             return jsonify({'error': 'No text provided'}), 400
 
-        # Generate speech using Google TTS with Turkish language
-        tts = gTTS(text=text, lang='tr', slow=False)
-
-        # Create temporary file
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.mp3') as temp_file:
-            temp_path = temp_file.name
-            tts.save(temp_path)
-
-        # Read the file and encode to base64
-        with open(temp_path, 'rb') as audio_file:
-            audio_data = audio_file.read()
-            audio_base64 = base64.b64encode(audio_data).decode('utf-8')
-
-        # Clean up temporary file
-        os.unlink(temp_path)
+        # Cached by (text, lang, voice settings); synthesized only on a miss
+        audio_data = tts_cache.get(text, lang='tr', slow=False)
+        audio_base64 = base64.b64encode(audio_data).decode('utf-8')
 
         return jsonify({
             'audio': audio_base64,
@@ -100,43 +297,94 @@ def text_to_speech():
         print(f"Error in TTS endpoint: {e}")
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/tts/stream', methods=['GET'])
+def text_to_speech_stream():
+    """Stream Turkish speech as audio/mpeg bytes (playable directly by <audio>)"""
+    text = request.args.get('text', '').strip()
+    if not text:
+        return jsonify({'error': 'No text provided'}), 400
+
+    etag = tts_cache.key(text, lang='tr', slow=False)
+    audio_data = tts_cache.lookup(text, lang='tr', slow=False)
+
+    if audio_data is None and request.range is None:
+        # Not cached yet: send chunks as soon as the backend produces them
+        chunks = tts_cache.stream(text, lang='tr', slow=False)
+        try:
+            # A backend that fails before any audio gets a JSON error instead of an HTML 500
+            first = next(chunks, b'')
+        except Exception as e:
+            print(f"Error in TTS stream endpoint: {e}")
+            return jsonify({'error': str(e)}), 502
+
+        def generate():
+            try:
+                yield first
+                yield from chunks
+            except Exception as e:
+                # Headers are already sent; the cache only keeps complete audio, so just end the stream
+                print(f"Error in TTS stream endpoint after the first chunk: {e}")
+            finally:
+                chunks.close()
+
+        response = app.response_class(stream_with_context(generate()), mimetype='audio/mpeg')
+        response.headers['Accept-Ranges'] = 'bytes'
+        return response
+
+    if audio_data is None:
+        # Range requests need the complete length
+        try:
+            audio_data = tts_cache.get(text, lang='tr', slow=False)
+        except Exception as e:
+            print(f"Error in TTS stream endpoint: {e}")
+            return jsonify({'error': str(e)}), 502
+
+    response = app.response_class(audio_data, mimetype='audio/mpeg')
+    response.set_etag(etag)
+    response.cache_control.public = True
+    response.cache_control.max_age = 86400
+    return response.make_conditional(request, accept_ranges=True, complete_length=len(audio_data))
+
 @app.route('/templates/<path:filename>')
 def serve_template(filename):
     """Serve template files"""
     return send_from_directory('templates', filename)
 
+startup.mark('app setup')
+
 if __name__ == '__main__':
+    from werkzeug.serving import make_server
+
+    parser = argparse.ArgumentParser(description="Solar panel chatbot (simple version)")
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=5001)
+    parser.add_argument('--no-tunnel', action='store_true', help="offline mode: do not open an ngrok tunnel")
+    args = parser.parse_args()
+
     print("🌞 Starting Solar Panel Chatbot (Simple Version)")
     print("=" * 50)
-    print("📱 Chatbot Interface: http://localhost:5001")
-    print("🔍 API Status: http://localhost:5001/api/status")
-    print("💬 Chat API: http://localhost:5001/api/chat")
+    print(f"📱 Chatbot Interface: http://localhost:{args.port}")
+    print(f"🔍 API Status: http://localhost:{args.port}/api/status")
+    print(f"💬 Chat API: http://localhost:{args.port}/api/chat")
+    print(f"📈 Metrics: http://localhost:{args.port}/metrics")
 
-    # Start ngrok tunnel for HTTPS support
-    try:
-        public_tunnel = ngrok.connect(5001)
-        public_url = public_tunnel.public_url
-        print("🔒 HTTPS Tunnel: " + public_url)
-        print("🎤 Mikrofon izni için HTTPS linkini kullanın!")
-        print("=" * 50)
-    except Exception as e:
-        print(f"⚠️  Ngrok başlatılamadı: {e}")
-        print("🔒 HTTPS olmadan mikrofon çalışmayabilir!")
-        print("=" * 50)
+    # Bind first: the worker accepts traffic before optional subsystems start
+    server = make_server(args.host, args.port, app, threaded=True)
+    startup.mark('server bind')
+    print(startup.format_report())
+    print("=" * 50)
 
-    print("Ready to help customers go solar! ☀️")
-    print()
+    if TUNNEL and not args.no_tunnel:
+        # ngrok can take seconds, or time out when offline; it no longer delays serving
+        threading.Thread(target=start_tunnel, args=(args.port,), name='ngrok-tunnel', daemon=True).start()
 
-    # Run Flask in a separate thread so ngrok stays alive
-    def run_flask():
-        app.run(host='0.0.0.0', port=5001, debug=False, use_reloader=False)
+    if TTS_PREWARM:
+        threading.Thread(target=prewarm_tts, name='tts-prewarm', daemon=True).start()
 
-    flask_thread = threading.Thread(target=run_flask)
-    flask_thread.daemon = True
-    flask_thread.start()
+    print("Ready to help customers go solar! ☀️")
+    print()
 
     try:
-        # Keep the main thread alive
-        flask_thread.join()
+        server.serve_forever()
     except KeyboardInterrupt:
-        print("\n👋 Chatbot kapatılıyor...")
\ No newline at end of file
+        print("\n👋 Chatbot kapatılıyor...")
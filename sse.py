@@ -0,0 +1,21 @@
+#!/usr/bin/env python3
+"""
+Server-Sent Events helpers shared by the streaming endpoints of both apps
+"""
+
+import json
+
+from flask import Response
+
+
+def sse_event(event, data):
+    """Encode one Server-Sent Event"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n".encode('utf-8')
+
+
+def sse_response(events):
+    """A text/event-stream response for an iterable of encoded events, kept out of proxy buffers"""
+    response = Response(events, mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+Startup phase timing: how long a fresh worker takes to become able to serve
+"""
+
+import time
+
+
+class StartupTimer:
+    """Records the time spent in each startup phase, in order"""
+
+    def __init__(self, budget_ms=None):
+        self.budget_ms = budget_ms
+        self.started = time.perf_counter()
+        self._last = self.started
+        self.phases = []
+
+    def mark(self, name):
+        """End the current phase: everything since the previous mark is attributed to name"""
+        now = time.perf_counter()
+        self.phases.append((name, now - self._last))
+        self._last = now
+
+    @property
+    def elapsed_ms(self):
+        return (self._last - self.started) * 1000
+
+    def report(self):
+        return {
+            # A list, because JSON responses sort object keys
+            'phases': [{'name': name, 'ms': round(seconds * 1000, 1)} for name, seconds in self.phases],
+            'total_ms': round(self.elapsed_ms, 1),
+            'budget_ms': self.budget_ms,
+            'within_budget': self.budget_ms is None or self.elapsed_ms <= self.budget_ms
+        }
+
+    def format_report(self):
+        lines = ["⏱️  Startup phases:"]
+        for name, seconds in self.phases:
+            lines.append(f"   {name:<18} {seconds * 1000:8.1f} ms")
+        total = f"   {'total':<18} {self.elapsed_ms:8.1f} ms"
+        if self.budget_ms is not None:
+            status = '✅ within' if self.elapsed_ms <= self.budget_ms else '⚠️  over'
+            total += f"  ({status} the {self.budget_ms} ms budget)"
+        lines.append(total)
+        return "\n".join(lines)
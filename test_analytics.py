@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Tests for conversation log analytics
+"""
+
+from analytics import DEFAULT_FUNNEL, analyze, find_shards, main
+from conversation_log import JsonlWriter
+from professional_chatbot import ProfessionalChatbot
+
+DAY = 86400
+START = 1790000000  # 2026-09-21 UTC
+
+
+def simulate(writer, sender, messages, ts):
+    """Run messages through the engine and write the turns as the app would"""
+    engine = ProfessionalChatbot()
+    events = []
+    for message in messages:
+        state_before = engine.current_state
+        engine.get_response_json(message)
+        events.append({'ts': ts, 'app': 'simple', 'sender': sender, 'message': message,
+                       'state_before': state_before, 'state_after': engine.current_state,
+                       'intent': engine.last_intent, 'entities': dict(engine.user_data), 'latency_ms': 1.0})
+        ts += 1
+    writer.write(events)
+    return engine
+
+
+def write_logs(directory):
+    writer = JsonlWriter(str(directory))
+    simulate(writer, 'full', ['merhaba', 'bilgi', 'a', 'Ankara, aylık 400 kWh'], START)
+    simulate(writer, 'browser', ['merhaba', 'bilgi', 'b'], START + 10)
+    simulate(writer, 'pricing', ['merhaba', 'fiyat'], START + 20)
+    # Continues the next day where it left off
+    engine = simulate(writer, 'two-days', ['merhaba', 'bilgi', 'a'], START + 30)
+    events = []
+    for message in ['İzmir 600 kWh', 'teşekkürler']:
+        state_before = engine.current_state
+        engine.get_response_json(message)
+        events.append({'ts': START + DAY, 'app': 'simple', 'sender': 'two-days', 'message': message,
+                       'state_before': state_before, 'state_after': engine.current_state,
+                       'intent': engine.last_intent, 'entities': {}, 'latency_ms': 2.0})
+    writer.write(events)
+    writer.close()
+
+
+def test_funnel_and_transitions(tmp_path):
+    """Test funnel counts across day shards and the state transition matrix"""
+    write_logs(tmp_path)
+    shards = find_shards(str(tmp_path))
+    assert len(shards) == 2
+
+    report = analyze(shards, DEFAULT_FUNNEL, workers=1)
+    assert report['turns'] == 14
+    assert report['senders'] == 4
+    assert [row['senders'] for row in report['funnel']] == [4, 3, 2, 2]
+    assert report['funnel'][1]['dropped_after_previous'] == 1
+    assert report['exit_states'] == {'INFO_MENU': 3, 'PRICING': 1}
+
+    states = report['states']
+    matrix = dict(zip(states, report['transition_matrix']))
+    assert matrix['MAIN_MENU'][states.index('INFO_MENU')] == 3
+    assert matrix['MAIN_MENU'][states.index('PRICING')] == 1
+    # The day boundary is stitched into the intent transitions
+    assert {'from': 'panel_types', 'to': 'generate_recommendation', 'count': 2} in report['intent_transitions']
+
+    # Worker processes give the same answer
+    assert analyze(shards, DEFAULT_FUNNEL, workers=2) == report
+
+
+def test_cli_date_filter(tmp_path, capsys):
+    """Test --since/--until and funnel validation"""
+    write_logs(tmp_path)
+    assert len(find_shards(str(tmp_path), since='2026-09-22')) == 1
+    assert main([str(tmp_path), '--workers', '1', '--until', '2026-09-21', '--funnel', 'MAIN_MENU,PRICING']) == 0
+    assert 'Turns: 12' in capsys.readouterr().out
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Tests for batch message processing
+"""
+
+import threading
+import time
+
+from batch import run_batch
+
+
+def test_sender_order_and_parallelism():
+    """Test that senders run in parallel and each sender's messages stay in order"""
+    seen = {}
+    active = set()
+    overlap = threading.Event()
+    lock = threading.Lock()
+
+    def handler(sender, message):
+        with lock:
+            active.add(sender)
+            if len(active) > 1:
+                overlap.set()
+        time.sleep(0.002)
+        with lock:
+            active.discard(sender)
+            seen.setdefault(sender, []).append(message)
+        return message.upper()
+
+    items = [{'sender': f's{i % 4}', 'message': f'm{i}'} for i in range(40)]
+    results = list(run_batch(items, handler, workers=4))
+
+    assert sorted(index for index, *_ in results) == list(range(40))
+    for sender, messages in seen.items():
+        assert messages == [f'm{i}' for i in range(40) if f's{i % 4}' == sender]
+    assert overlap.is_set()
+
+
+def test_item_errors_are_reported():
+    """Test that bad items and handler errors become per-item errors"""
+    def handler(sender, message):
+        if message == 'boom':
+            raise ValueError('boom')
+        return message
+
+    results = {index: (result, error) for index, _, result, _, error in
+               run_batch([{'message': 'ok'}, {'sender': 'x'}, {'message': 'boom'}], handler)}
+
+    assert results[0] == ('ok', None)
+    assert results[1] == (None, 'No message provided')
+    assert results[2] == (None, 'boom')
@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""
+Tests for the benchmark suite's fixtures and regression check
+"""
+
+from benchmarks import fixtures
+from benchmarks.suite import build_cases, compare, run_suite
+
+
+def result(ops_per_sec, peak_bytes):
+    return {'ops': 10, 'ops_per_sec': ops_per_sec, 'peak_bytes_per_op': peak_bytes, 'retained_blocks_per_op': 0}
+
+
+def test_fixtures_are_reproducible():
+    """Test that fixtures come out the same on every call"""
+    assert fixtures.navigation_sequences(5) == fixtures.navigation_sequences(5)
+    assert fixtures.entity_messages(20) == fixtures.entity_messages(20)
+    assert fixtures.quote_inputs(20) == fixtures.quote_inputs(20)
+
+
+def test_suite_runs():
+    """Test a tiny run of every case"""
+    results = run_suite(build_cases(scale=0.02), repeat=1, min_time=0)
+    assert len(results['results']) == 9
+    for figures in results['results'].values():
+        assert figures['ops_per_sec'] > 0
+        assert figures['peak_bytes_per_op'] >= 0
+
+
+def test_compare_flags_regressions():
+    """Test the speed and allocation thresholds"""
+    baseline = {'results': {'fast': result(1000, 1000), 'lean': result(1000, 1000)}}
+    current = {'results': {'fast': result(700, 1000), 'lean': result(990, 2000), 'added': result(5, 5)}}
+    rows, regressions = compare(current, baseline, threshold=0.2, alloc_threshold=0.25)
+    assert [name for name, _ in regressions] == ['fast', 'lean']
+    assert rows[2][-1] == 'new'
+
+    _, regressions = compare(current, baseline, threshold=0.5, alloc_threshold=1.5)
+    assert regressions == []
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Tests for hot-reloadable chatbot content
+"""
+
+import os
+import shutil
+import time
+
+import professional_chatbot
+from content_store import ContentStore, install_content_admin
+from dialogue import DEFAULT_SPEC_PATH
+from professional_chatbot import ProfessionalChatbot, load_content
+
+
+def make_store(tmp_path):
+    dialogue_path = str(tmp_path / 'dialogue.yml')
+    responses_path = str(tmp_path / 'professional_responses.yml')
+    shutil.copy(DEFAULT_SPEC_PATH, dialogue_path)
+    shutil.copy(professional_chatbot.RESPONSES_PATH, responses_path)
+    return ContentStore('professional', (dialogue_path, responses_path), load_content), responses_path
+
+
+def edit(path, old, new):
+    with open(path, 'r', encoding='utf-8') as f:
+        text = f.read()
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(text.replace(old, new))
+    # Make sure the change is visible even on filesystems with coarse timestamps
+    stamp = time.time() + 5
+    os.utime(path, (stamp, stamp))
+
+
+def test_reload_swaps_in_new_version(tmp_path, monkeypatch):
+    """Test that an edited price reaches new turns while an earlier version stays intact"""
+    store, responses_path = make_store(tmp_path)
+    monkeypatch.setattr(professional_chatbot, 'CONTENT', store)
+    old = store.current
+    assert not store.reload()
+
+    edit(responses_path, '120.000 - 180.000 TL', '99.000 - 150.000 TL')
+    assert store.reload()
+    assert store.version == 2 and store.current is not old
+    # A request that started before the swap still sees a complete old version
+    assert '120.000 - 180.000 TL' in old.prepared['pricing_info'][0].body.decode('utf-8')
+
+    chatbot = ProfessionalChatbot()
+    body = chatbot.get_prepared_response('fiyat').body.decode('utf-8')
+    assert '99.000 - 150.000 TL' in body
+
+
+def test_invalid_file_keeps_running_version(tmp_path):
+    """Test that a broken file is reported and the running version is kept"""
+    store, responses_path = make_store(tmp_path)
+    current = store.current
+    edit(responses_path, 'default:', 'fallback:')
+    assert not store.reload()
+    assert store.current is current
+    assert store.stats()['reload_errors'] == 1 and "'default'" in store.stats()['last_error']
+
+
+def test_watcher_and_admin_endpoint(tmp_path):
+    """Test that the watcher reloads changed files and /admin/content can force a reload"""
+    from flask import Flask
+
+    store, responses_path = make_store(tmp_path)
+    store.watch(interval=0.05)
+    try:
+        edit(responses_path, '120.000 - 180.000 TL', '99.000 - 150.000 TL')
+        deadline = time.monotonic() + 5
+        while store.version == 1 and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert store.version == 2
+    finally:
+        store.stop()
+
+    app = Flask(__name__)
+    install_content_admin(app, [store], admin_token='secret')
+    client = app.test_client()
+    assert client.post('/admin/content').status_code == 403
+    response = client.post('/admin/content', json={'force': True}, headers={'X-Admin-Token': 'secret'})
+    assert response.get_json()['professional']['reloaded'] is True
+    assert response.get_json()['professional']['version'] == 3
+
+
+def test_forwarded_localhost_cannot_reload_without_token(tmp_path):
+    """Test that with no admin token a request forwarded through a tunnel from localhost gets a 403"""
+    from flask import Flask
+
+    store, _ = make_store(tmp_path)
+    app = Flask(__name__)
+    install_content_admin(app, [store])
+    client = app.test_client()
+
+    for headers in ({'X-Forwarded-For': '203.0.113.7'}, {'X-Forwarded-Proto': 'https'}):
+        assert client.post('/admin/content', json={'force': True}, headers=headers).status_code == 403
+    assert store.version == 1
+    assert client.post('/admin/content', json={'force': True}).get_json()['professional']['version'] == 2
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Tests for the batched conversation log writer
+"""
+
+import json
+import sqlite3
+import threading
+
+from conversation_log import ConversationLog, JsonlWriter, SqliteWriter, DROP_OLDEST, BLOCK
+
+
+class SlowWriter:
+    """Records batches; blocks until released so the queue can fill up"""
+    name = 'slow'
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.batches = []
+
+    def write(self, events):
+        self.release.wait()
+        self.batches.append([event['sender'] for event in events])
+
+    def close(self):
+        pass
+
+
+def turn(log, sender, intent='main_menu'):
+    return log.log_turn('simple', sender, 'merhaba', 'MAIN_MENU', 'MAIN_MENU', intent, {}, 0.001)
+
+
+def test_jsonl_batches_and_drain_on_close(tmp_path):
+    """Test that every queued turn is written, in order, by close()"""
+    log = ConversationLog(JsonlWriter(str(tmp_path)), batch_size=50)
+    for i in range(500):
+        turn(log, f'user-{i}')
+    log.close()
+
+    files = list(tmp_path.iterdir())
+    assert len(files) == 1 and files[0].name.startswith('conversations-')
+    events = [json.loads(line) for line in files[0].read_text(encoding='utf-8').splitlines()]
+    assert [event['sender'] for event in events] == [f'user-{i}' for i in range(500)]
+    assert events[0]['state_before'] == 'MAIN_MENU' and events[0]['latency_ms'] == 1.0
+    stats = log.stats()
+    assert stats['written'] == 500 and stats['dropped'] == 0
+    assert stats['batches'] >= 10
+
+    assert not turn(log, 'late')
+    assert log.stats()['dropped'] == 1
+
+
+def test_sqlite_wal(tmp_path):
+    """Test the SQLite backend"""
+    path = str(tmp_path / 'log.db')
+    log = ConversationLog(SqliteWriter(path))
+    turn(log, 'a', intent='price_info')
+    log.log_turn('simple', 'b', 'ankara 400 kwh', 'MAIN_MENU', 'MAIN_MENU', 'generate_recommendation',
+                 {'location': 'Ankara', 'energy_usage': 400}, 0.002)
+    assert log.flush()
+    log.close()
+
+    connection = sqlite3.connect(path)
+    assert connection.execute('PRAGMA journal_mode').fetchone()[0] == 'wal'
+    rows = connection.execute('SELECT sender, intent, entities FROM turns ORDER BY ts').fetchall()
+    assert rows[0][:2] == ('a', 'price_info')
+    assert json.loads(rows[1][2]) == {'location': 'Ankara', 'energy_usage': 400}
+
+
+def test_drop_policies():
+    """Test drop-newest and drop-oldest when the writer falls behind"""
+    writer = SlowWriter()
+    log = ConversationLog(writer, max_queue=3)
+    turn(log, 'in-flight')
+    while log.stats()['queued']:
+        pass
+    results = [turn(log, f'user-{i}') for i in range(5)]
+    assert results == [True, True, True, False, False]
+    writer.release.set()
+    log.close()
+    assert writer.batches == [['in-flight'], ['user-0', 'user-1', 'user-2']]
+    assert log.stats()['dropped'] == 2
+
+    writer = SlowWriter()
+    log = ConversationLog(writer, max_queue=3, policy=DROP_OLDEST)
+    turn(log, 'in-flight')
+    while log.stats()['queued']:
+        pass
+    assert all(turn(log, f'user-{i}') for i in range(5))
+    writer.release.set()
+    log.close()
+    assert writer.batches == [['in-flight'], ['user-2', 'user-3', 'user-4']]
+
+
+def test_block_policy_waits_for_room():
+    """Test that the blocking policy waits, then drops after its timeout"""
+    writer = SlowWriter()
+    log = ConversationLog(writer, max_queue=1, policy=BLOCK, block_timeout=0.01)
+    turn(log, 'in-flight')
+    while log.stats()['queued']:
+        pass
+    assert turn(log, 'queued')
+    assert not turn(log, 'timed-out')
+    threading.Timer(0.05, writer.release.set).start()
+    log.block_timeout = 5
+    assert turn(log, 'waited')
+    log.close()
+    assert [sender for batch in writer.batches for sender in batch] == ['in-flight', 'queued', 'waited']
+
+
+def test_simple_app_logs_entities_of_each_turn(monkeypatch):
+    """Test that a turn is logged with what its own message mentioned, not the session's user_data"""
+    import simple_app
+
+    class Recorder:
+        def __init__(self):
+            self.entities = []
+
+        def log_turn(self, engine, sender, message, state_before, state_after, intent, entities, latency):
+            self.entities.append(entities)
+
+    recorder = Recorder()
+    monkeypatch.setattr(simple_app, 'conversation_log', recorder)
+    for message in ["İstanbul'da oturuyorum", 'ankara 400 kwh', 'teşekkürler']:
+        simple_app.handle_message('entities-per-turn', message)
+    assert recorder.entities == [
+        {'province': 'İstanbul', 'location': 'İstanbul'},
+        {'province': 'Ankara', 'location': 'Ankara', 'energy_usage': 400},
+        {}
+    ]
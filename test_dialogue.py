@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Tests for the table-driven dialogue state machine
+"""
+
+import pytest
+
+from dialogue import compile_dialogue, load_dialogue, DialogueSpecError
+from professional_chatbot import ProfessionalChatbot
+
+
+def make_spec(**states):
+    return {'start': 'MAIN_MENU', 'states': states}
+
+
+def test_bundled_spec_compiles():
+    """Test that content/dialogue.yml compiles and drives the menus"""
+    machine = load_dialogue()
+    assert machine.lookup('MAIN_MENU', 'bilgi') == ('info_menu', 'INFO_MENU')
+    assert machine.lookup('INFO_MENU', 'geri') == ('main_menu', 'MAIN_MENU')
+
+    chatbot = ProfessionalChatbot()
+    assert chatbot.get_intent('Bilgi') == 'info_menu'
+    assert chatbot.get_intent('a') == 'panel_types'
+    assert chatbot.get_intent('bir şey') == 'info_menu'
+    assert chatbot.get_intent('teşekkürler') == 'thanks'
+    assert chatbot.get_intent('menü') == 'main_menu'
+    assert chatbot.current_state == 'MAIN_MENU'
+
+
+def test_unreachable_state():
+    """Test that states with no path from the start state are rejected"""
+    spec = make_spec(MAIN_MENU={}, ORPHAN={'default': 'default'})
+    with pytest.raises(DialogueSpecError, match='ORPHAN'):
+        compile_dialogue(spec)
+
+
+def test_ambiguous_token():
+    """Test that a token mapped to two targets in one state is rejected"""
+    spec = make_spec(MAIN_MENU={'transitions': [
+        {'tokens': ['a'], 'intent': 'one'},
+        {'tokens': ['A '], 'intent': 'two'}
+    ]})
+    with pytest.raises(DialogueSpecError, match='Ambiguous'):
+        compile_dialogue(spec)
+
+
+def test_shadowed_token():
+    """Test that a state token hidden by a global transition is rejected"""
+    spec = make_spec(MAIN_MENU={'transitions': [{'tokens': ['geri'], 'intent': 'back'}]})
+    spec['global'] = {'transitions': [{'tokens': ['geri'], 'intent': 'main_menu', 'next': 'MAIN_MENU'}]}
+    with pytest.raises(DialogueSpecError, match='shadowed'):
+        compile_dialogue(spec)
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Tests for the gazetteer entity scanner
+"""
+
+from entities import Gazetteer, EntityScanner, SCANNER, extract_entities, parse_number
+from professional_chatbot import ProfessionalChatbot
+from simple_chatbot import SolarChatbot
+
+
+def test_bundled_gazetteer():
+    """Test that all 81 provinces load and known districts resolve to them"""
+    assert len(SCANNER.gazetteer.provinces) == 81
+    assert extract_entities("Kadıköy'de oturuyorum")['location'] == 'Kadıköy, İstanbul'
+    assert extract_entities('Merzifon')['province'] == 'Amasya'
+    assert extract_entities('Urfa')['province'] == 'Şanlıurfa'
+
+
+def test_locations():
+    """Test case folding, suffixes and word boundaries"""
+    assert extract_entities('ESKİŞEHİR')['location'] == 'Eskişehir'
+    assert extract_entities('Istanbulda yaşıyorum')['location'] == 'İstanbul'
+    assert extract_entities("Van'dayım")['location'] == 'Van'
+    assert extract_entities('İzmirliyim')['location'] == 'İzmir'
+    assert extract_entities('karşı komşum') == {}
+    assert extract_entities('aydınlık bir gün') == {}
+
+
+def test_ambiguous_districts():
+    """Test that shared or common-word districts need their province"""
+    assert extract_entities('Gölbaşı') == {'district': 'Gölbaşı', 'location': 'Gölbaşı'}
+    assert extract_entities('Ankara Gölbaşı')['location'] == 'Gölbaşı, Ankara'
+    assert extract_entities('of çok pahalı') == {}
+    assert extract_entities('Trabzon Of')['location'] == 'Of, Trabzon'
+
+
+def test_energy_and_bill():
+    """Test consumption units, Turkish number formats and bill amounts"""
+    assert parse_number('1.500') == 1500
+    assert parse_number('2.000,50') == 2000.5
+    assert parse_number('1.5') == 1.5
+    assert extract_entities('1.500 kWh')['energy_usage'] == 1500
+    assert extract_entities('1,5 MWh')['energy_usage'] == 1500
+    assert extract_entities('aylık 2000 kilovatsaat')['energy_usage'] == 2000
+    assert extract_entities('yıllık 12.000 kwh')['energy_usage'] == 1000
+    assert extract_entities('faturam 1.250 TL')['monthly_bill'] == 1250
+    assert extract_entities('aylık 850 lira')['monthly_bill'] == 850
+    assert 'monthly_bill' not in extract_entities('bütçem 200.000 TL')
+
+
+def test_custom_gazetteer():
+    """Test a scanner built from an in-memory gazetteer"""
+    scanner = EntityScanner(Gazetteer({'Rize': ['Pazar'], 'Tokat': ['Pazar', 'Zile']}, common_words=['Pazar']))
+    assert scanner.extract('Zile') == {'district': 'Zile', 'location': 'Zile, Tokat', 'province': 'Tokat'}
+    assert scanner.extract('pazar günü') == {}
+    assert scanner.extract('Rize Pazar')['location'] == 'Pazar, Rize'
+
+
+def test_chatbots_share_scanner():
+    """Test that both chatbots extract the same entities"""
+    message = 'Sarıyer, aylık 600 kWh'
+    expected = {'district': 'Sarıyer', 'location': 'Sarıyer, İstanbul', 'province': 'İstanbul', 'energy_usage': 600}
+    assert SolarChatbot().extract_entities(message) == expected
+    assert ProfessionalChatbot().extract_entities(message) == expected
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Tests for fuzzy keyword matching
+"""
+
+import random
+
+import pytest
+
+from fuzzy_matcher import FUZZY_MATCHES, FuzzyIndex, FuzzyKeywords, edit_distance
+from metrics import REGISTRY
+from professional_chatbot import ProfessionalChatbot
+from simple_chatbot import SolarChatbot
+
+
+def reference_distance(a, b):
+    rows = [[i + j if i * j == 0 else 0 for j in range(len(b) + 1)] for i in range(len(a) + 1)]
+    for i in range(1, len(a) + 1):
+        for j in range(1, len(b) + 1):
+            rows[i][j] = min(rows[i - 1][j] + 1, rows[i][j - 1] + 1, rows[i - 1][j - 1] + (a[i - 1] != b[j - 1]))
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                rows[i][j] = min(rows[i][j], rows[i - 2][j - 2] + 1)
+    return rows[-1][-1]
+
+
+def test_bounded_distance_matches_reference():
+    """Test that the bounded edit distance agrees with the full table up to the bound"""
+    rng = random.Random(3)
+    for _ in range(5000):
+        a = ''.join(rng.choice('abc') for _ in range(rng.randint(0, 7)))
+        b = ''.join(rng.choice('abc') for _ in range(rng.randint(0, 7)))
+        for bound in (0, 1, 2):
+            assert edit_distance(a, b, bound) == min(reference_distance(a, b), bound + 1), (a, b, bound)
+
+
+def test_index_bounds_by_length():
+    """Test that typed words of six letters take one edit, shorter ones only diacritics, and two edits are opt-in"""
+    index = FuzzyIndex(['kurulum', 'garanti', 'fiyat', 'bilgi', 'tak', 'satın al'])
+    assert index.lookup('kurlum') == ('kurulum',)
+    assert index.lookup('garnti') == ('garanti',)
+    assert index.lookup('fiyatt') == ('fiyat',)
+    assert index.lookup('BILGI') == ('bilgi',)
+    assert index.lookup('satin al') == ('satın al',)
+    assert index.lookup('tek') == ()
+    assert index.lookup('krlum') == ()
+    assert index.lookup('fiyot') == ()
+    assert FuzzyIndex(['satın almak istiyorum'], max_distance=2).lookup('satin almk istiyrum') == \
+        ('satın almak istiyorum',)
+
+
+def test_phrases_and_folded_substrings():
+    """Test that phrase keywords match runs of words and folded keywords match inside words"""
+    fuzzy = FuzzyKeywords([('goodbye', ['hoşça kal', 'görüşürüz']), ('thanks', ['teşekkür'])])
+    assert fuzzy.find_groups('tamam hosca kall') == {'goodbye'}
+    assert fuzzy.find_groups('cok tesekkurler') == {'thanks'}
+    assert fuzzy.find_groups('hosca') == set()
+
+
+@pytest.mark.parametrize('message, intent', [
+    ('kurlum', 'installation'),
+    ('garnti', 'warranty'),
+    ('gunes paneli satin al', 'selling'),
+    ('odeme', 'financing'),
+    ('xyz', 'default'),
+    # Everyday words one edit away from a short keyword are not typos of it
+    ('bakın', 'default'),
+    ('başım', 'default'),
+    ('bakır', 'default'),
+    ('sonda', 'default'),
+    ('yardı', 'default'),
+])
+def test_simple_engine_recovers_typos(message, intent):
+    assert SolarChatbot().get_intent(message) == intent
+
+
+def test_professional_engine_recovers_typos():
+    """Test that misspelled menu choices move through the menu tree like the exact ones"""
+    chatbot = ProfessionalChatbot()
+    assert chatbot.get_intent('bılgı') == 'info_menu'
+    assert chatbot.current_state == 'INFO_MENU'
+    assert chatbot.get_intent('tesekkurler') == 'thanks'
+    chatbot.reset_conversation()
+    assert chatbot.get_intent('kurlum') == 'installation_info'
+    assert chatbot.current_state == 'INSTALLATION'
+
+
+def test_exact_hits_skip_fuzzy_and_misses_are_counted():
+    """Test that only messages without an exact match reach fuzzy matching and its counters"""
+    def counts():
+        return [REGISTRY.value(FUZZY_MATCHES, ('simple', result)) or 0 for result in ('recovered', 'missed')]
+
+    chatbot = SolarChatbot()
+    before = counts()
+    chatbot.get_intent('garanti süresi')
+    assert counts() == before
+    chatbot.get_intent('garnti')
+    chatbot.get_intent('xyz')
+    assert counts() == [before[0] + 1, before[1] + 1]
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Tests for the compiled intent keyword matcher
+"""
+
+import random
+
+from keyword_matcher import KeywordAutomaton
+from simple_chatbot import CONTENT, SolarChatbot
+
+INTENT_KEYWORDS = CONTENT.current.keywords
+
+
+def test_overlapping_keywords():
+    """Test nested and overlapping keywords from different groups"""
+    matcher = KeywordAutomaton([('a', ['he', 'hers']), ('b', ['she', 'rsx']), ('c', ['ersx'])])
+
+    assert matcher.find_groups('ushers') == {'a', 'b'}
+    assert matcher.find_groups('hersx') == {'a', 'b', 'c'}
+    assert matcher.find_groups('xyz') == set()
+
+
+def test_matches_substring_scans():
+    """Test that the matcher agrees with one substring test per keyword"""
+    rng = random.Random(7)
+    keywords = [word for _, words in INTENT_KEYWORDS for word in words]
+    matcher = KeywordAutomaton(INTENT_KEYWORDS)
+
+    for _ in range(2000):
+        parts = []
+        for _ in range(rng.randint(0, 6)):
+            keyword = rng.choice(keywords)
+            start = rng.randint(0, len(keyword))
+            parts.append(keyword[start:] if rng.random() < 0.5 else keyword)
+        text = ''.join(parts)
+        expected = {name for name, words in INTENT_KEYWORDS if any(word in text for word in words)}
+        assert matcher.find_groups(text) == expected, text
+
+
+def test_intent_priority():
+    """Test that get_intent keeps the original priority order"""
+    chatbot = SolarChatbot()
+
+    assert chatbot.get_intent('Merhaba, fiyat nedir?') == 'greeting'
+    assert chatbot.get_intent('güneş paneli almak istiyorum') == 'selling'
+    assert chatbot.get_intent('güneş paneli hakkında bilgi') == 'information'
+    assert chatbot.get_intent('almak istiyorum') == 'default'
+    assert chatbot.get_intent('taksit ile kredi') == 'installation'
+    assert chatbot.get_intent('xyz') == 'default'
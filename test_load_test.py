@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Tests for the story-replaying load generator and the Rasa stand-in
+"""
+
+import threading
+
+import pytest
+from werkzeug.serving import make_server
+
+from benchmarks.load_test import build_scripts, percentile, run_load
+from benchmarks.rasa_stub import start_stub
+from rasa_client import RasaClient
+
+
+def test_scripts_follow_stories():
+    """Test that stories become turns with their entity values filled in"""
+    scripts = build_scripts(variants=2)
+    happy = next(s for s in scripts if s['story'] == 'Happy path - selling flow')
+    intents = [intent for intent, _ in happy['turns']]
+    assert intents == ['greet', 'request_selling', 'provide_location', 'provide_energy_usage', 'affirm', 'thankyou']
+    assert 'California' in happy['turns'][2][1]
+    assert '1000' in happy['turns'][3][1]
+    assert build_scripts(variants=2) == scripts
+
+
+def test_percentile():
+    """Test nearest-rank percentiles"""
+    values = list(range(1, 101))
+    assert percentile(values, 50) == 50
+    assert percentile(values, 99) == 99
+    assert percentile([7], 95) == 7
+    assert percentile([], 50) is None
+
+
+@pytest.fixture
+def app_server(monkeypatch):
+    import app
+    stub = start_stub(port=0, latency=0.001, jitter=0)
+    client = RasaClient(f"http://127.0.0.1:{stub.server_address[1]}", timeout=2)
+    monkeypatch.setattr(app, 'rasa_client', client)
+    server = make_server('127.0.0.1', 0, app.app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+    stub.shutdown()
+
+
+def test_run_load_against_app(app_server):
+    """Test a short closed-loop run through app.py and the Rasa stub"""
+    summary = run_load(app_server, build_scripts(variants=1), concurrency=4, conversations=12, tts=True)
+    assert summary['conversations'] == 12
+    assert summary['overall']['errors'] == 0
+    assert summary['endpoints']['/api/chat']['requests'] > 12
+    assert '/api/tts' in summary['endpoints']
+    assert summary['endpoints']['/api/chat']['p99_ms'] >= summary['endpoints']['/api/chat']['p50_ms']
+    assert any(name.startswith('/api/chat greet') for name in summary['intents'])
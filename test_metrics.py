@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Tests for the sharded metrics registry and the /metrics endpoints
+"""
+
+import threading
+
+from metrics import Registry, INTENT_LATENCY, REGISTRY
+
+
+def test_counter_and_histogram_merge_threads():
+    """Test that per-thread shards add up, including threads that have exited"""
+    registry = Registry()
+    requests = registry.counter('requests', "Requests", ('route',))
+    latency = registry.histogram('latency_seconds', "Latency", ('route',), buckets=(0.1, 1))
+
+    def work():
+        for _ in range(1000):
+            requests.inc(('/a',))
+            latency.observe(0.05, ('/a',))
+        latency.observe(5, ('/a',))
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    requests.inc(('/b',), amount=2)
+
+    assert registry.value(requests, ('/a',)) == 8000
+    assert registry.value(requests, ('/b',)) == 2
+    assert registry.value(latency, ('/a',))[:3] == [8000, 0, 8]
+
+    registry.add_collector(lambda: [('reloads', 'counter', "Reloads", [({}, 3)])])
+
+    text = registry.render()
+    assert '# TYPE latency_seconds histogram' in text
+    # Counter families are named like their samples, as the 0.0.4 text format requires
+    assert '# HELP requests_total ' in text and '# TYPE requests_total counter' in text
+    assert '# TYPE requests counter' not in text
+    assert 'requests_total{route="/a"} 8000' in text
+    assert '# TYPE reloads_total counter\nreloads_total 3' in text
+    assert 'latency_seconds_bucket{route="/a",le="0.1"} 8000' in text
+    assert 'latency_seconds_bucket{route="/a",le="1"} 8000' in text
+    assert 'latency_seconds_bucket{route="/a",le="+Inf"} 8008' in text
+    assert 'latency_seconds_count{route="/a"} 8008' in text
+
+
+def test_dead_thread_shards_are_retired():
+    """Test that many short-lived threads do not keep a shard each"""
+    registry = Registry()
+    hits = registry.counter('hits', "Hits")
+    for _ in range(200):
+        thread = threading.Thread(target=hits.inc)
+        thread.start()
+        thread.join()
+
+    assert registry.value(hits) == 200
+    assert len(registry._shards) <= 1
+
+
+def test_collectors_and_label_escaping():
+    """Test scrape-time collectors and escaped label values"""
+    registry = Registry()
+    registry.add_collector(lambda: [('queue_depth', 'gauge', "Depth", [({'name': 'a"b'}, 3)])])
+    assert 'queue_depth{name="a\\"b"} 3' in registry.render()
+
+
+def test_simple_app_metrics_endpoint():
+    """Test that chat requests show up per route and per intent"""
+    from simple_app import app
+
+    client = app.test_client()
+    before = REGISTRY.value(INTENT_LATENCY, ('main_menu',))
+    before_count = sum(before[:-1]) if before else 0
+    client.post('/api/chat', json={'message': 'merhaba', 'sender': 'metrics-test'})
+
+    response = client.get('/metrics')
+    assert response.status_code == 200
+    assert response.content_type.startswith('text/plain; version=0.0.4')
+    text = response.get_data(as_text=True)
+    assert 'chatbot_http_requests_total{route="/api/chat",method="POST",status="200"}' in text
+    assert 'chatbot_sessions_active ' in text
+    assert sum(REGISTRY.value(INTENT_LATENCY, ('main_menu',))[:-1]) == before_count + 1
+
+
+def test_rasa_outcome_recorded():
+    """Test that a short-circuited Rasa call is recorded as a fallback"""
+    from metrics import RASA_LATENCY
+    from rasa_client import RasaClient
+
+    client = RasaClient('http://127.0.0.1:9')
+    client.breaker.probe_failed()
+    before = REGISTRY.value(RASA_LATENCY, ('fallback',))
+    before_count = sum(before[:-1]) if before else 0
+
+    assert client.send_message('user', 'merhaba') is None
+    assert sum(REGISTRY.value(RASA_LATENCY, ('fallback',))[:-1]) == before_count + 1
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Tests for the in-process NLU classifier
+"""
+
+import shutil
+
+import numpy as np
+import pytest
+
+from nlu_classifier import (CONFIG_PATH, FALLBACK_INTENT, NLU_PATH, NLUClassifier, analyze, load_or_train,
+                            load_training_data, read_fallback_thresholds)
+
+
+@pytest.fixture(scope='module')
+def classifier():
+    return NLUClassifier.from_files()
+
+
+def test_features_follow_char_wb():
+    """Test that words are padded with spaces and short words are counted once per length"""
+    assert analyze('Hi') == ['#hi', ' ', 'h', 'i', ' ', ' h', 'hi', 'i ', ' hi', 'hi ', ' hi ']
+    assert analyze('a b', 3, 4) == ['#a', ' a ', '#b', ' b ']
+
+
+def test_training_data_and_config():
+    """Test that entity markup is reduced to its text and the fallback settings come from config.yml"""
+    examples = load_training_data()
+    assert ('I live in New York', 'provide_location') in examples
+    assert len({intent for _, intent in examples}) == 17
+    assert read_fallback_thresholds(CONFIG_PATH) == (0.3, 0.1)
+
+
+@pytest.mark.parametrize('message, intent', [
+    ('hello there', 'greet'),
+    ('how much does a system cost', 'ask_price'),
+    ('I want to buy panels', 'request_selling'),
+    ('do you do financing?', 'ask_financing'),
+    ('asdf qwer', FALLBACK_INTENT),
+])
+def test_parse(classifier, message, intent):
+    assert classifier.parse(message)['intent']['name'] == intent
+
+
+def test_fallback_thresholds():
+    """Test that low confidence and a close runner-up both give nlu_fallback at the threshold"""
+    model = NLUClassifier(['#a', '#b'], [1, 1], [[3, 3, 0], [4, 0, 0]], [0, 0, 0], ['x', 'y', 'z'])
+    # Equal scores for x and y: ambiguous
+    ambiguous = model.parse('a')
+    assert ambiguous['intent'] == {'name': FALLBACK_INTENT, 'confidence': 0.3}
+    assert [entry['name'] for entry in ambiguous['intent_ranking'][1:3]] == ['x', 'y']
+    assert model.parse('b')['intent']['name'] == 'x'
+    # Nothing known: a uniform spread is below the threshold
+    assert model.parse('c')['intent']['name'] == FALLBACK_INTENT
+
+
+def test_batch_matches_single(classifier):
+    texts = [text for text, _ in load_training_data()] + ['', '???', 'merhaba']
+    batch = classifier.batch_probabilities(texts)
+    single = np.array([classifier.probabilities(text) for text in texts])
+    assert np.allclose(batch, single, atol=1e-5)
+    names = [result['intent']['name'] for result in classifier.parse_batch(texts)]
+    assert names == [classifier.parse(text)['intent']['name'] for text in texts]
+
+
+def test_saved_model_is_reused_until_data_changes(tmp_path):
+    """Test that load_or_train keeps a current artifact and retrains after the NLU data changes"""
+    data_path, config_path, model_path = tmp_path / 'nlu.yml', tmp_path / 'config.yml', tmp_path / 'nlu.npz'
+    shutil.copy(NLU_PATH, data_path)
+    shutil.copy(CONFIG_PATH, config_path)
+    first = load_or_train(str(model_path), str(data_path), str(config_path))
+    loaded = load_or_train(str(model_path), str(data_path), str(config_path))
+    assert loaded.fingerprint == first.fingerprint
+    assert loaded.parse('thanks a lot') == first.parse('thanks a lot')
+
+    with open(data_path, 'a', encoding='utf-8') as f:
+        f.write("\n- intent: ask_battery\n  examples: |\n    - do you sell batteries\n    - battery storage\n")
+    retrained = load_or_train(str(model_path), str(data_path), str(config_path))
+    assert 'ask_battery' in retrained.intents
+    assert NLUClassifier.load(str(model_path)).fingerprint == retrained.fingerprint
+
+
+def test_app_fallback_uses_classifier(monkeypatch, tmp_path):
+    """Test that app.py answers from the classifier while Rasa is down, and serves /api/nlu/parse"""
+    import app
+
+    class RasaDown:
+        def send_message(self, sender, message):
+            return None
+
+    monkeypatch.setattr(app, 'rasa_client', RasaDown())
+    monkeypatch.setattr(app, 'NLU_MODEL_PATH', str(tmp_path / 'nlu.npz'))
+    monkeypatch.setattr(app, '_nlu', None)
+    client = app.app.test_client()
+
+    # The keyword rules alone would answer this with the general solar information
+    reply = client.post('/api/chat', json={'message': 'what is the price of solar panels'}).get_json()
+    assert reply == [{'text': app.FALLBACK_RESPONSES['fallback_pricing']}]
+    # Turkish is not in the training data; the keyword rules still answer it
+    reply = client.post('/api/chat', json={'message': 'merhaba'}).get_json()
+    assert reply == [{'text': app.FALLBACK_RESPONSES['fallback_greet']}]
+
+    parsed = client.post('/api/nlu/parse', json={'texts': ['hello', 'warranty period']}).get_json()
+    assert [result['intent']['name'] for result in parsed] == ['greet', 'ask_warranty']
+    assert client.post('/api/nlu/parse', json={}).status_code == 400
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Tests for pre-serialized chat responses
+"""
+
+import json
+
+import pytest
+
+from prepared_responses import PreparedResponse, thaw
+from professional_chatbot import CONTENT, ProfessionalChatbot
+from simple_chatbot import SolarChatbot
+
+
+def test_prepared_matches_get_response_json():
+    """Test that the prepared bytes decode to the get_response_json payload"""
+    for message in ['bilgi', 'a', 'menü', 'fiyat', 'xyz']:
+        chatbot = ProfessionalChatbot()
+        prepared_bot = ProfessionalChatbot()
+        expected = chatbot.get_response_json(message)
+        prepared = prepared_bot.get_prepared_response(message)
+        assert json.loads(prepared.body) == [expected]
+        assert prepared_bot.current_state == chatbot.current_state
+
+
+def test_static_responses_are_shared():
+    """Test that static replies are reused instead of re-encoded"""
+    chatbot = ProfessionalChatbot()
+    assert chatbot.get_prepared_response('menü') is CONTENT.current.prepared['main_menu'][0]
+
+
+def test_prepared_response_is_immutable():
+    """Test that prepared responses cannot be modified and carry a strong ETag"""
+    prepared = PreparedResponse({"type": "text", "content": "merhaba"})
+    assert prepared.etag.startswith('"') and not prepared.etag.startswith('W/')
+    with pytest.raises(AttributeError):
+        prepared.body = b''
+
+
+def test_catalog_is_shared_and_read_only():
+    """Test that every engine shares one frozen catalog and keeps no per-instance copy"""
+    for engine in (ProfessionalChatbot, SolarChatbot):
+        first, second = engine(), engine()
+        assert first.responses is second.responses
+        assert not hasattr(first, '__dict__')
+        with pytest.raises(AttributeError):
+            first.responses = {}
+    responses = ProfessionalChatbot().responses
+    with pytest.raises(TypeError):
+        responses['main_menu'][0]['options'].append({})
+    with pytest.raises(TypeError):
+        responses['default'] = []
+    assert json.loads(json.dumps(responses)) == thaw(responses)
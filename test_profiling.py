@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Tests for sampled request profiling
+"""
+
+import os
+
+from profiling import RequestProfiler, install_profiling
+
+
+def make_client(tmp_path, sample_every=0, max_files=200, admin_token=None):
+    from flask import Flask, jsonify, request
+    from profiling import note_intent
+
+    app = Flask(__name__)
+    profiler = RequestProfiler(str(tmp_path), sample_every=sample_every, max_files=max_files)
+    install_profiling(app, profiler, admin_token=admin_token)
+
+    @app.route('/api/chat', methods=['POST'])
+    def chat():
+        note_intent('price_info')
+        total = sum(i * i for i in range(2000))
+        return jsonify({'sender': request.json['sender'], 'total': total})
+
+    return app.test_client(), profiler
+
+
+def test_sampling_names_and_rotation(tmp_path):
+    """Test that 1-in-N requests are profiled, named by route/intent/sender and rotated"""
+    client, profiler = make_client(tmp_path, sample_every=2, max_files=3)
+    for i in range(10):
+        client.post('/api/chat', json={'sender': f'user-{i}'})
+
+    assert profiler.captured == 5
+    files = profiler.files()
+    assert len(files) == 3
+    _, route, intent, sender = os.path.basename(files[0])[:-5].split('_')
+    assert (route, intent, len(sender)) == ('api-chat', 'price-info', 10)
+    assert 'user-' not in files[0]
+
+
+def test_header_profiling_and_report(tmp_path):
+    """Test the X-Profile header, admin token and the aggregated report"""
+    client, profiler = make_client(tmp_path, admin_token='secret')
+
+    client.post('/api/chat', json={'sender': 'a'}, headers={'X-Profile': '1'})
+    assert profiler.captured == 0
+    for _ in range(3):
+        client.post('/api/chat', json={'sender': 'a'}, headers={'X-Profile': '1', 'X-Admin-Token': 'secret'})
+    assert profiler.captured == 3
+
+    assert client.get('/admin/profiling/report').status_code == 403
+    report = client.get('/admin/profiling/report?top=5&intent=price_info',
+                        headers={'X-Admin-Token': 'secret'}).get_json()
+    assert report['profiles'] == 3
+    assert len(report['functions']) == 5
+    assert any(row['function'] == '<genexpr>' for row in report['functions'])
+    assert client.get('/admin/profiling/report?intent=greet',
+                      headers={'X-Admin-Token': 'secret'}).get_json()['profiles'] == 0
+
+
+def test_admin_sets_sampling_rate(tmp_path):
+    """Test turning sampling on and off through the admin endpoint"""
+    client, profiler = make_client(tmp_path)
+    assert client.post('/admin/profiling', json={'sample_every': 1}).get_json()['sample_every'] == 1
+    client.post('/api/chat', json={'sender': 'a'})
+    assert profiler.captured == 1
+
+    assert client.post('/admin/profiling', json={'sample_every': -1}).status_code == 400
+    client.post('/admin/profiling', json={'sample_every': 0})
+    client.post('/api/chat', json={'sender': 'a'})
+    assert profiler.captured == 1
+
+
+def test_forwarded_localhost_is_not_admin(tmp_path):
+    """Test that a tunnel such as ngrok, connecting from localhost for a remote visitor, gets no admin access"""
+    client, profiler = make_client(tmp_path)
+    for headers in ({'X-Forwarded-For': '203.0.113.7'}, {'X-Forwarded-Proto': 'https'}):
+        assert client.post('/admin/profiling', json={'sample_every': 1}, headers=headers).status_code == 403
+        assert client.get('/admin/profiling/report', headers=headers).status_code == 403
+        client.post('/api/chat', json={'sender': 'a'}, headers=dict(headers, **{'X-Profile': '1'}))
+    assert profiler.captured == 0 and profiler.sample_every == 0
+    assert client.get('/admin/profiling').status_code == 200
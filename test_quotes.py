@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Tests for the scalar and bulk quote engines
+"""
+
+import csv
+import json
+import random
+
+import numpy as np
+
+from entities import SCANNER
+from irradiance import TABLE, peak_sun_hours, province_index
+from quotes import PRICING, _round_like_python, main, quote_rows, recommend, recommend_many
+
+
+def test_bulk_matches_scalar():
+    """Test that recommend_many returns exactly what recommend returns"""
+    random.seed(7)
+    usages = list(range(0, 20001, 7)) + [round(random.uniform(0, 50000), 2) for _ in range(5000)]
+    locations = [random.choice(TABLE.provinces + [None]) for _ in usages]
+    provinces = np.array([province_index(location) for location in locations])
+    for divisor in PRICING.values():
+        bulk = recommend_many(usages, divisor, provinces)
+        for i, usage in enumerate(usages):
+            scalar = recommend(usage, locations[i], price_divisor=divisor)
+            assert scalar['system_size'] == bulk['system_size'][i]
+            assert scalar['price'] == bulk['price'][i]
+            assert scalar['bill_reduction'] == bulk['bill_reduction'][i]
+            assert scalar['payback_years'] == bulk['payback_years'][i]
+
+
+def test_irradiance_sizing():
+    """Test that sunnier provinces need smaller systems and pay back sooner"""
+    assert set(TABLE.provinces) == set(SCANNER.gazetteer.provinces)
+    assert peak_sun_hours('Kadıköy, İstanbul') == peak_sun_hours('istanbul') == 3.8
+    assert peak_sun_hours('Atlantis') == 5.0
+    sunny, cloudy = recommend(900, 'Şanlıurfa'), recommend(900, 'Rize')
+    assert sunny['system_size'] < cloudy['system_size']
+    assert sunny['payback_years'] < cloudy['payback_years']
+    assert recommend(1004, 'Konya') == recommend(996, 'Konya') == recommend(1000, 'Konya')
+
+
+def test_rounding_near_ties():
+    """Test values where np.round and round() disagree"""
+    values = np.array([i / 100 for i in range(10000)])
+    assert _round_like_python(values, 1).tolist() == [round(v, 1) for v in values.tolist()]
+
+
+def test_quote_rows_chunks():
+    """Test defaults, Turkish numbers and bad rows across chunk boundaries"""
+    rows = [{'location': 'İzmir', 'energy_usage': '1.500'}, {'kwh': ''}, {'energy_usage': 'çok'}]
+    out = list(quote_rows(rows * 3, chunk_size=2))
+    assert len(out) == 9
+    assert out[0]['system_size'] == recommend(1500, 'İzmir')['system_size']
+    assert out[0]['location'] == 'İzmir'
+    assert out[1]['price'] == recommend(None)['price']
+    assert out[1]['location'] == 'bölgenizde'
+    assert 'error' in out[2] and 'price' not in out[2]
+
+
+def test_cli_csv_to_jsonl(tmp_path):
+    """Test the CLI end to end"""
+    source = tmp_path / 'leads.csv'
+    with open(source, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['name', 'location', 'energy_usage'])
+        for i in range(25):
+            writer.writerow([f'lead{i}', 'Konya', 300 + i * 40])
+    target = tmp_path / 'quotes.jsonl'
+
+    assert main([str(source), '-o', str(target), '--chunk-size', '10', '--pricing', 'simple']) == 0
+
+    lines = [json.loads(line) for line in target.read_text(encoding='utf-8').splitlines()]
+    assert len(lines) == 25
+    assert lines[3]['name'] == 'lead3'
+    assert lines[3]['price'] == recommend(420, 'Konya', price_divisor=1000)['price']
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Tests for the Rasa circuit breaker and pooled client
+"""
+
+import time
+
+from rasa_client import CircuitBreaker, RasaClient, CLOSED, OPEN, HALF_OPEN
+
+
+def test_breaker_opens_and_recovers():
+    """Test closed -> open -> half-open -> closed transitions"""
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.01)
+    assert breaker.allow_request()
+
+    breaker.record_failure()
+    assert breaker.state == CLOSED
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    assert not breaker.allow_request()
+
+    time.sleep(0.02)
+    assert breaker.allow_request()
+    assert breaker.state == HALF_OPEN
+    # Only one trial request while half-open
+    assert not breaker.allow_request()
+
+    breaker.record_success()
+    assert breaker.state == CLOSED
+
+
+def test_half_open_failure_reopens():
+    """Test that a failed trial request opens the breaker again"""
+    breaker = CircuitBreaker(failure_threshold=5, reset_timeout=0)
+    breaker.probe_failed()
+    assert breaker.allow_request()
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    assert breaker.times_opened == 2
+
+
+def test_open_circuit_skips_network():
+    """Test that an open circuit returns the fallback signal without waiting"""
+    client = RasaClient('http://127.0.0.1:9', timeout=2)
+    assert client.probe() is False
+    assert client.breaker.state == OPEN
+
+    start = time.perf_counter()
+    for _ in range(100):
+        assert client.send_message('user', 'merhaba') is None
+    assert time.perf_counter() - start < 0.05
+
+    stats = client.stats()
+    assert stats['fallbacks'] == 100
+    assert stats['breaker']['state'] == OPEN
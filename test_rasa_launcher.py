@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+Tests for parallel Rasa startup with readiness polling
+"""
+
+import socket
+import sys
+import time
+
+from rasa_launcher import launch_rasa
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def test_components_ready_when_endpoint_answers():
+    """Test that readiness is detected by polling instead of fixed sleeps"""
+    ports = [free_port(), free_port()]
+    components = [
+        (f'server_{port}', [sys.executable, '-m', 'http.server', str(port), '--bind', '127.0.0.1'],
+         f'http://127.0.0.1:{port}/')
+        for port in ports
+    ]
+
+    results = launch_rasa(timeout=20, components=components)
+    try:
+        assert all(result['ready'] for result in results.values())
+        assert all(result['seconds'] < 20 for result in results.values())
+    finally:
+        for result in results.values():
+            result['process'].terminate()
+            result['process'].wait()
+
+
+def test_exited_process_is_not_ready():
+    """Test that a component that exits stops the wait before the deadline"""
+    port = free_port()
+    components = [('broken', [sys.executable, '-c', 'raise SystemExit(1)'], f'http://127.0.0.1:{port}/')]
+
+    start = time.monotonic()
+    results = launch_rasa(timeout=30, components=components)
+    assert results['broken']['ready'] is False
+    assert time.monotonic() - start < 10
@@ -0,0 +1,30 @@
+#!/usr/bin/env python3
+"""
+Tests for reply segmentation used by the SSE endpoint
+"""
+
+from segments import iter_segments
+from professional_chatbot import ProfessionalChatbot
+
+
+def test_menu_segments():
+    """Test that a menu becomes a title followed by one segment per option"""
+    payload = ProfessionalChatbot().responses['main_menu'][0]
+    segments = list(iter_segments(payload))
+
+    assert segments[0] == {'kind': 'title', 'text': "CW Enerji'ye hoş geldiniz."}
+    assert [s['kind'] for s in segments[1:]] == ['option'] * 4
+    assert segments[1]['action'] == 'satın al'
+
+
+def test_list_and_text_segments():
+    """Test list items, footer paragraphs and plain text paragraphs"""
+    responses = ProfessionalChatbot().responses
+    segments = list(iter_segments(responses['pricing_info'][0]))
+    kinds = [s['kind'] for s in segments]
+    assert kinds[:5] == ['title', 'item', 'item', 'item', 'item']
+    assert kinds[5:] == ['footer'] * (len(kinds) - 5)
+    assert segments[1]['text'] == '3 kW: 120.000 - 180.000 TL'
+
+    text = list(iter_segments({'type': 'text', 'content': 'Bir\n\nİki\n\n\n'}))
+    assert [s['text'] for s in text] == ['Bir', 'İki']
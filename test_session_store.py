@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Tests for the per-sender session store
+"""
+
+import time
+
+from session_store import SessionStore
+from professional_chatbot import ProfessionalChatbot
+
+
+def test_sessions_are_isolated():
+    """Test that senders do not share menu state"""
+    store = SessionStore()
+    bot = ProfessionalChatbot()
+
+    alice = store.get('alice')
+    alice.apply_to(bot)
+    bot.get_response_json('bilgi')
+    alice.capture(bot)
+
+    bob = store.get('bob')
+    bob.apply_to(bot)
+    assert bot.current_state == "MAIN_MENU"
+
+    assert store.get('alice').current_state == "INFO_MENU"
+    assert store.hits == 1
+    assert store.misses == 2
+
+
+def test_lru_eviction():
+    """Test that the least recently used session is evicted first"""
+    store = SessionStore(max_sessions=2)
+    store.get('a')
+    store.get('b')
+    store.get('a')
+    store.get('c')
+
+    assert len(store) == 2
+    assert store.lru_evictions == 1
+    store.get('a')
+    assert store.misses == 3
+
+
+def test_ttl_sweep():
+    """Test that idle sessions are swept"""
+    store = SessionStore(idle_ttl=0.01)
+    store.get('a')
+    store.get('b')
+    time.sleep(0.02)
+    store.get('c')
+
+    assert store.sweep() == 2
+    assert len(store) == 1
+    assert store.stats()['ttl_evictions'] == 2
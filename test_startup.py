@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+Tests for the fast startup path of simple_app
+"""
+
+import json
+import os
+import subprocess
+import sys
+
+from startup import StartupTimer
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+OPTIONAL = ['pyngrok', 'gtts', 'cProfile', 'pstats', 'sqlite3', 'numpy']
+
+
+def test_optional_subsystems_not_imported():
+    """Test that importing simple_app leaves the tunnel, TTS, profiler, SQLite and NumPy unloaded"""
+    code = ("import json, sys, simple_app; "
+            f"print(json.dumps([[m for m in {OPTIONAL!r} if m in sys.modules], simple_app.startup.report()]))")
+    env = dict(os.environ, CHATBOT_LOG_BACKEND='off')
+    output = subprocess.run([sys.executable, '-c', code], cwd=ROOT, env=env, capture_output=True,
+                            text=True, check=True).stdout
+    loaded, report = json.loads(output.strip().splitlines()[-1])
+    assert loaded == []
+    assert [phase['name'] for phase in report['phases']] == [
+        'import flask', 'import chatbot', 'import app modules', 'app setup']
+
+
+def test_startup_report():
+    """Test phase attribution and the budget check"""
+    timer = StartupTimer(budget_ms=60000)
+    timer.mark('imports')
+    timer.mark('bind')
+    report = timer.report()
+    assert [phase['name'] for phase in report['phases']] == ['imports', 'bind']
+    assert report['within_budget']
+    assert 'within the 60000 ms budget' in timer.format_report()
+
+    over = StartupTimer(budget_ms=0)
+    sum(range(10000))
+    over.mark('imports')
+    assert not over.report()['within_budget']
+    assert 'over the 0 ms budget' in over.format_report()
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Tests for background, fingerprinted Rasa training jobs
+"""
+
+import sys
+import textwrap
+import time
+
+import pytest
+
+from training_jobs import FAILED, QUEUED, RUNNING, SKIPPED, SUCCEEDED, TrainingQueue, training_fingerprint
+
+# Stands in for `rasa train`: prints like it, writes the model and exits with argv[1]
+FAKE_RASA = textwrap.dedent('''
+    import os, sys, time
+    print("Training NLU model...", flush=True)
+    for done in range(0, 101, 25):
+        sys.stdout.write(f"\\rEpochs: {done:3d}%|#####     | {done}/100"); sys.stdout.flush()
+    print("", flush=True)
+    time.sleep(float(sys.argv[2]))
+    os.makedirs("models", exist_ok=True)
+    path = "models/" + str(time.time_ns()) + ".tar.gz"
+    open(path, "w").close()
+    print(f"Your Rasa model is trained and saved at '{path}'.", flush=True)
+    sys.exit(int(sys.argv[1]))
+''')
+
+
+def make_project(tmp_path, returncode=0, seconds=0.0, timeout=30):
+    (tmp_path / 'data').mkdir()
+    for name in ('config.yml', 'domain.yml', 'data/nlu.yml', 'data/rules.yml'):
+        (tmp_path / name).write_text(f'# {name}\n', encoding='utf-8')
+    script = tmp_path / 'fake_rasa.py'
+    script.write_text(FAKE_RASA, encoding='utf-8')
+    return TrainingQueue(str(tmp_path), command=(sys.executable, str(script), str(returncode), str(seconds)),
+                         timeout=timeout)
+
+
+def finish(job, timeout=20):
+    deadline = time.monotonic() + timeout
+    while not job.done and time.monotonic() < deadline:
+        job.wait(timeout=0.5)
+    assert job.done
+    return job.snapshot()
+
+
+def test_fingerprint_covers_config_domain_and_data(tmp_path):
+    make_project(tmp_path)
+    first = training_fingerprint(str(tmp_path))
+    (tmp_path / 'README.md').write_text('not training data', encoding='utf-8')
+    assert training_fingerprint(str(tmp_path)) == first
+    (tmp_path / 'data' / 'stories.yml').write_text('stories: []', encoding='utf-8')
+    second = training_fingerprint(str(tmp_path))
+    assert second != first
+    (tmp_path / 'domain.yml').write_text('intents: [greet]', encoding='utf-8')
+    assert training_fingerprint(str(tmp_path)) != second
+
+
+def test_training_runs_then_skips_until_data_changes(tmp_path):
+    """Test that an unchanged project is not retrained, and a changed file or force retrains it"""
+    jobs = make_project(tmp_path)
+    first = finish(jobs.submit())
+    assert first['status'] == SUCCEEDED
+    assert first['model'].startswith('models/') and (tmp_path / first['model']).exists()
+    assert first['progress'] == {'stage': 'Training NLU model', 'label': 'Epochs', 'percent': 100}
+    assert 'Training NLU model...' in first['log'] and not any('%|' in line for line in first['log'])
+    assert jobs.last_success()['fingerprint'] == first['fingerprint']
+
+    skipped = finish(jobs.submit())
+    assert skipped['status'] == SKIPPED and skipped['model'] == first['model']
+
+    assert finish(jobs.submit(force=True))['status'] == SUCCEEDED
+    (tmp_path / 'data' / 'nlu.yml').write_text('nlu: []', encoding='utf-8')
+    assert finish(jobs.submit())['status'] == SUCCEEDED
+
+    # A deleted model is trained again even though the data did not change
+    (tmp_path / jobs.last_success()['model']).unlink()
+    assert finish(jobs.submit())['status'] == SUCCEEDED
+
+
+def test_one_training_at_a_time(tmp_path):
+    """Test that requests made while a job is waiting join it rather than queueing another"""
+    jobs = make_project(tmp_path, seconds=0.5)
+    running = jobs.submit(force=True)
+    deadline = time.monotonic() + 10
+    while running.status == QUEUED and time.monotonic() < deadline:
+        time.sleep(0.01)
+    waiting = jobs.submit()
+    assert jobs.submit(force=True) is waiting and waiting.force
+    assert waiting.status == QUEUED and jobs.stats()['running'] == running.id
+
+    assert finish(running)['status'] == SUCCEEDED
+    second = finish(waiting)
+    assert second['status'] == SUCCEEDED
+    assert second['started'] >= running.finished
+
+
+@pytest.mark.parametrize('returncode, seconds, timeout, message', [
+    (1, 0, 30, 'Training failed'),
+    (0, 30, 0.5, 'timed out'),
+])
+def test_failed_training_is_not_remembered(tmp_path, returncode, seconds, timeout, message):
+    jobs = make_project(tmp_path, returncode=returncode, seconds=seconds, timeout=timeout)
+    result = finish(jobs.submit())
+    assert result['status'] == FAILED and message in result['message']
+    assert jobs.last_success() is None
+
+
+def test_missing_rasa_fails_the_job(tmp_path):
+    jobs = TrainingQueue(str(tmp_path), command=('rasa-command-that-does-not-exist', 'train'))
+    result = finish(jobs.submit())
+    assert result['status'] == FAILED and 'Could not start' in result['message']
+
+
+def test_train_endpoints(tmp_path, monkeypatch):
+    """Test that POST /api/train returns a job id at once and the job can be polled and streamed"""
+    import app
+
+    monkeypatch.setattr(app, 'training', make_project(tmp_path, seconds=0.2))
+    client = app.app.test_client()
+
+    response = client.post('/api/train')
+    assert response.status_code == 202
+    job_id = response.get_json()['job_id']
+
+    stream = client.get(f'/api/train/{job_id}/stream')
+    assert stream.mimetype == 'text/event-stream'
+    body = stream.get_data(as_text=True)
+    assert 'event: log' in body and 'event: progress' in body
+    assert body.rstrip().split('\n\n')[-1].startswith('event: done')
+
+    status = client.get(f'/api/train/{job_id}?since=1').get_json()
+    assert status['status'] == SUCCEEDED and status['log'] and status['next'] == len(status['log']) + 1
+    assert client.post('/api/train').get_json()['status'] in (QUEUED, RUNNING)
+    assert client.get('/api/train/unknown').status_code == 404
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Tests for the TTS audio cache using the offline fake backend
+"""
+
+import errno
+import os
+import threading
+
+import tts
+from tts import AudioCache, FakeBackend, Prefetcher, prewarm, speakable_texts
+from professional_chatbot import ProfessionalChatbot
+
+
+def test_memory_and_disk_tiers(tmp_path):
+    """Test that audio is synthesized once and then served from memory or disk"""
+    backend = FakeBackend()
+    cache = AudioCache(backend, cache_dir=str(tmp_path))
+
+    audio = cache.get('Merhaba')
+    assert cache.get('Merhaba') == audio
+    assert backend.calls == 1
+    assert cache.memory_hits == 1
+
+    # A fresh process only has the disk tier
+    restarted = AudioCache(backend, cache_dir=str(tmp_path))
+    assert restarted.get('Merhaba') == audio
+    assert restarted.disk_hits == 1
+    assert backend.calls == 1
+
+    # Voice settings are part of the key
+    cache.get('Merhaba', slow=True)
+    assert backend.calls == 2
+
+
+def test_failed_disk_write_leaves_no_temp_file(tmp_path, monkeypatch):
+    """Test that a write that fails (e.g. a full disk) removes its temp file and still serves audio"""
+    def no_space(src, dst):
+        raise OSError(errno.ENOSPC, 'No space left on device')
+
+    monkeypatch.setattr(tts.os, 'replace', no_space)
+    cache = AudioCache(FakeBackend(), cache_dir=str(tmp_path))
+    assert cache.get('Merhaba')
+    assert cache.get('Günaydın')
+    assert [name for _, _, files in os.walk(tmp_path) for name in files] == []
+
+
+def test_memory_limit_in_bytes():
+    """Test that the memory tier evicts least recently used audio by size"""
+    backend = FakeBackend()
+    size = len(backend.synthesize('x' * 80))
+    cache = AudioCache(FakeBackend(), memory_limit=size * 2)
+
+    for text in ['a' * 80, 'b' * 80, 'c' * 80]:
+        cache.get(text)
+
+    stats = cache.stats()
+    assert stats['memory_entries'] == 2
+    assert stats['memory_bytes'] <= size * 2
+    assert stats['evictions'] == 1
+
+
+def test_prewarm_static_responses():
+    """Test that pre-warming covers every static response string"""
+    texts = speakable_texts(ProfessionalChatbot().responses)
+    assert "CW Enerji'ye hoş geldiniz." in texts
+    assert 'satın al' not in texts
+
+    cache = AudioCache(FakeBackend())
+    assert prewarm(cache, texts, workers=4) == 0
+    assert cache.misses == len(texts)
+
+    cache.get(texts[0])
+    assert cache.misses == len(texts)
+
+
+def test_stream_caches_complete_audio():
+    """Test that streamed audio arrives in chunks and is cached once complete"""
+    backend = FakeBackend()
+    cache = AudioCache(backend)
+    text = 'Kurulum süreci ' * 100
+
+    chunks = list(cache.stream(text))
+    assert len(chunks) > 1
+    assert cache.lookup(text) == b''.join(chunks)
+    assert list(cache.stream(text)) == [b''.join(chunks)]
+    assert backend.calls == 1
+
+
+class FailingBackend(FakeBackend):
+    """Fake audio that breaks after `chunks` chunks, like a dropped gTTS connection"""
+
+    def __init__(self, chunks):
+        super().__init__()
+        self.chunks = chunks
+
+    def synthesize(self, text, lang='tr', slow=False):
+        raise ConnectionError('TTS service unavailable')
+
+    def stream(self, text, lang='tr', slow=False):
+        audio = FakeBackend.synthesize(self, text, lang, slow)
+        for index, start in enumerate(range(0, len(audio), 1024)):
+            if index == self.chunks:
+                raise ConnectionError('TTS service unavailable')
+            yield audio[start:start + 1024]
+
+
+def test_stream_endpoint_backend_errors(monkeypatch):
+    """Test that /api/tts/stream answers backend failures with JSON and never caches partial audio"""
+    import simple_app
+
+    client = simple_app.app.test_client()
+    text = 'Kurulum süreci ' * 100
+
+    monkeypatch.setattr(simple_app, 'tts_cache', AudioCache(FailingBackend(chunks=0)))
+    response = client.get('/api/tts/stream', query_string={'text': text})
+    assert response.status_code == 502 and 'unavailable' in response.get_json()['error']
+
+    # Range requests synthesize the whole text first
+    response = client.get('/api/tts/stream', query_string={'text': text}, headers={'Range': 'bytes=0-99'})
+    assert response.status_code == 502 and response.is_json
+
+    cache = AudioCache(FailingBackend(chunks=2))
+    monkeypatch.setattr(simple_app, 'tts_cache', cache)
+    response = client.get('/api/tts/stream', query_string={'text': text})
+    assert response.status_code == 200 and len(response.get_data()) == 2 * 1024
+    assert cache.lookup(text) is None
+
+
+class BlockingBackend(FakeBackend):
+    """Fake audio that waits for `release` before answering"""
+
+    def __init__(self):
+        super().__init__()
+        self.release = threading.Event()
+
+    def synthesize(self, text, lang='tr', slow=False):
+        self.release.wait(10)
+        return super().synthesize(text, lang, slow)
+
+
+def test_prefetch_is_bounded_and_deduplicated():
+    """Test that a pending text is not synthesized twice and a full queue skips new texts"""
+    backend = BlockingBackend()
+    cache = AudioCache(backend)
+    prefetch = Prefetcher(cache, workers=1, max_pending=2)
+
+    assert prefetch.submit('Merhaba')
+    assert not prefetch.submit('Merhaba')
+    assert prefetch.submit('Güneş paneli')
+    assert not prefetch.submit('İnvertör')
+    assert prefetch.stats()['pending'] == 2 and prefetch.stats()['skipped'] == 2
+
+    backend.release.set()
+    prefetch._pool.shutdown(wait=True)
+    assert prefetch.stats()['pending'] == 0
+    assert backend.calls == 2
+    assert cache.lookup('Merhaba') is not None and cache.lookup('İnvertör') is None
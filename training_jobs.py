@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+"""
+Background Rasa training jobs, skipped when the training data has not changed
+
+A request only queues a job and gets its id back; one worker thread runs
+the jobs in order, so at most one `rasa train` runs at a time. Requests
+made while a job is still waiting join that job instead of queueing
+another identical one. Before training, a job fingerprints config.yml,
+domain.yml and data/*.yml. When that matches the last successful training
+and the model it produced is still on disk, the job is skipped.
+"""
+
+import glob
+import hashlib
+import json
+import os
+import queue
+import re
+import subprocess
+import threading
+import time
+import uuid
+
+from metrics import REGISTRY
+
+TRAINING_JOBS = REGISTRY.counter('chatbot_training_jobs', "Finished Rasa training jobs by result", ('result',))
+
+QUEUED = 'queued'
+RUNNING = 'running'
+SUCCEEDED = 'succeeded'
+FAILED = 'failed'
+SKIPPED = 'skipped'
+FINISHED = (SUCCEEDED, FAILED, SKIPPED)
+
+# tqdm progress bars ("Epochs:  45%|████▌     | 45/100 [...]") update progress instead of filling the log
+_PROGRESS = re.compile(r'^\s*(?P<label>[^:|]*?):?\s*(?P<percent>\d{1,3})%\|')
+# "Starting to train component 'DIETClassifier'", "Training NLU model..."
+_STAGE = re.compile(r"Starting to train component '?(?P<component>\w+)'?|(?P<model>Training \w+ model)")
+_MODEL = re.compile(r"model is trained and saved at '(?P<path>[^']+)'")
+
+
+def training_fingerprint(project_dir):
+    """Digest of config.yml, domain.yml and data/*.yml, names included"""
+    data = sorted(os.path.relpath(path, project_dir)
+                  for path in glob.glob(os.path.join(project_dir, 'data', '*.yml')))
+    digest = hashlib.sha256()
+    for name in ['config.yml', 'domain.yml'] + data:
+        digest.update(name.encode('utf-8') + b'\0')
+        try:
+            with open(os.path.join(project_dir, name), 'rb') as f:
+                digest.update(f.read())
+        except FileNotFoundError:
+            digest.update(b'<missing>')
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+class TrainingJob:
+    """One training request: status, progress and the lines `rasa train` printed"""
+
+    def __init__(self, force=False, max_log_lines=2000):
+        self.id = uuid.uuid4().hex[:12]
+        self.force = force
+        self.status = QUEUED
+        self.message = 'Waiting for the previous training to finish'
+        self.created = time.time()
+        self.started = None
+        self.finished = None
+        self.returncode = None
+        self.fingerprint = None
+        self.model = None
+        self.progress = {'stage': None, 'label': None, 'percent': None}
+        self.max_log_lines = max_log_lines
+        # Lines dropped from the front once the log is full, so line numbers stay stable
+        self._dropped = 0
+        self._lines = []
+        self._changed = threading.Condition()
+
+    @property
+    def done(self):
+        return self.status in FINISHED
+
+    def _update(self, **fields):
+        with self._changed:
+            for name, value in fields.items():
+                setattr(self, name, value)
+            self._changed.notify_all()
+
+    def _add_line(self, line):
+        with self._changed:
+            progress = _PROGRESS.match(line)
+            if progress:
+                self.progress = dict(self.progress, label=progress.group('label').strip() or None,
+                                     percent=min(int(progress.group('percent')), 100))
+            else:
+                stage = _STAGE.search(line)
+                if stage:
+                    self.progress = {'stage': stage.group('component') or stage.group('model'),
+                                     'label': None, 'percent': None}
+                model = _MODEL.search(line)
+                if model:
+                    self.model = model.group('path')
+                self._lines.append(line)
+                if len(self._lines) > self.max_log_lines:
+                    del self._lines[0]
+                    self._dropped += 1
+            self._changed.notify_all()
+
+    def wait(self, since=0, timeout=None):
+        """Block until the log has lines past `since`, the progress changes or the job finishes"""
+        with self._changed:
+            progress = self.progress
+            return self._changed.wait_for(
+                lambda: self.done or self._dropped + len(self._lines) > since or self.progress is not progress,
+                timeout)
+
+    def snapshot(self, since=0):
+        """JSON-ready state with the log lines from line number `since` on; `next` continues from there"""
+        with self._changed:
+            total = self._dropped + len(self._lines)
+            return {
+                'job_id': self.id,
+                'status': self.status,
+                'message': self.message,
+                'force': self.force,
+                'created': self.created,
+                'started': self.started,
+                'finished': self.finished,
+                'seconds': round((self.finished or time.time()) - self.started, 1) if self.started else None,
+                'returncode': self.returncode,
+                'fingerprint': self.fingerprint,
+                'model': self.model,
+                'progress': dict(self.progress),
+                'log': self._lines[max(since - self._dropped, 0):],
+                'next': total
+            }
+
+
+class TrainingQueue:
+    """Runs training jobs one at a time on a background thread"""
+
+    def __init__(self, project_dir, command=('rasa', 'train'), timeout=1800, state_path=None,
+                 history=20, max_log_lines=2000):
+        self.project_dir = project_dir
+        self.command = list(command)
+        self.timeout = timeout
+        # Fingerprint and model of the last successful training, kept across restarts
+        self.state_path = state_path or os.path.join(project_dir, 'models', 'last_training.json')
+        self.history = history
+        self.max_log_lines = max_log_lines
+        self._jobs = {}
+        self._pending = None
+        self._current = None
+        self._process = None
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._worker = None
+
+    def submit(self, force=False):
+        """Queue a training job, or return the one already waiting to start"""
+        with self._lock:
+            if self._pending is not None:
+                self._pending.force = self._pending.force or force
+                return self._pending
+            job = TrainingJob(force, self.max_log_lines)
+            self._jobs[job.id] = job
+            self._pending = job
+            # Forget the oldest finished jobs
+            finished = [old for old in self._jobs.values() if old.done]
+            for old in finished[:max(len(self._jobs) - self.history, 0)]:
+                del self._jobs[old.id]
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run_jobs, name='training-jobs', daemon=True)
+                self._worker.start()
+        self._queue.put(job)
+        return job
+
+    def get(self, job_id):
+        return self._jobs.get(job_id)
+
+    def last_success(self):
+        """{'fingerprint', 'model', 'finished', 'job_id'} of the last successful training, or None"""
+        try:
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _save_success(self, job):
+        os.makedirs(os.path.dirname(self.state_path), exist_ok=True)
+        temporary = f"{self.state_path}.tmp"
+        with open(temporary, 'w', encoding='utf-8') as f:
+            json.dump({'fingerprint': job.fingerprint, 'model': job.model, 'finished': job.finished,
+                       'job_id': job.id}, f)
+        os.replace(temporary, self.state_path)
+
+    def _unchanged(self, fingerprint):
+        """The last successful training when it used these inputs and its model still exists"""
+        last = self.last_success()
+        if not last or last.get('fingerprint') != fingerprint:
+            return None
+        model = last.get('model')
+        if model and not os.path.exists(os.path.join(self.project_dir, model)):
+            return None
+        return last
+
+    def _run_jobs(self):
+        while True:
+            job = self._queue.get()
+            with self._lock:
+                if self._pending is job:
+                    self._pending = None
+                self._current = job
+            try:
+                self._run(job)
+            except Exception as e:
+                job._update(status=FAILED, message=f'Training error: {e}', finished=time.time())
+            finally:
+                with self._lock:
+                    self._current = None
+                TRAINING_JOBS.inc((job.status,))
+
+    def _run(self, job):
+        fingerprint = training_fingerprint(self.project_dir)
+        job._update(status=RUNNING, message='Checking the training data', started=time.time(),
+                    fingerprint=fingerprint)
+
+        last = None if job.force else self._unchanged(fingerprint)
+        if last is not None:
+            job._update(status=SKIPPED, model=last.get('model'), finished=time.time(),
+                        message='config.yml, domain.yml and data/*.yml are unchanged since the last '
+                                'successful training')
+            return
+
+        job._update(message='Training')
+        try:
+            process = subprocess.Popen(self.command, cwd=self.project_dir, stdout=subprocess.PIPE,
+                                       stderr=subprocess.STDOUT, text=True, bufsize=1)
+        except OSError as e:
+            job._update(status=FAILED, message=f'Could not start {self.command[0]}: {e}', finished=time.time())
+            return
+
+        self._process = process
+        timed_out = threading.Event()
+
+        def kill():
+            timed_out.set()
+            process.kill()
+
+        timer = threading.Timer(self.timeout, kill)
+        timer.daemon = True
+        timer.start()
+        try:
+            # Text mode splits on the carriage returns progress bars redraw with
+            for line in process.stdout:
+                line = line.rstrip()
+                if line:
+                    job._add_line(line)
+            returncode = process.wait()
+        finally:
+            timer.cancel()
+            process.stdout.close()
+            self._process = None
+
+        if timed_out.is_set():
+            job._update(status=FAILED, returncode=returncode, finished=time.time(),
+                        message=f'Training timed out after {self.timeout} seconds')
+        elif returncode == 0:
+            job._update(status=SUCCEEDED, returncode=0, finished=time.time(), message='Model trained successfully')
+            self._save_success(job)
+        else:
+            job._update(status=FAILED, returncode=returncode, finished=time.time(), message='Training failed')
+
+    def stop(self):
+        """Stop a running training, e.g. when the server shuts down"""
+        process = self._process
+        if process is not None and process.poll() is None:
+            process.terminate()
+
+    def stats(self):
+        with self._lock:
+            current = self._current.id if self._current else None
+            pending = self._pending.id if self._pending else None
+            counts = {}
+            for job in self._jobs.values():
+                counts[job.status] = counts.get(job.status, 0) + 1
+        return {
+            'running': current,
+            'queued': pending,
+            'recent_jobs': counts,
+            'last_success': self.last_success()
+        }
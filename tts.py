@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+"""
+Text-to-speech backends and a content-addressed two-tier audio cache
+"""
+
+import hashlib
+import io
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from metrics import TTS_LATENCY
+
+
+class TTSBackend:
+    """Synthesizes MP3 audio for a text"""
+    name = 'base'
+
+    def synthesize(self, text, lang='tr', slow=False):
+        raise NotImplementedError
+
+    def stream(self, text, lang='tr', slow=False):
+        """Yield MP3 chunks as they are produced"""
+        yield self.synthesize(text, lang=lang, slow=slow)
+
+
+class GTTSBackend(TTSBackend):
+    """Google Translate TTS through the gTTS package"""
+    name = 'gtts'
+
+    def synthesize(self, text, lang='tr', slow=False):
+        from gtts import gTTS
+
+        buffer = io.BytesIO()
+        gTTS(text=text, lang=lang, slow=slow).write_to_fp(buffer)
+        return buffer.getvalue()
+
+    def stream(self, text, lang='tr', slow=False):
+        from gtts import gTTS
+
+        # gTTS splits long text into parts and yields audio for each as it arrives
+        yield from gTTS(text=text, lang=lang, slow=slow).stream()
+
+
+class FakeBackend(TTSBackend):
+    """Offline backend returning deterministic placeholder MP3 frames"""
+    name = 'fake'
+
+    def __init__(self):
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def synthesize(self, text, lang='tr', slow=False):
+        with self._lock:
+            self.calls += 1
+        digest = hashlib.sha256(f"{lang}\0{slow}\0{text}".encode('utf-8')).digest()
+        # MPEG-1 Layer III frame header followed by a text-dependent payload
+        return b'\xff\xfb\x90\x64' + digest * max(1, len(text) // 8)
+
+    def stream(self, text, lang='tr', slow=False):
+        audio = self.synthesize(text, lang=lang, slow=slow)
+        for start in range(0, len(audio), 1024):
+            yield audio[start:start + 1024]
+
+
+BACKENDS = {
+    'gtts': GTTSBackend,
+    'fake': FakeBackend
+}
+
+
+def get_backend(name):
+    """Create a TTS backend by name"""
+    try:
+        return BACKENDS[name]()
+    except KeyError:
+        raise ValueError(f"Unknown TTS backend '{name}' (choose from {', '.join(BACKENDS)})") from None
+
+
+class AudioCache:
+    """Audio cache keyed by hash of (backend, text, lang, slow): memory LRU over an on-disk store"""
+
+    def __init__(self, backend, memory_limit=64 * 1024 * 1024, cache_dir=None):
+        self.backend = backend
+        self.memory_limit = memory_limit
+        self.cache_dir = cache_dir
+
+        self._memory = OrderedDict()
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    def key(self, text, lang='tr', slow=False):
+        """Content address for a synthesis request"""
+        return hashlib.sha256(f"{self.backend.name}\0{lang}\0{int(slow)}\0{text}".encode('utf-8')).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key[:2], key + '.mp3')
+
+    def lookup(self, text, lang='tr', slow=False):
+        """Return cached MP3 bytes for text, or None without synthesizing"""
+        key = self.key(text, lang, slow)
+
+        with self._lock:
+            audio = self._memory.get(key)
+            if audio is not None:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return audio
+
+        audio = self._read_disk(key)
+        if audio is not None:
+            with self._lock:
+                self.disk_hits += 1
+            self._remember(key, audio)
+        return audio
+
+    def get(self, text, lang='tr', slow=False):
+        """Return MP3 bytes for text, synthesizing only on a full miss"""
+        audio = self.lookup(text, lang, slow)
+        if audio is None:
+            start = time.perf_counter()
+            audio = self.backend.synthesize(text, lang=lang, slow=slow)
+            TTS_LATENCY.observe(time.perf_counter() - start, (self.backend.name, 'full'))
+            self._store(self.key(text, lang, slow), audio)
+        return audio
+
+    def stream(self, text, lang='tr', slow=False):
+        """Yield MP3 chunks, straight from the backend on a miss; complete audio is cached"""
+        audio = self.lookup(text, lang, slow)
+        if audio is not None:
+            yield audio
+            return
+
+        chunks = []
+        start = time.perf_counter()
+        for chunk in self.backend.stream(text, lang=lang, slow=slow):
+            chunks.append(chunk)
+            yield chunk
+        TTS_LATENCY.observe(time.perf_counter() - start, (self.backend.name, 'stream'))
+        self._store(self.key(text, lang, slow), b''.join(chunks))
+
+    def _store(self, key, audio):
+        with self._lock:
+            self.misses += 1
+        self._write_disk(key, audio)
+        self._remember(key, audio)
+
+    def _remember(self, key, audio):
+        if len(audio) > self.memory_limit:
+            return
+        with self._lock:
+            if key in self._memory:
+                return
+            self._memory[key] = audio
+            self._memory_bytes += len(audio)
+            while self._memory_bytes > self.memory_limit:
+                _, evicted = self._memory.popitem(last=False)
+                self._memory_bytes -= len(evicted)
+                self.evictions += 1
+
+    def _read_disk(self, key):
+        if not self.cache_dir:
+            return None
+        try:
+            with open(self._path(key), 'rb') as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def _write_disk(self, key, audio):
+        if not self.cache_dir:
+            return
+        path = self._path(key)
+        temp_path = None
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Write to a temp file and rename so readers never see partial audio
+            fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                f.write(audio)
+            os.replace(temp_path, path)
+        except OSError as e:
+            print(f"Error writing TTS cache file: {e}")
+            # A failed write (e.g. a full disk) must not leave its temp file behind
+            if temp_path is not None and os.path.exists(temp_path):
+                try:
+                    os.unlink(temp_path)
+                except OSError:
+                    pass
+
+    def stats(self):
+        """Return cache counters"""
+        with self._lock:
+            return {
+                'backend': self.backend.name,
+                'memory_entries': len(self._memory),
+                'memory_bytes': self._memory_bytes,
+                'memory_limit': self.memory_limit,
+                'memory_hits': self.memory_hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'evictions': self.evictions
+            }
+
+
+def speakable_texts(responses):
+    """Collect every static string in a response catalog, in order and without duplicates"""
+    texts = []
+    seen = set()
+
+    def collect(value):
+        if isinstance(value, str):
+            text = value.strip()
+            if text and text not in seen:
+                seen.add(text)
+                texts.append(text)
+        elif isinstance(value, dict):
+            for key, item in value.items():
+                # Menu actions are commands sent back to the bot, not spoken text
+                if key not in ('type', 'action'):
+                    collect(item)
+        elif isinstance(value, (list, tuple)):
+            for item in value:
+                collect(item)
+
+    collect(list(responses.values()))
+    return texts
+
+
+def prewarm(cache, texts, lang='tr', slow=False, workers=4):
+    """Synthesize texts into the cache on a bounded thread pool; returns the number of failures"""
+    failures = 0
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='tts-prewarm') as pool:
+        futures = [pool.submit(cache.get, text, lang, slow) for text in texts]
+        for future in futures:
+            try:
+                future.result()
+            except Exception as e:
+                failures += 1
+                print(f"Error pre-warming TTS cache: {e}")
+    return failures
+
+
+class Prefetcher:
+    """Synthesizes texts into a cache in the background, dropping work it cannot take
+
+    The cache has no single-flight, so a text already waiting or being
+    synthesized is not submitted again, and once max_pending texts are in
+    hand further ones are skipped rather than queued without bound.
+    """
+
+    def __init__(self, cache, workers=2, max_pending=16):
+        self.cache = cache
+        self.max_pending = max_pending
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='tts-prefetch')
+        self._pending = set()
+        self._lock = threading.Lock()
+        self.submitted = 0
+        self.skipped = 0
+        self.failures = 0
+
+    def submit(self, text, lang='tr', slow=False):
+        """Queue text for synthesis; returns False when it is already pending or the queue is full"""
+        key = (text, lang, slow)
+        with self._lock:
+            if key in self._pending or len(self._pending) >= self.max_pending:
+                self.skipped += 1
+                return False
+            self._pending.add(key)
+            self.submitted += 1
+        self._pool.submit(self._run, key)
+        return True
+
+    def _run(self, key):
+        try:
+            self.cache.get(*key)
+        except Exception as e:
+            with self._lock:
+                self.failures += 1
+            print(f"Error prefetching TTS audio: {e}")
+        finally:
+            with self._lock:
+                self._pending.discard(key)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'pending': len(self._pending),
+                'max_pending': self.max_pending,
+                'submitted': self.submitted,
+                'skipped': self.skipped,
+                'failures': self.failures
+            }